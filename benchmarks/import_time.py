@@ -0,0 +1,63 @@
+"""
+Measure how long importing onepassword takes in a fresh interpreter
+
+Usage: python benchmarks/import_time.py [--runs 20] [--statement "from onepassword import OnePassword"]
+    [--record import_times.jsonl]
+
+Each run starts a new python process and times the statement, the median over all runs is reported. With --record
+the result is appended as a JSON line, so the cost can be tracked across commits.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+TIMER = """
+import time
+start = time.perf_counter()
+{statement}
+print(int((time.perf_counter() - start) * 1000000))
+"""
+
+
+def import_time(statement: str) -> int:
+    """
+    Run an import statement once in a fresh interpreter
+
+    :param statement: Python statement that imports the package
+    :return: Time the statement took in microseconds
+    """
+    r = subprocess.run([sys.executable, "-c", TIMER.format(statement=statement)], cwd=ROOT, capture_output=True,
+                       text=True, check=True)
+    return int(r.stdout.strip())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the import time of onepassword")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--statement", default="from onepassword import OnePassword")
+    parser.add_argument("--record", help="JSON lines file the result is appended to")
+    args = parser.parse_args()
+
+    times = [import_time(args.statement) for _ in range(args.runs)]
+    result = {
+        "time": int(time.time()),
+        "statement": args.statement,
+        "runs": args.runs,
+        "median_us": int(statistics.median(times)),
+        "min_us": min(times),
+    }
+    print("{statement}: median {median_us}us, min {min_us}us over {runs} runs".format(**result))
+    if args.record:
+        with open(args.record, "a") as f:
+            f.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,28 @@
-from .client import OnePassword
-__all__ = ["client", "exceptions", "OnePassword", "utils"]
+import importlib
+
+__all__ = ["async_client", "client", "connect", "exceptions", "pool", "snapshot", "AsyncOnePassword",
+           "ConnectOnePassword", "OnePassword", "OnePasswordPool", "SnapshotOnePassword", "utils"]
+
+# Clients are imported on first access so that importing the package stays cheap
+_lazy_attributes = {
+    "OnePassword": "client",
+    "AsyncOnePassword": "async_client",
+    "ConnectOnePassword": "connect",
+    "OnePasswordPool": "pool",
+    "SnapshotOnePassword": "snapshot",
+}
+
+
+def __getattr__(name):
+    if name in _lazy_attributes:
+        value = getattr(importlib.import_module("." + _lazy_attributes[name], __name__), name)
+    elif name in __all__:
+        value = importlib.import_module("." + name, __name__)
+    else:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,326 @@
+import os
+import json
+import asyncio
+from typing import BinaryIO
+from onepassword.cache import ItemIndex
+from onepassword.client import DIGEST_TAG_PREFIX, SignIn, get_signin_strategy, load_document, select_fields
+from onepassword.exceptions import OnePasswordTimeoutError, command_error
+from onepassword.retry import RetryPolicy, Reauthenticator, async_call_with_retry
+from onepassword.utils import content_digest
+
+
+class AsyncOnePassword:
+    """
+    Asyncio version of OnePassword, every op call runs as an asyncio subprocess so it never blocks the event loop.
+    Sign in happens once when the class is created.
+
+    :param signin_method: Sign in method for 1Password (Optional, default = 'app', options: 'app', 'manual')
+    :param account: 1Password account name (Optional, default=None)
+    :param password: password of 1Password account (Optional, default=None)
+    :param max_concurrency: Maximum number of op processes running at once (Optional, default=16)
+    :param timeout: Seconds each op call may take before it is killed, None waits forever (Optional, default=None)
+    :param uuid_cache_ttl: Seconds a vault listing is reused for title to uuid lookups, 0 disables the cache and None
+        never expires it (Optional, default=300)
+    :param retry_policy: How failed op calls are retried, expired sessions are signed in again once
+        (Optional, default=None which uses RetryPolicy())
+    :param signin_strategy: Already signed in strategy to use instead of signing in with signin_method
+        (Optional, default=None)
+    """
+    def __init__(self, signin_method: str = "app", account: str | None = None, password: str | None = None,
+                 max_concurrency: int = 16, timeout: float | None = None,
+                 uuid_cache_ttl: float | None = 300, retry_policy: RetryPolicy | None = None,
+                 signin_strategy: SignIn | None = None) -> None:
+        # pragma: no cover
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._semaphore = None
+        self._item_index = ItemIndex(ttl=uuid_cache_ttl)
+        self.retry_policy = RetryPolicy() if retry_policy is None else retry_policy
+        if signin_strategy is None:
+            signin_strategy = get_signin_strategy(signin_method, account, password)
+        self.signin_strategy = signin_strategy
+        self._reauthenticator = Reauthenticator(lambda: self.signin_strategy.reauthenticate())
+
+    async def _run(self, *args: str, stdin: bytes | None = None, timeout: float | None = None,
+                   idempotent: bool = True) -> str:
+        """
+        Run an op command under the retry policy
+
+        :param args: Arguments passed to op
+        :param stdin: Data written to the standard input of op (Optional, default=None)
+        :param timeout: Seconds the call may take, overrides the client timeout (Optional, default=None)
+        :param idempotent: False for writes that must not run twice, transient failures are then not retried
+            (Optional, default=True)
+        :return: Standard output of the command
+        """
+        return await async_call_with_retry(lambda: self._exec(*args, stdin=stdin, timeout=timeout),
+                                           self.retry_policy, self._reauthenticator, idempotent=idempotent)
+
+    async def _exec(self, *args: str, stdin: bytes | None = None, timeout: float | None = None) -> str:
+        """
+        Run an op command once a concurrency slot is free. The process is killed if the call times out or the
+        awaiting task is cancelled.
+
+        :param args: Arguments passed to op
+        :param stdin: Data written to the standard input of op (Optional, default=None)
+        :param timeout: Seconds the call may take, overrides the client timeout (Optional, default=None)
+        :return: Standard output of the command
+        """
+        if self._semaphore is None:
+            # created lazily so it binds to the running event loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        timeout = self.timeout if timeout is None else timeout
+        async with self._semaphore:
+            process = await asyncio.create_subprocess_exec(
+                "op", *self.signin_strategy.command_args(), *args,
+                stdin=asyncio.subprocess.PIPE if stdin is not None else asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=self.signin_strategy.command_env(),
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(stdin), timeout)
+            except asyncio.TimeoutError:
+                await self._kill(process)
+                raise OnePasswordTimeoutError(list(args), timeout)
+            except asyncio.CancelledError:
+                await self._kill(process)
+                raise
+        if process.returncode != 0:
+            raise command_error(list(args), process.returncode, stderr.decode("utf-8", "replace"))
+        return stdout.decode("utf-8")
+
+    @staticmethod
+    async def _kill(process: asyncio.subprocess.Process) -> None:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+    async def get_uuid(self, docname: str, vault: str = "Private") -> str:
+        """
+        Helper function to get the uuid for an item, the vault listing is cached for uuid_cache_ttl seconds
+
+        :param docname: Title of the item (not filename of documents)
+        :param vault: Vault the item is in (Optional, default=Private)
+        :return: Uuid of item or None if it doesn't exist
+        """
+        if not self._item_index.is_fresh(vault):
+            await self.list_items(vault=vault)
+        item = self._item_index.get(vault, docname)
+        if item is not None:
+            return item["id"]
+
+    def invalidate_uuid_cache(self, vault: str | None = None) -> None:
+        """
+        Helper function to forget cached vault listings used by get_uuid
+
+        :param vault: Vault to forget (Optional, default=None which forgets all vaults)
+        """
+        self._item_index.invalidate(vault)
+
+    async def get_document(self, docname: str, vault: str = "Private") -> dict | None:
+        """
+        Helper function to get a document
+
+        :param docname: Title of the document (not it's filename)
+        :param vault: Vault the document is in (Optional, default=Private)
+        :returns: Document or None if it doesn't exist
+        """
+        return load_document(await self.get_document_str(docname, vault), docname, vault)
+
+    async def get_document_str(self, docname: str, vault: str = "Private") -> str | None:
+        """
+        Helper function to get a document
+
+        :param docname: Title of the document (not it's filename)
+        :param vault: Vault the document is in (Optional, default=Private)
+        :returns: Document or None is non existant
+        """
+        docid = await self.get_uuid(docname, vault=vault)
+        if isinstance(docid, str):
+            return await self._run("document", "get", docid, "--vault", vault)
+        return None
+
+    async def put_document(
+            self, filename: str | os.PathLike | bytes | BinaryIO, title: str, vault: str = "Private",
+            file_name: str | None = None
+    ) -> bool:
+        """
+        Helper function to put a document. The SHA-256 digest of the content is stored as a tag, nothing is uploaded
+        if a document with this title already has the same content.
+
+        :param filename: Path and filename of document, or its content as bytes or a binary file object
+        :param title: Title you wish to call the document
+        :param vault: Vault the document is in (Optional, default=Private)
+        :param file_name: File name stored with content passed as bytes or a file object (Optional, default=None)
+        :return: True if the document was uploaded, False if it was unchanged
+        """
+        digest, filename = await asyncio.to_thread(content_digest, filename)
+        existing = await self._document_summary(title, vault, digest)
+        if existing is not None and DIGEST_TAG_PREFIX + digest in existing.get("tags", []):
+            return False
+        return await self._create_document(filename, title, vault, file_name, digest)
+
+    async def _create_document(
+            self, document: str | os.PathLike | bytes, title: str, vault: str, file_name: str | None, digest: str
+    ) -> bool:
+        tags = [DIGEST_TAG_PREFIX + digest]
+        r = await self._document_command(
+            ["document", "create"], document,
+            ["--title", title, "--vault", vault, "--tags", ",".join(tags), "--format=json"], file_name,
+            idempotent=False)
+        try:
+            self._item_index.set(vault, title, {"id": json.loads(r)["uuid"], "title": title, "tags": tags})
+        except (ValueError, KeyError, TypeError):
+            self._item_index.invalidate(vault)
+        return True
+
+    async def update_document(
+            self, filename: str | os.PathLike | bytes | BinaryIO, title: str, vault: str = "Private",
+            file_name: str | None = None, remove_file: bool = False
+    ) -> bool:
+        """
+        Helper function to update an existing document in 1Password in place, the document keeps its uuid.
+        If the document does not exist yet it is created, if its content digest tag matches nothing is uploaded.
+
+        :param filename: Path and filename of document, or its content as bytes or a binary file object.
+        :param title: Name of the document in 1Password.
+        :param vault: Vault the document is in (Optional, default=Private).
+        :param file_name: File name stored with content passed as bytes or a file object (Optional, default=None).
+        :param remove_file: Remove the local file once handled, only used for paths (Optional, default=False).
+        :return: True if the document was uploaded, False if it was unchanged
+        """
+        digest, content = await asyncio.to_thread(content_digest, filename)
+        existing = await self._document_summary(title, vault, digest)
+        if existing is None:
+            uploaded = await self._create_document(content, title, vault, file_name, digest)
+        elif DIGEST_TAG_PREFIX + digest in existing.get("tags", []):
+            uploaded = False
+        else:
+            tags = [tag for tag in existing.get("tags", []) if not tag.startswith(DIGEST_TAG_PREFIX)]
+            tags.append(DIGEST_TAG_PREFIX + digest)
+            await self._document_command(["document", "edit", existing["id"]], content,
+                                         ["--vault", vault, "--tags", ",".join(tags)], file_name)
+            self._item_index.set(vault, title, dict(existing, tags=tags))
+            uploaded = True
+
+        if remove_file and isinstance(filename, (str, os.PathLike)):
+            os.remove(filename)
+        return uploaded
+
+    async def delete_document(self, title: str, vault: str = "Private") -> None:
+        """
+        Helper function to delete a document
+
+        :param title: Title of the document you wish to remove
+        :param vault: Vault the document is in (Optional, default=Private)
+        """
+        docid = await self.get_uuid(title, vault=vault)
+        if docid is None:
+            return
+        await self._run("item", "delete", docid, "--vault", vault, idempotent=False)
+        self._item_index.discard(vault, title)
+
+    async def _document_summary(self, title: str, vault: str, digest: str) -> dict | None:
+        # a miss or a matching digest is only trusted from a listing taken now, see OnePassword._document_summary
+        listed = not self._item_index.is_fresh(vault)
+        if listed:
+            await self.list_items(vault=vault)
+        existing = self._item_index.get(vault, title)
+        if not listed and (existing is None or DIGEST_TAG_PREFIX + digest in existing.get("tags", [])):
+            await self.list_items(vault=vault)
+            existing = self._item_index.get(vault, title)
+        return existing
+
+    async def _document_command(
+            self, args: list, document: str | os.PathLike | bytes | BinaryIO, flags: list, file_name: str | None,
+            idempotent: bool = True
+    ) -> str:
+        stdin = None
+        if isinstance(document, (str, os.PathLike)):
+            args = args + [os.fspath(document)] + flags
+        else:
+            stdin = document if isinstance(document, bytes) else document.read()
+            args = args + ["-"] + flags
+            if file_name is not None:
+                args += ["--file-name", file_name]
+        return await self._run(*args, stdin=stdin, idempotent=idempotent)
+
+    async def signout(self) -> None:
+        """
+        Helper function to sign out of 1Password
+        """
+        await self._run("signout")
+
+    async def list_vaults(self) -> list:
+        """
+        Helper function to list all vaults
+        """
+        return json.loads(await self._run("vault", "list", "--format=json"))
+
+    async def list_items(self, vault: str = "Private") -> list:
+        """
+        Helper function to list all items in a certain vault, also refreshes the cache used by get_uuid
+
+        :param vault: Vault the items are in (Optional, default=Private)
+        :returns: List of all items
+        """
+        items = json.loads(await self._run("items", "list", "--vault", vault, "--format=json"))
+        self._item_index.load(vault, items)
+        return items
+
+    async def get_item(self, uuid: str, fields: str | list | None = None) -> dict:
+        """
+        Helper function to get a certain field, you can find the UUID you need using list_items
+
+        :param uuid: Uuid of the item you wish to get, no vault needed
+        :param fields: To return only certain detail use either a specific field or list of them
+            (Optional, default=None which means all fields returned)
+        :return: Dictionary of the item with requested fields
+        """
+        item = json.loads(await self._run("item", "get", uuid, "--format=json"))
+        return select_fields(item, fields)
+
+    async def get_items(self, uuids: list, fields: str | list | None = None) -> tuple[dict, dict]:
+        """
+        Helper function to get many items concurrently, at most max_concurrency op processes run at once
+
+        :param uuids: Uuids of the items you wish to get, no vault needed
+        :param fields: To return only certain detail use either a specific field or list of them
+            (Optional, default=None which means all fields returned)
+        :return: Dictionary of items keyed by uuid and dictionary of the exception raised for each failed uuid
+        """
+        uuids = list(dict.fromkeys(uuids))
+        results = await asyncio.gather(*(self.get_item(uuid, fields) for uuid in uuids), return_exceptions=True)
+        items, errors = {}, {}
+        for uuid, result in zip(uuids, results):
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+            if isinstance(result, Exception):
+                errors[uuid] = result
+            else:
+                items[uuid] = result
+        return items, errors
+
+    async def read(self, secret_ref: str) -> str:
+        """
+        Helper function to read a secret based on its reference(ex: op://<vault>/<item>/<field>)
+
+        :param secret_ref: Reference to the secret you wish to read
+        :return: The secret in plain text
+        """
+        if not secret_ref or not isinstance(secret_ref, str):
+            raise ValueError("secret_ref must be a non-empty string")
+        secret = await self._run("read", secret_ref)
+        return secret[:-1] if secret.endswith("\n") else secret
+
+    async def get_item_otp(self, uuid: str) -> str:
+        """
+        Helper function to get the item otp, you can find the UUID you need using list_items
+
+        :param uuid: Uuid of the item you wish to get, no vault needed
+        :return: the otp of the item, if it exists
+        """
+        return (await self._run("item", "get", uuid, "--otp")).rstrip("\n")
@@ -0,0 +1,210 @@
+import json
+import time
+import threading
+from collections import OrderedDict
+from onepassword.utils import AuthenticatedEncryption
+
+
+class ItemIndex:
+    """
+    Per-vault index of item listings keyed by title, so title lookups do not need a new vault listing each time
+
+    :param ttl: Seconds a vault listing stays valid, 0 disables the index and None never expires
+        (Optional, default=300)
+    """
+    def __init__(self, ttl: float | None = 300) -> None:
+        self.ttl = ttl
+        self._vaults = {}
+        self._lock = threading.RLock()
+
+    def is_fresh(self, vault: str) -> bool:
+        """
+        Check whether the listing for a vault is loaded and not yet expired
+
+        :param vault: Vault name
+        :return: True if lookups for the vault can be answered from the index
+        """
+        with self._lock:
+            entry = self._vaults.get(vault)
+            if entry is None or self.ttl == 0:
+                return False
+            if self.ttl is None:
+                return True
+            return time.monotonic() - entry[0] < self.ttl
+
+    def load(self, vault: str, items: list) -> None:
+        """
+        Replace the index of a vault with a fresh listing
+
+        :param vault: Vault name
+        :param items: Item summaries as returned by list_items
+        """
+        titles = {}
+        for item in items:
+            # first match wins, as with a linear scan of the listing
+            titles.setdefault(item["title"], item)
+        with self._lock:
+            self._vaults[vault] = (time.monotonic(), titles)
+
+    def get(self, vault: str, title: str) -> dict | None:
+        """
+        Get the item summary for a title from the index
+
+        :param vault: Vault name
+        :param title: Title of the item
+        :return: Item summary or None if the title is not indexed
+        """
+        with self._lock:
+            entry = self._vaults.get(vault)
+            if entry is None:
+                return None
+            return entry[1].get(title)
+
+    def set(self, vault: str, title: str, item: dict) -> None:
+        """
+        Add or replace a single item in a loaded vault index, vaults that are not loaded are left alone
+
+        :param vault: Vault name
+        :param title: Title of the item
+        :param item: Item summary, must contain at least the "id"
+        """
+        with self._lock:
+            entry = self._vaults.get(vault)
+            if entry is not None:
+                entry[1][title] = item
+
+    def discard(self, vault: str, title: str) -> None:
+        """
+        Remove a single item from a vault index
+
+        :param vault: Vault name
+        :param title: Title of the item
+        """
+        with self._lock:
+            entry = self._vaults.get(vault)
+            if entry is not None:
+                entry[1].pop(title, None)
+
+    def invalidate(self, vault: str | None = None) -> None:
+        """
+        Drop the index for one vault or for all of them
+
+        :param vault: Vault name (Optional, default=None which drops every vault)
+        """
+        with self._lock:
+            if vault is None:
+                self._vaults.clear()
+            else:
+                self._vaults.pop(vault, None)
+
+
+class SecretCache:
+    """
+    In memory cache of secrets with a time to live per entry and least recently used eviction. Values are only held
+    encrypted, with a key that never leaves the process.
+
+    :param ttl: Seconds an entry stays valid (Optional, default=60)
+    :param max_entries: Maximum number of entries kept (Optional, default=1024)
+    :param max_bytes: Maximum size of all encrypted entries together (Optional, default=None which means no limit)
+    """
+    def __init__(self, ttl: float = 60, max_entries: int = 1024, max_bytes: int | None = None) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._encryption = AuthenticatedEncryption()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple) -> str | dict | list | None:
+        """
+        Get a cached value, expired entries count as misses
+
+        :param key: Cache key, the first element names the operation and the second the uuid or reference
+        :return: Cached value or None if it is not cached
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            is_json, encoded = entry[1], entry[2]
+        value = self._encryption.decode(encoded)
+        return json.loads(value) if is_json else value
+
+    def contains(self, key: tuple) -> bool:
+        """
+        Check whether a key is cached and not expired, without counting a hit or miss
+
+        :param key: Cache key
+        :return: True if get would return the value
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > time.monotonic()
+
+    def set(self, key: tuple, value: str | dict | list, ttl: float | None = None) -> None:
+        """
+        Add or replace a cached value, evicting the least recently used entries when a limit is reached
+
+        :param key: Cache key, the first element names the operation and the second the uuid or reference
+        :param value: Value to cache
+        :param ttl: Seconds the entry stays valid (Optional, default=None which uses the cache ttl)
+        """
+        is_json = not isinstance(value, str)
+        encoded = self._encryption.encode(json.dumps(value) if is_json else value)
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            # a value too big to cache still replaces the old one, which is out of date
+            if self.max_bytes is not None and len(encoded) > self.max_bytes:
+                return
+            self._entries[key] = (expires_at, is_json, encoded)
+            self.size += len(encoded)
+            while len(self._entries) > self.max_entries or \
+                    (self.max_bytes is not None and self.size > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, name: str) -> int:
+        """
+        Remove every entry for an item uuid or secret reference, references are also matched by their path segments
+
+        :param name: Uuid or secret reference
+        :return: Number of entries removed
+        """
+        with self._lock:
+            keys = [key for key in self._entries if key[1] == name or
+                    (key[0] == "read" and name in key[1].split("?")[0].split("/"))]
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        """
+        Remove every entry, the hit and miss counters are kept
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        """
+        Get the cache counters
+
+        :return: Dictionary of hits, misses, entries and bytes
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "bytes": self.size}
+
+    def _remove(self, key: tuple) -> None:
+        self.size -= len(self._entries.pop(key)[2])
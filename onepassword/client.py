@@ -1,17 +1,32 @@
 import os
 import json
-import platform
-import yaml
+import time
+import threading
 import subprocess
 from subprocess import CompletedProcess
-from typing import Any
+from typing import TYPE_CHECKING, Any, BinaryIO, Iterator, MutableMapping
+from datetime import datetime
 from getpass import getpass
 from json import JSONDecodeError
-from onepassword.utils import read_bash_return, domain_from_email, Encryption, BashProfile, get_device_uuid, \
-    _spawn_signin
-from onepassword.exceptions import OnePasswordForgottenPassword
+from onepassword.utils import domain_from_email, Encryption, AuthenticatedEncryption, BashProfile, get_device_uuid, \
+    signin_with_password, content_digest, run_op, OpStream
+from onepassword.exceptions import OnePasswordForgottenPassword, OnePasswordCommandError, OnePasswordAuthError, \
+    OnePasswordNotFoundError, OnePasswordTimeoutError, OnePasswordTransientError
+from onepassword.cache import ItemIndex, SecretCache
+from onepassword.retry import RetryPolicy, Reauthenticator, call_with_retry
+from onepassword.session import SessionKeepAlive
+from onepassword.throttle import CallGovernor, SingleFlight
+
+if TYPE_CHECKING:
+    from onepassword.sync import ChangeSet
+    from onepassword.watch import VaultWatcher
 
 SERVICE_ACCOUNT_TOKEN = "OP_SERVICE_ACCOUNT_TOKEN"
+DIGEST_TAG_PREFIX = "sha256:"
+# prefetched secrets should outlive the start up they were loaded for
+PREFETCH_CACHE_TTL = 3600
+# Shared by every client that is not given its own governor, only collects metrics until limits are set on it
+default_governor = CallGovernor()
 
 
 class SignIn:
@@ -42,10 +57,8 @@ class SignIn:
         try:
             session_dict = bash_profile.get_key_value(self._env_account, fuzzy=True)[0]
             account = session_dict.get("OP_ACCOUNT").strip('\"')
-        except AttributeError:
+        except (AttributeError, ValueError):
             account = self._input_account()
-        except ValueError:
-            raise ValueError("First signin failed or not executed.")
         return account
 
     @staticmethod
@@ -65,6 +78,28 @@ class SignIn:
     def signin(self):
         pass
 
+    def reauthenticate(self) -> None:
+        """
+        Sign in again after the session expired, without asking for anything the strategy already knows
+        """
+        self.signin()
+
+    def command_args(self) -> list:
+        """
+        Global arguments added in front of every op command run with this sign in
+
+        :return: List of arguments, empty when the session comes from the environment
+        """
+        return []
+
+    def command_env(self) -> dict | None:
+        """
+        Environment of every op command run with this sign in
+
+        :return: Environment variables, None inherits os.environ
+        """
+        return None
+
 
 class ManualSignIn(SignIn):
     """
@@ -76,9 +111,14 @@ class ManualSignIn(SignIn):
     """
 
     _env_session = "OP_SESSION"
+    # The password is piped to op, set to True to answer its prompt through a pseudo terminal with pexpect instead
+    use_pty = False
 
     def __init__(self, account: str | None = None, password: str | None = None) -> None:
         # pragma: no cover
+        self.account = account
+        self.encrypted_master_password = None
+        self.session_key = None
         bp = BashProfile()
         os.environ["OP_DEVICE"] = get_device_uuid(bp)
         # reuse existing op session
@@ -147,15 +187,30 @@ class ManualSignIn(SignIn):
                 tries += 1
                 pass
             else:
-                self._update_bash_account(account, bp)
-                os.environ["{}_{}".format(self._env_session, account)] = session_key.replace("\n", "")
-                bp.update_profile("{}_{}".format(self._env_session, account), session_key.replace("\n", ""))
+                self.account = account
+                with bp.batch():
+                    self._update_bash_account(account, bp)
+                    os.environ["{}_{}".format(self._env_session, account)] = session_key.replace("\n", "")
+                    bp.update_profile("{}_{}".format(self._env_session, account), session_key.replace("\n", ""))
                 encrypt = Encryption(session_key)
                 encrypted_str = encrypt.encode(password)
                 return encrypted_str, session_key
         raise OnePasswordForgottenPassword("You appear to have forgotten your password, visit: "
                                            "https://support.1password.com/forgot-master-password/")
 
+    def reauthenticate(self) -> None:  # pragma: no cover
+        """
+        Sign in again with the account and encrypted password of the last sign in, only asks for the password if this
+        instance never signed in itself
+        """
+        master_password = None
+        if self.encrypted_master_password is not None:
+            master_password = Encryption(self.session_key).decode(self.encrypted_master_password)
+        self.encrypted_master_password, self.session_key = self.signin_wrapper(
+            account=self.account,
+            master_password=master_password
+        )
+
     def signin(
             self, account: str | None = None, domain: str | None = None, email: str | None = None,
             secret_key: str | None = None, master_password: str | None = None
@@ -172,7 +227,6 @@ class ManualSignIn(SignIn):
         :return: master_password, sess_key, domain, bp - all used by wrapper
         """
         bp = BashProfile()
-        op_command = ""
         if master_password is not None:
             master_password = str.encode(master_password)
         else:
@@ -184,21 +238,19 @@ class ManualSignIn(SignIn):
             else:
                 master_password = str.encode(getpass("Please input your 1Password master password: "))
         if secret_key:
-            op_command = "op account add --address {} --email {} --secret-key {} --shorthand {} --signin --raw".format(
-                domain, email, secret_key, account)
+            op_args = ["account", "add", "--address", domain, "--email", email, "--secret-key", secret_key,
+                       "--shorthand", account, "--signin", "--raw"]
         else:
             if account is None:
                 try:
                     session_dict = bp.get_key_value(self._env_session, fuzzy=True)[0]  # list of dicts from BashProfile
                     account = list(session_dict.keys())[0].split(self._env_session + "_")[1]
-                except AttributeError:
+                except ValueError:
                     account = input("Please input your 1Password account name e.g. wandera from "
                                     "wandera.1password.com: ")
-                except ValueError:
-                    raise ValueError("First signin failed or not executed.")
 
-            op_command = "op signin --account {} --raw".format(account)
-        sess_key = _spawn_signin(op_command, master_password)
+            op_args = ["signin", "--account", account, "--raw"]
+        sess_key = signin_with_password(op_args, master_password, use_pty=self.use_pty)
         return master_password, sess_key, domain, account, bp
 
 
@@ -211,14 +263,16 @@ class AppSignIn(SignIn):
         (Optional, default = None)
     """
     def __init__(self, account: str | None = None) -> None:
+        self.account = account
         self.signin(account)
 
     @staticmethod
     def _do_signin(account: str) -> CompletedProcess[Any] | CompletedProcess[str]:
-        return subprocess.run("op signin --account {}".format(account), shell=True, capture_output=True, text=True)
+        return run_op(["signin", "--account", account], check=False)
 
     @staticmethod
     def _do_open_app(default_error: str) -> CompletedProcess[Any] | CompletedProcess[str]:
+        import platform
         if platform.system() == "Darwin":
             return subprocess.run("open -a 1Password.app", shell=True)
         elif platform.system() == "Linux":
@@ -251,6 +305,13 @@ class AppSignIn(SignIn):
             account = self.get_account(bash_profile)
         self._signin_wrapper(account)
         self._update_bash_account(account, bash_profile)
+        self.account = account
+
+    def reauthenticate(self) -> None:
+        """
+        Sign in again through the app with the account of the last sign in
+        """
+        self.signin(self.account)
 
 
 class ServiceSignIn(SignIn):
@@ -261,13 +322,211 @@ class ServiceSignIn(SignIn):
         if os.environ['OP_SERVICE_ACCOUNT_TOKEN'] != "":
             print("Using service account, for supported commands see: "
                   "https://developer.1password.com/docs/service-accounts/use-with-1password-cli#supported-commands")
-            self.account_details = yaml.safe_load(read_bash_return("op user get --me", single=False))
+            import yaml
+            self.account_details = yaml.safe_load(run_op(["user", "get", "--me"]).stdout)
             self.account = self.account_details["Name"]
         else:
             print("No service account found, please setup on the web version of 1Password for more information go here:"
                   " https://developer.1password.com/docs/service-accounts/use-with-1password-cli")
 
 
+class IsolatedSignIn(SignIn):
+    """
+    Class to sign in to one of several accounts used by the same process. Nothing is written to os.environ or the
+    shell profile, instead every command gets the account as an argument and the session in its own environment, where
+    unlike the argument list it is not visible to other users of the machine.
+
+    :param account: Shorthand account name for your 1Password account e.g. wandera from wandera.1password.com.
+    :param password: 1Password password, None signs in through the app integration (Optional, default = None)
+    """
+    def __init__(self, account: str, password: str | None = None) -> None:
+        self.account = account
+        self.session_key = None
+        self._encryption = AuthenticatedEncryption()
+        self._encrypted_password = None if password is None else self._encryption.encode(password)
+        self.signin()
+
+    def signin(self) -> None:
+        """
+        Sign in to the account, with the password if one was given or else through the app integration
+        """
+        if self._encrypted_password is None:
+            r = run_op(["signin", "--account", self.account], check=False)
+            if r.returncode != 0:
+                raise ConnectionError(r.stderr.rstrip("\n"))
+            return
+        password = self._encryption.decode(self._encrypted_password).encode("utf-8")
+        session_key = signin_with_password(["signin", "--account", self.account, "--raw"], password)
+        if session_key is False:
+            raise OnePasswordForgottenPassword("Password for account {} is not correct".format(self.account))
+        self.session_key = session_key
+
+    def command_args(self) -> list:
+        """
+        Global arguments added in front of every op command run with this sign in
+
+        :return: The --account argument
+        """
+        return ["--account", self.account]
+
+    def command_env(self) -> dict | None:
+        """
+        Environment of every op command run with this sign in
+
+        :return: os.environ plus OP_SESSION_<account> once signed in with a password, None before
+        """
+        if self.session_key is None:
+            return None
+        return dict(os.environ, **{"OP_SESSION_{}".format(self.account): self.session_key})
+
+
+def get_signin_strategy(
+        signin_method: str = "app", account: str | None = None, password: str | None = None
+) -> SignIn:  # pragma: no cover
+    """
+    Sign in with the requested method, a service account token in the environment takes precedence
+
+    :param signin_method: Sign in method for 1Password (Optional, default = 'app', options: 'app', 'manual')
+    :param account: 1Password account name (Optional, default=None)
+    :param password: password of 1Password account (Optional, default=None)
+    :return: The signed in strategy
+    """
+    if SERVICE_ACCOUNT_TOKEN in os.environ.keys():
+        return ServiceSignIn()
+    if signin_method == "app":
+        return AppSignIn(account)
+    elif signin_method == "manual":
+        return ManualSignIn(account, password)
+    else:
+        raise ValueError("Unrecognised 'signin_method', options are: 'app' or 'manual'. "
+                         "See: https://developer.1password.com/docs/cli/verify")
+
+
+def load_document(document_str: str | None, docname: str, vault: str) -> dict | None:
+    """
+    Parse the contents of a document as JSON or YAML
+
+    :param document_str: Raw contents of the document
+    :param docname: Title of the document, used in the message when it cannot be parsed
+    :param vault: Vault the document is in, used in the message when it cannot be parsed
+    :returns: Parsed document or None if it is missing or not a mapping
+    """
+    if isinstance(document_str, str):
+        try:
+            return json.loads(document_str)
+        except JSONDecodeError:
+            import yaml
+            yaml_attempt = yaml.safe_load(document_str)
+            if isinstance(yaml_attempt, dict):
+                return yaml_attempt
+            else:
+                print("File {} does not exist in 1Password vault: {}".format(docname, vault))
+                return None
+    else:
+        return None
+
+
+def select_fields(item: dict, fields: str | list | None) -> dict:
+    """
+    Pick fields out of a full item by label, shaped like the output of get_item for the same fields
+
+    :param item: Full item as returned by op item get --format=json
+    :param fields: A field label or list of them, None returns the whole item
+    :return: Dictionary of the requested fields keyed by the label as requested
+    """
+    if isinstance(fields, list):
+        by_label = {}
+        for field in item.get("fields", []):
+            by_label.setdefault((field.get("label") or "").lower(), field)
+        # labels the item does not have are left out rather than filled with another field
+        return {label: by_label[label.lower()].get("value") for label in fields if label.lower() in by_label}
+    if isinstance(fields, str):
+        selected = [field for field in item.get("fields", [])
+                    if (field.get("label") or "").lower() == fields.lower()]
+        return {fields: selected[0].get("value", "") if selected else ""}
+    return item
+
+
+def split_reference(secret_ref: str) -> tuple[str, str, str | None, str]:
+    """
+    Split a secret reference of the form op://<vault>/<item>/[<section>/]<field>, query parameters are ignored
+
+    :param secret_ref: Reference to split
+    :return: vault, item, section or None, field
+    """
+    if not secret_ref or not isinstance(secret_ref, str):
+        raise ValueError("secret_ref must be a non-empty string")
+    parts = secret_ref.split("?")[0].split("/")
+    if not secret_ref.startswith("op://") or len(parts) not in (5, 6) or not all(parts[2:]):
+        raise ValueError("Invalid secret reference: {}".format(secret_ref))
+    return parts[2], parts[3], parts[4] if len(parts) == 6 else None, parts[-1]
+
+
+def reference_field(item: dict, section: str | None, field_name: str) -> dict | None:
+    """
+    Find the field a secret reference points at in a full item, sections and fields match by label or id ignoring case
+
+    :param item: Full item as returned by op item get --format=json
+    :param section: Section label or id, None matches fields in any section
+    :param field_name: Field label or id
+    :return: The field or None if the item has no such field
+    """
+    section_id = None
+    if section is not None:
+        for s in item.get("sections", []):
+            if section.lower() in ((s.get("id") or "").lower(), (s.get("label") or "").lower()):
+                section_id = s["id"]
+                break
+        else:
+            return None
+    for field in item.get("fields", []):
+        if field_name.lower() not in ((field.get("id") or "").lower(), (field.get("label") or "").lower()):
+            continue
+        if section is not None and (field.get("section") or {}).get("id") != section_id:
+            continue
+        return field
+    return None
+
+
+def reference_attribute(secret_ref: str) -> str:
+    """
+    Attribute a secret reference asks for with ?attribute=, e.g. otp, type or id
+
+    :param secret_ref: Reference to the secret
+    :return: Lower case attribute name, "value" when the reference does not name one
+    """
+    from urllib.parse import parse_qs
+    query = parse_qs(secret_ref.partition("?")[2])
+    return query.get("attribute", ["value"])[0].lower()
+
+
+def reference_value(item: dict, section: str | None, field_name: str, attribute: str = "value") -> str | None:
+    """
+    Value a secret reference resolves to in a full item
+
+    :param item: Full item as returned by op item get --format=json
+    :param section: Section label or id, None matches fields in any section
+    :param field_name: Field label or id
+    :param attribute: value, type, id, label, purpose, or otp/totp for the current code of an OTP field
+        (Optional, default=value)
+    :return: The value or None if the item has no such field
+    """
+    field = reference_field(item, section, field_name)
+    if field is None:
+        return None
+    if attribute in ("otp", "totp"):
+        if field.get("type") != "OTP":
+            raise ValueError("Field {} is not a one-time password".format(field_name))
+        # the totp op puts in the item is only current when it was fetched, so always compute it from the seed
+        if not field.get("value"):
+            raise ValueError("Field {} has no one-time password seed".format(field_name))
+        from onepassword.totp import parse_otp_seed, totp
+        seed = parse_otp_seed(field.get("value", ""))
+        return totp(seed["secret"], period=seed["period"], digits=seed["digits"], algorithm=seed["algorithm"])
+    if attribute in ("value", "type", "id", "label", "purpose"):
+        return str(field.get(attribute) or "")
+    raise ValueError("Unsupported attribute: {}".format(attribute))
+
 
 class OnePassword:
     """
@@ -276,32 +535,226 @@ class OnePassword:
     :param signin_method: Sign in method for 1Password (Optional, default = 'app', options: 'app', 'manual')
     :param account: 1Password account name (Optional, default=None)
     :param password: password of 1Password account (Optional, default=None)
+    :param uuid_cache_ttl: Seconds a vault listing is reused for title to uuid lookups, 0 disables the cache and None
+        never expires it (Optional, default=300)
+    :param cache: Cache for read, get_item and get_item_otp results (Optional, default=None which disables caching)
+    :param timeout: Seconds each op call may take before it is killed, None waits forever (Optional, default=None)
+    :param retry_policy: How failed op calls are retried, expired sessions are signed in again once
+        (Optional, default=None which uses RetryPolicy())
+    :param keep_alive: Refresh the session from a background thread before it expires, not used for service accounts
+        (Optional, default=False)
+    :param signin_strategy: Already signed in strategy to use instead of signing in with signin_method
+        (Optional, default=None)
+    :param governor: Limits on the op processes, share one between clients for a process wide limit
+        (Optional, default=None which uses onepassword.client.default_governor)
+    :param local_otp: Compute one-time passwords locally from the item's TOTP seed, which is fetched once and kept
+        encrypted in memory for an hour, instead of running op for every code (Optional, default=False)
+    :param prefetch: Secrets to load into the cache from a background thread right away, item uuids, op:// references
+        and {"document": title, "vault": vault} dictionaries, see ready and wait_ready. They are fetched again every
+        half cache ttl so they stay cached, a SecretCache with a one hour ttl is created when no cache is given
+        (Optional, default=None)
     """
-    def __init__(self, signin_method: str = "app", account: str | None = None, password: str | None = None) -> None:
+    def __init__(self, signin_method: str = "app", account: str | None = None, password: str | None = None,
+                 uuid_cache_ttl: float | None = 300, cache: SecretCache | None = None,
+                 timeout: float | None = None, retry_policy: RetryPolicy | None = None,
+                 keep_alive: bool = False, signin_strategy: SignIn | None = None,
+                 governor: CallGovernor | None = None, local_otp: bool = False, prefetch: list | None = None) -> None:
         # pragma: no cover
-        if SERVICE_ACCOUNT_TOKEN in os.environ.keys():
-            self.signin_strategy = ServiceSignIn()
+        self._item_index = ItemIndex(ttl=uuid_cache_ttl)
+        self._search_index = None
+        self.cache = cache
+        self.governor = default_governor if governor is None else governor
+        # identical get_item, read and get_item_otp calls in flight at the same time share one op process
+        self.singleflight = SingleFlight()
+        self.local_otp = local_otp
+        self._otp_seeds = SecretCache(ttl=3600) if local_otp else None
+        self.timeout = timeout
+        self.retry_policy = RetryPolicy() if retry_policy is None else retry_policy
+        if signin_strategy is None:
+            signin_strategy = get_signin_strategy(signin_method, account, password)
+        self.signin_strategy = signin_strategy
+        self._reauthenticator = Reauthenticator(lambda: self.signin_strategy.reauthenticate())
+        self.session = SessionKeepAlive(lambda: self._run("whoami"))
+        self.session.touch()
+        if keep_alive and not isinstance(self.signin_strategy, ServiceSignIn):
+            self.session.start()
+        self.prefetch_errors = {}
+        self._prefetched = threading.Event()
+        self._prefetch_stopped = threading.Event()
+        # cache keys of the prefetched secrets, ready checks they are still cached
+        self._prefetch_keys = []
+        if prefetch:
+            if self.cache is None:
+                self.cache = SecretCache(ttl=PREFETCH_CACHE_TTL)
+            threading.Thread(target=self._prefetch_in_background, args=(list(prefetch),),
+                             name="onepassword-prefetch", daemon=True).start()
+        else:
+            self._prefetched.set()
+
+    def _prefetch_in_background(self, targets: list) -> None:
+        refresh = False
+        while True:
+            try:
+                self.prefetch_errors = self.prefetch(targets, refresh=refresh)
+                self._prefetch_keys = self._prefetch_cache_keys(targets)
+            except Exception as e:
+                self.prefetch_errors = {None: e}
+            finally:
+                self._prefetched.set()
+            # fetch everything again halfway through the cache ttl, before the entries expire
+            if self._prefetch_stopped.wait(self.cache.ttl / 2):
+                return
+            refresh = True
+
+    def stop_prefetch(self) -> None:
+        """
+        Helper function to stop fetching the prefetched secrets again in the background, they then expire from the cache
+        after its ttl
+        """
+        self._prefetch_stopped.set()
+
+    def prefetch(self, targets: list, max_workers: int = 8, refresh: bool = False) -> dict:
+        """
+        Helper function to load secrets into the cache concurrently, references are resolved with one op call per item
+
+        :param targets: Item uuids, op:// references and {"document": title, "vault": vault} dictionaries
+        :param max_workers: Maximum number of op processes running at once (Optional, default=8)
+        :param refresh: Fetch the targets again even when they are cached, the cached values are replaced rather than
+            removed first so they can still be read meanwhile (Optional, default=False)
+        :return: Dictionary of the exception raised for each target that could not be loaded, documents are keyed by
+            their title
+        """
+        refs = [target for target in targets if isinstance(target, str) and target.startswith("op://")]
+        uuids = [target for target in targets if isinstance(target, str) and not target.startswith("op://")]
+        documents = [(target["document"], target.get("vault", "Private")) for target in targets
+                     if isinstance(target, dict)]
+        if refresh:
+            _, errors = self._map_concurrently(lambda uuid: self._fetch_item(uuid, ("item", uuid, None)), uuids,
+                                               max_workers)
         else:
-            if signin_method == "app":
-                self.signin_strategy = AppSignIn(account)
-            elif signin_method == "manual":
-                self.signin_strategy = ManualSignIn(account, password)
+            _, errors = self.get_items(uuids, max_workers=max_workers)
+        # list each vault once up front, otherwise every document would list its vault while the index is still cold,
+        # a vault that cannot be listed fails its documents below
+        vaults = [vault for vault in dict.fromkeys(vault for _, vault in documents)
+                  if not self._item_index.is_fresh(vault)]
+        self._map_concurrently(lambda vault: self.list_items(vault=vault), vaults, max_workers)
+        _, document_errors = self._map_concurrently(lambda document: self._get_document_str(*document, refresh),
+                                                    documents, max_workers)
+        errors.update({title: e for (title, vault), e in document_errors.items()})
+        errors.update(self._resolve(refs, max_workers, refresh)[1])
+        return errors
+
+    def _prefetch_cache_keys(self, targets: list) -> list:
+        keys = []
+        for target in targets:
+            if isinstance(target, dict):
+                document = self._item_index.get(target.get("vault", "Private"), target["document"])
+                if document is not None:
+                    keys.append(("document", document["id"]))
+            elif target.startswith("op://"):
+                # one-time passwords are never cached
+                if reference_attribute(target) not in ("otp", "totp"):
+                    keys.append(("read", target))
             else:
-                raise ValueError("Unrecognised 'signin_method', options are: 'app' or 'manual'. "
-                                 "See: https://developer.1password.com/docs/cli/verify")
+                keys.append(("item", target, None))
+        return keys
 
-    def get_uuid(self, docname: str, vault: str = "Private") -> str:  # pragma: no cover
+    def ready(self) -> bool:
         """
-        Helper function to get the uuid for an item
+        Whether the secrets given as prefetch are all in the cache, e.g. for a health check. Once one of them expires or
+        is evicted this is False again until it is loaded anew.
+
+        :return: True once prefetching finished without errors and while its secrets are cached, always True without
+            prefetch. The background refresh keeps it True unless it fails or is stopped with stop_prefetch.
+        """
+        if not self._prefetched.is_set() or self.prefetch_errors:
+            return False
+        return all(self.cache.contains(key) for key in self._prefetch_keys)
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        """
+        Wait for prefetching to finish
+
+        :param timeout: Seconds to wait (Optional, default=None which waits until it finishes)
+        :return: Same as ready
+        """
+        self._prefetched.wait(timeout)
+        return self.ready()
+
+    @property
+    def session_expires_at(self) -> datetime | None:
+        """
+        Time at which the op session expires if the client stays idle, None for service accounts which do not expire
+        """
+        if isinstance(self.signin_strategy, ServiceSignIn):
+            return None
+        return self.session.expires_at
+
+    def _run(self, *args: str, input: str | bytes | None = None, timeout: float | None = None,
+             idempotent: bool = True) -> bytes:
+        """
+        Run an op command under the retry policy, every CLI call of the client goes through here
+
+        :param args: Arguments passed to op
+        :param input: Data written to the standard input of op (Optional, default=None)
+        :param timeout: Seconds the call may take, overrides the client timeout (Optional, default=None)
+        :param idempotent: False for writes that must not run twice, transient failures are then not retried
+            (Optional, default=True)
+        :return: Standard output of the command
+        """
+        timeout = self.timeout if timeout is None else timeout
+
+        def call():
+            with self.governor.slot():
+                return run_op(self.signin_strategy.command_args() + list(args), input=input, timeout=timeout,
+                              env=self.signin_strategy.command_env()).stdout
+
+        stdout = call_with_retry(call, self.retry_policy, self._reauthenticator, idempotent=idempotent)
+        self.session.touch()
+        return stdout
+
+    def get_uuid(self, docname: str, vault: str = "Private") -> str:
+        """
+        Helper function to get the uuid for an item, the vault listing is cached for uuid_cache_ttl seconds
 
         :param docname: Title of the item (not filename of documents)
         :param vault: Vault the item is in (Optional, default=Private)
         :return: Uuid of item or None if it doesn't exist
         """
-        items = self.list_items(vault=vault)
-        for t in items:
-            if t["title"] == docname:
-                return t["id"]
+        if not self._item_index.is_fresh(vault):
+            self.list_items(vault=vault)
+        item = self._item_index.get(vault, docname)
+        if item is not None:
+            return item["id"]
+
+    def invalidate_uuid_cache(self, vault: str | None = None) -> None:
+        """
+        Helper function to forget cached vault listings used by get_uuid and search
+
+        :param vault: Vault to forget (Optional, default=None which forgets all vaults)
+        """
+        self._item_index.invalidate(vault)
+        if self._search_index is not None:
+            self._search_index.invalidate(vault)
+
+    def search(self, query: str, vaults: list | None = None, mode: str = "prefix", limit: int | None = None,
+               max_workers: int = 8) -> list:
+        """
+        Helper function to find items across vaults by the words in their title, tags, urls and category. Expired vault
+        listings are fetched in parallel, and are kept in an index for uuid_cache_ttl seconds.
+
+        :param query: Words that must all match
+        :param vaults: Vaults to search (Optional, default=None which searches every vault)
+        :param mode: How words match, "exact", "prefix" or "fuzzy" (Optional, default=prefix)
+        :param limit: Maximum number of results (Optional, default=None which returns every match)
+        :param max_workers: Maximum number of op processes running at once (Optional, default=8)
+        :return: Item summaries, best matches first, each with the vault it was found in under "vault_name"
+        """
+        from onepassword.search import SearchIndex, search_vaults
+        if self._search_index is None:
+            self._search_index = SearchIndex(ttl=self._item_index.ttl)
+        return search_vaults(self, self._search_index, query, vaults=vaults, mode=mode, limit=limit,
+                             max_workers=max_workers)
 
     def get_document(self, docname: str, vault: str = "Private") -> dict | None:  # pragma: no cover
         """
@@ -312,19 +765,7 @@ class OnePassword:
         :returns: Document or None if it doesn't exist
 
         """
-        document_str = self.get_document_str(docname, vault)
-        if isinstance(document_str, str):
-            try:
-                return json.loads(document_str)
-            except JSONDecodeError:
-                yaml_attempt = yaml.safe_load(document_str)
-                if isinstance(yaml_attempt, dict):
-                    return yaml_attempt
-                else:
-                    print("File {} does not exist in 1Password vault: {}".format(docname, vault))
-                    return None
-        else:
-            return None
+        return load_document(self.get_document_str(docname, vault), docname, vault)
 
     def get_document_str(self, docname: str, vault: str = "Private") -> str | None:  # pragma: no cover
         """
@@ -337,29 +778,153 @@ class OnePassword:
         :rtype: str | None
 
         """
+        return self._get_document_str(docname, vault)
+
+    def _get_document_str(self, docname: str, vault: str, refresh: bool = False) -> str | None:
         docid = self.get_uuid(docname, vault=vault)
         document = None
         if isinstance(docid, str):
-            document = read_bash_return("op document get {} --vault='{}'".format(docid, vault), single=False)
+            key = ("document", docid)
+            document = None if refresh else self._cache_get(key)
+            if document is None:
+                document = self._run("document", "get", docid, "--vault", vault).decode("utf-8")
+                self._cache_set(key, document)
         return document
 
-    def put_document(self, filename: str, title: str, vault: str = "Private") -> None:  # pragma: no cover
+    def iter_document(self, docname: str, vault: str = "Private", chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """
+        Helper function to stream a document as raw bytes, so large or binary documents are never held in memory whole.
+        The client timeout covers the whole download, and an expired session is signed in again before the first chunk.
+
+        :param docname: Title of the document (not it's filename)
+        :param vault: Vault the document is in (Optional, default=Private)
+        :param chunk_size: Maximum number of bytes per chunk (Optional, default=65536)
+        :returns: Iterator over the chunks of the document, empty if the document doesn't exist
         """
-        Helper function to put a document
+        docid = self.get_uuid(docname, vault=vault)
+        if not isinstance(docid, str):
+            return
+        args = self.signin_strategy.command_args() + ["document", "get", docid, "--vault", vault]
+
+        def start():
+            # starting the download is retried like any other call since nothing has been yielded yet, only this part
+            # holds a governor slot so the consumer may call the client while iterating
+            with self.governor.slot():
+                stream = OpStream(args, timeout=self.timeout, env=self.signin_strategy.command_env())
+                try:
+                    return stream, stream.read(chunk_size)
+                except BaseException:
+                    stream.close()
+                    raise
 
-        :param filename: Path and filename of document (must be saved locally already)
+        stream, chunk = call_with_retry(start, self.retry_policy, self._reauthenticator)
+        self.session.touch()
+        try:
+            while chunk:
+                yield chunk
+                chunk = stream.read(chunk_size)
+        finally:
+            stream.close()
+
+    def get_document_to(
+            self, destination: str | os.PathLike | BinaryIO, docname: str, vault: str = "Private",
+            chunk_size: int = 64 * 1024
+    ) -> int | None:
+        """
+        Helper function to stream a document straight into a file. A path is only replaced once the whole document
+        has been downloaded.
+
+        :param destination: Path to write to or a file object opened in binary mode
+        :param docname: Title of the document (not it's filename)
+        :param vault: Vault the document is in (Optional, default=Private)
+        :param chunk_size: Maximum number of bytes read at once (Optional, default=65536)
+        :returns: Number of bytes written or None if the document doesn't exist
+        """
+        if self.get_uuid(docname, vault=vault) is None:
+            return None
+        if hasattr(destination, "write"):
+            return self._write_document(destination, docname, vault, chunk_size)
+        partial = "{}.part".format(os.fspath(destination))
+        try:
+            with open(partial, "wb") as f:
+                written = self._write_document(f, docname, vault, chunk_size)
+            os.replace(partial, destination)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        return written
+
+    def _write_document(self, f: BinaryIO, docname: str, vault: str, chunk_size: int) -> int:
+        written = 0
+        for chunk in self.iter_document(docname, vault=vault, chunk_size=chunk_size):
+            f.write(chunk)
+            written += len(chunk)
+        return written
+
+    def put_document(
+            self, filename: str | os.PathLike | bytes | BinaryIO, title: str, vault: str = "Private",
+            file_name: str | None = None
+    ) -> bool:  # pragma: no cover
+        """
+        Helper function to put a document. The SHA-256 digest of the content is stored as a tag, nothing is uploaded
+        if a document with this title already has the same content.
+
+        :param filename: Path and filename of document, or its content as bytes or a binary file object
         :param title: Title you wish to call the document
         :param vault: Vault the document is in (Optional, default=Private)
+        :param file_name: File name stored with content passed as bytes or a file object (Optional, default=None)
+        :return: True if the document was uploaded, False if it was unchanged
         """
-        cmd = "op document create {} --title={} --vault='{}'".format(filename, title, vault)
-        # [--tags=<tags>]
-        response = read_bash_return(cmd)
-        if len(response) == 0:
-            self.signin_strategy.signin()
-            read_bash_return(cmd)
-            # self.signout()
-        # else:
-        # self.signout()
+        digest, filename = content_digest(filename)
+        existing = self._document_summary(title, vault, digest)
+        if existing is not None and self._digest_tag(digest) in existing.get("tags", []):
+            return False
+        return self._create_document(filename, title, vault, file_name, digest)
+
+    def _create_document(
+            self, document: str | os.PathLike | bytes, title: str, vault: str, file_name: str | None, digest: str
+    ) -> bool:
+        tags = [self._digest_tag(digest)]
+        r = self._document_command(["document", "create"], document,
+                                   ["--title", title, "--vault", vault, "--tags", ",".join(tags), "--format=json"],
+                                   file_name, idempotent=False)
+        try:
+            self._item_index.set(vault, title, {"id": json.loads(r)["uuid"], "title": title, "tags": tags})
+        except (JSONDecodeError, KeyError, TypeError):
+            self._item_index.invalidate(vault)
+        return True
+
+    def _document_summary(self, title: str, vault: str, digest: str) -> dict | None:
+        """
+        Summary of the document with a title. A miss or a matching digest is only trusted from a listing taken now,
+        otherwise a document created elsewhere since the listing was cached would get a duplicate or a stale skip.
+        """
+        listed = not self._item_index.is_fresh(vault)
+        if listed:
+            self.list_items(vault=vault)
+        existing = self._item_index.get(vault, title)
+        if not listed and (existing is None or self._digest_tag(digest) in existing.get("tags", [])):
+            self.list_items(vault=vault)
+            existing = self._item_index.get(vault, title)
+        return existing
+
+    @staticmethod
+    def _digest_tag(digest: str) -> str:
+        return DIGEST_TAG_PREFIX + digest
+
+    def _document_command(
+            self, args: list, document: str | os.PathLike | bytes | BinaryIO, flags: list, file_name: str | None,
+            idempotent: bool = True
+    ) -> bytes:
+        stdin = None
+        if isinstance(document, (str, os.PathLike)):
+            args = args + [os.fspath(document)] + flags
+        else:
+            stdin = document if isinstance(document, bytes) else document.read()
+            args = args + ["-"] + flags
+            if file_name is not None:
+                args += ["--file-name", file_name]
+        return self._run(*args, input=stdin, idempotent=idempotent)
 
     def delete_document(self, title: str, vault: str = "Private") -> None:  # pragma: no cover
         """
@@ -369,89 +934,181 @@ class OnePassword:
         :param vault: Vault the document is in (Optional, default=Private)
         """
         docid = self.get_uuid(title, vault=vault)
-        cmd = "op item delete {} --vault='{}'".format(docid, vault)
-        response = read_bash_return(cmd)
-        if len(response) > 0:
-            self.signin_strategy.signin()
-            read_bash_return(cmd)
-            # self.signout()
-        # else:
-        # self.signout()
-
-    def update_document(self, filename: str, title: str, vault: str = 'Private') -> None:  # pragma: no cover
+        if docid is None:
+            return
+        self._run("item", "delete", docid, "--vault", vault, idempotent=False)
+        self._item_index.discard(vault, title)
+        self.invalidate(docid)
+
+    def update_document(
+            self, filename: str | os.PathLike | bytes | BinaryIO, title: str, vault: str = 'Private',
+            file_name: str | None = None, remove_file: bool = False
+    ) -> bool:  # pragma: no cover
         """
-        Helper function to update an existing document in 1Password.
+        Helper function to update an existing document in 1Password in place, the document keeps its uuid.
+        If the document does not exist yet it is created, if its content digest tag matches nothing is uploaded.
 
+        :param filename: Path and filename of document, or its content as bytes or a binary file object.
         :param title: Name of the document in 1Password.
-        :param filename: Path and filename of document (must be saved locally already).
         :param vault: Vault the document is in (Optional, default=Private).
+        :param file_name: File name stored with content passed as bytes or a file object (Optional, default=None).
+        :param remove_file: Remove the local file once handled, only used for paths (Optional, default=False).
+        :return: True if the document was uploaded, False if it was unchanged
         """
+        digest, content = content_digest(filename)
+        existing = self._document_summary(title, vault, digest)
+        if existing is None:
+            uploaded = self._create_document(content, title, vault, file_name, digest)
+        elif self._digest_tag(digest) in existing.get("tags", []):
+            uploaded = False
+        else:
+            tags = [tag for tag in existing.get("tags", []) if not tag.startswith(DIGEST_TAG_PREFIX)]
+            tags.append(self._digest_tag(digest))
+            self._document_command(["document", "edit", existing["id"]], content,
+                                   ["--vault", vault, "--tags", ",".join(tags)], file_name)
+            self._item_index.set(vault, title, dict(existing, tags=tags))
+            self.invalidate(existing["id"])
+            uploaded = True
+
+        if remove_file and isinstance(filename, (str, os.PathLike)):
+            os.remove(filename)
+        return uploaded
+
+    def invalidate(self, name: str) -> None:
+        """
+        Helper function to drop cached results for an item uuid or a secret reference
 
-        # delete the old document
-        self.delete_document(title, vault=vault)
+        :param name: Uuid of the item or reference of the secret
+        """
+        if self.cache is not None:
+            self.cache.invalidate(name)
+        if self._otp_seeds is not None:
+            self._otp_seeds.invalidate(name)
 
-        # put the new updated one
-        self.put_document(filename, title, vault=vault)
+    def _cache_get(self, key: tuple) -> str | dict | list | None:
+        if self.cache is None:
+            return None
+        return self.cache.get(key)
 
-        # remove the saved file locally
-        os.remove(filename)
+    def _cache_set(self, key: tuple, value: str | dict | list, ttl: float | None = None) -> None:
+        if self.cache is not None:
+            self.cache.set(key, value, ttl=ttl)
 
-    @staticmethod
-    def signout():
+    def signout(self):
         """
         Helper function to sign out of 1Password
         """
-        read_bash_return("op signout")
+        self._run("signout")
 
-    @staticmethod
-    def list_vaults():
+    def list_vaults(self):
         """
         Helper function to list all vaults
         """
-        return json.loads(read_bash_return("op vault list --format=json", single=False))
+        return json.loads(self._run("vault", "list", "--format=json"))
 
-    @staticmethod
-    def list_items(vault: str = "Private") -> dict:
+    def list_items(self, vault: str = "Private") -> dict:
         """
-        Helper function to list all items in a certain vault
+        Helper function to list all items in a certain vault, also refreshes the cache used by get_uuid
 
         :param vault: Vault the items are in (Optional, default=Private)
         :returns: Dictionary of all items
         """
-        items = json.loads(read_bash_return("op items list --vault='{}' --format=json".format(vault), single=False))
+        items = json.loads(self._run("items", "list", "--vault", vault, "--format=json"))
+        self._item_index.load(vault, items)
         return items
 
-    @staticmethod
-    def get_item(uuid: str | bytes, fields: str | bytes | list | None = None):
+    def get_item(self, uuid: str | bytes, fields: str | bytes | list | None = None):
         """
         Helper function to get a certain field, you can find the UUID you need using list_items
 
         :param uuid: Uuid of the item you wish to get, no vault needed
-        :param fields: To return only certain detail use either a specific field or list of them
+        :param fields: To return only certain detail use either a specific field label or list of them, they are
+            picked from the full item so asking for other fields of a cached item costs no op call
             (Optional, default=None which means all fields returned)
         :return: Dictionary of the item with requested fields
         """
-        if isinstance(fields, list):
-            item_list = json.loads(read_bash_return(
-                "op item get {} --format=json --fields label={}".format(uuid, ",label=".join(fields)),
-                single=False))
-            item = {}
-            if isinstance(item_list, dict):
-                item[fields[0]] = item_list["value"]
-            else:
-                for i in item_list:
-                    item[i["id"]] = i["value"]
-        elif isinstance(fields, str):
-            item = {
-                fields: read_bash_return(
-                    "op item get {} --fields label={}".format(uuid, fields), single=False).rstrip('\n')
-            }
-        else:
-            item = json.loads(read_bash_return("op item get {} --format=json".format(uuid), single=False))
+        if isinstance(uuid, bytes):
+            uuid = uuid.decode("utf-8")
+        if isinstance(fields, bytes):
+            fields = fields.decode("utf-8")
+        key = ("item", uuid, None)
+        item = self._cache_get(key)
+        if item is None:
+            item = self.singleflight.do(key, lambda: self._fetch_item(uuid, key))
+        return select_fields(item, fields)
+
+    def _fetch_item(self, uuid: str, key: tuple) -> dict:
+        item = json.loads(self._run("item", "get", uuid, "--format=json"))
+        self._cache_set(key, item)
         return item
 
+    def get_items(
+            self, uuids: list, fields: str | bytes | list | None = None, max_workers: int = 8
+    ) -> tuple[dict, dict]:
+        """
+        Helper function to get many items concurrently, each item is fetched as with get_item
+
+        :param uuids: Uuids of the items you wish to get, no vault needed
+        :param fields: To return only certain detail use either a specific field or list of them
+            (Optional, default=None which means all fields returned)
+        :param max_workers: Maximum number of op processes running at once (Optional, default=8)
+        :return: Dictionary of items keyed by uuid and dictionary of the exception raised for each failed uuid
+        """
+        return self._map_concurrently(lambda uuid: self.get_item(uuid, fields), uuids, max_workers)
+
     @staticmethod
-    def read(secret_ref: str):
+    def _map_concurrently(function, keys: list, max_workers: int) -> tuple[dict, dict]:
+        """
+        Call a function for every distinct key from a thread pool
+
+        :return: Dictionary of results keyed by key and dictionary of the exception raised for each failed key
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        keys = list(dict.fromkeys(keys))
+        results, errors = {}, {}
+        if not keys:
+            return results, errors
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(keys))) as executor:
+            futures = {key: executor.submit(function, key) for key in keys}
+            for key, future in futures.items():
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    errors[key] = e
+        return results, errors
+
+    def sync_vault(self, vault: str, store: MutableMapping, max_workers: int = 8) -> "ChangeSet":
+        """
+        Helper function to keep a local snapshot of a vault, costs one listing plus a get_item for each item that was
+        added or changed since the last sync
+
+        :param vault: Vault to sync
+        :param store: Snapshot to update in place, maps uuid to a dictionary with the "version", "updated_at" and full
+            "item", start with an empty dictionary
+        :param max_workers: Maximum number of op processes running at once (Optional, default=8)
+        :return: Uuids of the added, changed and removed items
+        """
+        from onepassword.sync import sync_vault
+        return sync_vault(self, vault, store, max_workers=max_workers)
+
+    def watch(self, vaults: list, callback, interval: float = 30, **kwargs) -> "VaultWatcher":
+        """
+        Helper function to get called back when items of some vaults are added, changed or removed, e.g. to reload
+        rotated credentials. Each poll costs one listing per vault plus a get_item for each item that changed, and
+        cached secrets of changed items are dropped.
+
+        :param vaults: Names of the vaults to watch
+        :param callback: Called with an ItemEvent for every change, from a worker thread
+        :param interval: Seconds between two polls (Optional, default=30)
+        :param kwargs: jitter, max_backoff, on_error and max_workers, see VaultWatcher
+        :return: The started watcher, call stop on it to stop watching
+        """
+        from onepassword.watch import VaultWatcher
+        return VaultWatcher(self, vaults, callback, interval=interval, **kwargs).start()
+
+    def read(self, secret_ref: str):
         """
         Helper function to read a secret based on its reference(ex: op://<vault>/<item>/<field>)
         You can get this reference from the UI or by using this command:
@@ -463,14 +1120,198 @@ class OnePassword:
         if not secret_ref or not isinstance(secret_ref, str):
             raise ValueError("secret_ref must be a non-empty string")
 
-        return read_bash_return("op read '{}'".format(secret_ref))
+        key = ("read", secret_ref)
+        secret = self._cache_get(key)
+        if secret is None:
+            secret = self.singleflight.do(key, lambda: self._fetch_secret(secret_ref, key))
+        return secret
+
+    def _fetch_secret(self, secret_ref: str, key: tuple) -> str:
+        # op ends the value with a newline, values spanning several lines (keys, certificates) are kept whole
+        secret = self._run("read", secret_ref).decode("utf-8")
+        if secret.endswith("\n"):
+            secret = secret[:-1]
+        self._cache_set(key, secret)
+        return secret
+
+    def read_many(self, secret_refs: list) -> dict:
+        """
+        Helper function to read many secrets with a single op inject call instead of one op read per reference.
+        If op inject fails the references are split in halves and retried, so only failing references end up being
+        read one at a time with read.
 
-    @staticmethod
-    def get_item_otp(uuid: str | bytes):
+        :param secret_refs: References to the secrets you wish to read (ex: op://<vault>/<item>/<field>)
+        :return: Dictionary of the secrets in plain text keyed by reference
+        """
+        for secret_ref in secret_refs:
+            if not secret_ref or not isinstance(secret_ref, str):
+                raise ValueError("secret_refs must be non-empty strings")
+        secret_refs = list(dict.fromkeys(secret_refs))
+        secrets_by_ref = {}
+        for secret_ref in secret_refs:
+            secret = self._cache_get(("read", secret_ref))
+            if secret is not None:
+                secrets_by_ref[secret_ref] = secret
+        missing = [secret_ref for secret_ref in secret_refs if secret_ref not in secrets_by_ref]
+        pending = [missing] if missing else []
+        while pending:
+            refs = pending.pop()
+            if len(refs) == 1:
+                secrets_by_ref[refs[0]] = self.read(refs[0])
+                continue
+            injected = self._inject(refs)
+            if injected is None:
+                middle = len(refs) // 2
+                pending.extend([refs[middle:], refs[:middle]])
+            else:
+                secrets_by_ref.update(injected)
+                for secret_ref, secret in injected.items():
+                    self._cache_set(("read", secret_ref), secret)
+        return {ref: secrets_by_ref[ref] for ref in secret_refs}
+
+    def _inject(self, secret_refs: list) -> dict | None:
+        marker = os.urandom(8).hex()
+        template = "".join(
+            "<{0}:{1}>{{{{ {2} }}}}</{0}:{1}>".format(marker, i, ref) for i, ref in enumerate(secret_refs))
+        try:
+            output = self._run("inject", input=template).decode("utf-8")
+        except (OnePasswordAuthError, OnePasswordTimeoutError, OnePasswordTransientError):
+            raise
+        except OnePasswordCommandError:
+            return None
+        injected = {}
+        for i, ref in enumerate(secret_refs):
+            start_tag, end_tag = "<{}:{}>".format(marker, i), "</{}:{}>".format(marker, i)
+            start = output.find(start_tag)
+            end = output.find(end_tag, start)
+            if start == -1 or end == -1:
+                return None
+            injected[ref] = output[start + len(start_tag):end]
+        return injected
+
+    def resolve(self, secret_refs: list, max_workers: int = 8) -> dict:
+        """
+        Helper function to read many secrets with one op call per distinct item rather than per reference. References
+        are grouped by vault and item, every item is fetched once as full JSON and all of its fields are picked out
+        locally, including section qualified references and ?attribute=otp (or type, id, label, purpose).
+
+        :param secret_refs: References to the secrets you wish to read (ex: op://<vault>/<item>/[<section>/]<field>)
+        :param max_workers: Maximum number of op processes running at once (Optional, default=8)
+        :return: Dictionary of the secrets in plain text keyed by reference
+        """
+        secrets, errors = self._resolve(secret_refs, max_workers)
+        if errors:
+            raise next(iter(errors.values()))
+        return secrets
+
+    def _resolve(self, secret_refs: list, max_workers: int, refresh: bool = False) -> tuple[dict, dict]:
         """
-        Helper function to get the item otp, you can find the UUID you need using list_items
+        Resolve references as with resolve, without letting one failing reference fail the others, refresh skips the
+        cached secrets
+
+        :return: Dictionary of the secrets keyed by reference and dictionary of the exception raised for each failed
+            reference
+        """
+        parsed, groups, secrets_by_ref, errors = {}, {}, {}, {}
+        for secret_ref in dict.fromkeys(secret_refs):
+            try:
+                parsed[secret_ref] = split_reference(secret_ref)
+            except ValueError as e:
+                errors[secret_ref] = e
+                continue
+            secret = None if refresh else self._cache_get(("read", secret_ref))
+            if secret is not None:
+                secrets_by_ref[secret_ref] = secret
+            else:
+                vault, item_name = parsed[secret_ref][:2]
+                groups.setdefault((vault, item_name), []).append(secret_ref)
+        items, item_errors = self._map_concurrently(lambda key: self._reference_item(*key), list(groups), max_workers)
+        for key, refs in groups.items():
+            for secret_ref in refs:
+                if key in item_errors:
+                    errors[secret_ref] = item_errors[key]
+                    continue
+                vault, item_name, section, field_name = parsed[secret_ref]
+                attribute = reference_attribute(secret_ref)
+                secret = reference_value(items[key], section, field_name, attribute)
+                if secret is None:
+                    errors[secret_ref] = OnePasswordNotFoundError(
+                        ["read", secret_ref], None, "field \"{}\" not found in {}".format(field_name, item_name))
+                    continue
+                if attribute not in ("otp", "totp"):
+                    self._cache_set(("read", secret_ref), secret)
+                secrets_by_ref[secret_ref] = secret
+        return {secret_ref: secrets_by_ref[secret_ref] for secret_ref in parsed if secret_ref in secrets_by_ref}, errors
+
+    def _reference_item(self, vault: str, item_name: str) -> dict:
+        """
+        Full item a reference points at, by title or uuid
+        """
+        return self.singleflight.do(("item-ref", vault, item_name), lambda: json.loads(
+            self._run("item", "get", item_name, "--vault", vault, "--format=json")))
+
+    def get_item_otp(self, uuid: str | bytes):
+        """
+        Helper function to get the item otp, you can find the UUID you need using list_items.
+        A cached otp is only kept until the end of its 30 second window. With local_otp the code is computed from the
+        cached TOTP seed instead.
 
         :param uuid: Uuid of the item you wish to get, no vault needed
         :return: the otp of the item, if it exists
         """
-        return read_bash_return("op item get {} --otp".format(uuid), single=False).rstrip('\n')
+        if isinstance(uuid, bytes):
+            uuid = uuid.decode("utf-8")
+        if self.local_otp:
+            from onepassword.totp import totp
+            seed = self._otp_seed(uuid)
+            return totp(seed["secret"], period=seed["period"], digits=seed["digits"], algorithm=seed["algorithm"])
+        key = ("otp", uuid)
+        otp = self._cache_get(key)
+        if otp is None:
+            otp = self.singleflight.do(key, lambda: self._fetch_otp(uuid, key))
+        return otp
+
+    def _fetch_otp(self, uuid: str, key: tuple) -> str:
+        otp = self._run("item", "get", uuid, "--otp").decode("utf-8").rstrip('\n')
+        ttl = 30 - time.time() % 30
+        if self.cache is not None:
+            ttl = min(ttl, self.cache.ttl)
+        self._cache_set(key, otp, ttl=ttl)
+        return otp
+
+    def _otp_seed(self, uuid: str, item: dict | None = None) -> dict:
+        """
+        TOTP seed of an item, fetched with get_item unless the item is given and cached encrypted in memory
+        """
+        from onepassword.totp import item_otp_seed
+        key = ("otp-seed", uuid)
+        seed = self._otp_seeds.get(key)
+        if seed is None:
+            seed = item_otp_seed(self.get_item(uuid) if item is None else item)
+            self._otp_seeds.set(key, seed)
+        return seed
+
+    def get_otps(self, uuids: list, max_workers: int = 8) -> tuple[dict, dict]:
+        """
+        Helper function to get the otp of many items concurrently, with local_otp only items whose seed is not cached
+        yet are fetched
+
+        :param uuids: Uuids of the items you wish to get the otp of
+        :param max_workers: Maximum number of op processes running at once (Optional, default=8)
+        :return: Dictionary of otps keyed by uuid and dictionary of the exception raised for each failed uuid
+        """
+        uuids = [uuid.decode("utf-8") if isinstance(uuid, bytes) else uuid for uuid in uuids]
+        if not self.local_otp:
+            return self._map_concurrently(self.get_item_otp, uuids, max_workers)
+        missing = [uuid for uuid in dict.fromkeys(uuids) if self._otp_seeds.get(("otp-seed", uuid)) is None]
+        items, errors = self.get_items(missing, max_workers=max_workers)
+        otps = {}
+        for uuid in dict.fromkeys(uuids):
+            if uuid in errors:
+                continue
+            try:
+                self._otp_seed(uuid, items.get(uuid))
+                otps[uuid] = self.get_item_otp(uuid)
+            except ValueError as e:
+                errors[uuid] = e
+        return otps, errors
@@ -0,0 +1,380 @@
+import os
+import json
+import threading
+import http.client
+from urllib.parse import quote, urlsplit
+from onepassword.cache import ItemIndex, SecretCache
+from onepassword.client import load_document, reference_attribute, reference_value, select_fields, split_reference
+from onepassword.exceptions import OnePasswordAuthError, OnePasswordCommandError, OnePasswordNotFoundError, \
+    OnePasswordTimeoutError, OnePasswordTransientError
+from onepassword.retry import RetryPolicy, call_with_retry
+
+CONNECT_HOST = "OP_CONNECT_HOST"
+CONNECT_TOKEN = "OP_CONNECT_TOKEN"
+
+
+def connect_error(method: str, path: str, status: int | None, message: str = "") -> OnePasswordCommandError:
+    """
+    Build the most specific exception for a failed Connect request from its HTTP status
+
+    :param method: HTTP method of the request
+    :param path: Path of the request
+    :param status: HTTP status of the response, None if no response arrived
+    :param message: Error message of the response
+    :return: Exception to raise
+    """
+    command = [method, path]
+    if status in (401, 403):
+        return OnePasswordAuthError(command, status, message)
+    if status == 404:
+        return OnePasswordNotFoundError(command, status, message)
+    if status is None or status == 429 or status >= 500:
+        return OnePasswordTransientError(command, status, message)
+    return OnePasswordCommandError(command, status, message)
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP connections to one host, shared between threads. Each request borrows an idle connection or opens
+    a new one and returns it afterwards, so concurrent requests use separate connections.
+
+    :param url: Base url of the server e.g. http://localhost:8080
+    :param max_idle: Maximum number of idle connections kept open (Optional, default=8)
+    :param timeout: Socket timeout in seconds, None waits forever (Optional, default=None)
+    """
+    def __init__(self, url: str, max_idle: int = 8, timeout: float | None = None) -> None:
+        parts = urlsplit(url if "://" in url else "http://" + url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError("Unsupported scheme: {}".format(parts.scheme))
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.opened = 0
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        connection_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        with self._lock:
+            self.opened += 1
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method: str, path: str, headers: dict) -> tuple[int, bytes]:
+        """
+        Send a request on a pooled connection, a stale idle connection is replaced once
+
+        :param method: HTTP method
+        :param path: Path below the base url
+        :param headers: Request headers
+        :return: HTTP status and body of the response
+        """
+        with self._lock:
+            connection = self._idle.pop() if self._idle else None
+        reused = connection is not None
+        if connection is None:
+            connection = self._connect()
+        while True:
+            try:
+                connection.request(method, self.base_path + path, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+                break
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                connection.close()
+                if not reused:
+                    raise
+                # the server closed the idle connection, retry once on a fresh one
+                reused = False
+                connection = self._connect()
+            except BaseException:
+                connection.close()
+                raise
+        if response.will_close:
+            connection.close()
+        else:
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(connection)
+                    connection = None
+            if connection is not None:
+                connection.close()
+        return response.status, body
+
+    def close(self) -> None:
+        """
+        Close every idle connection
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+class ConnectOnePassword:
+    """
+    Client for a 1Password Connect server with the same read methods as OnePassword. Requests go over pooled keep-alive
+    HTTP connections instead of starting an op process for every call.
+
+    :param host: Url of the Connect server (Optional, default=None which reads OP_CONNECT_HOST)
+    :param token: Connect access token (Optional, default=None which reads OP_CONNECT_TOKEN)
+    :param uuid_cache_ttl: Seconds a vault listing is reused for title to uuid lookups, 0 disables the cache and None
+        never expires it (Optional, default=300)
+    :param cache: Cache for read and get_item results (Optional, default=None which disables caching)
+    :param timeout: Seconds each request may take, None waits forever (Optional, default=None)
+    :param retry_policy: How failed requests are retried (Optional, default=None which uses RetryPolicy())
+    :param max_connections: Maximum number of idle connections kept open (Optional, default=8)
+    """
+    def __init__(self, host: str | None = None, token: str | None = None, uuid_cache_ttl: float | None = 300,
+                 cache: SecretCache | None = None, timeout: float | None = None,
+                 retry_policy: RetryPolicy | None = None, max_connections: int = 8) -> None:
+        host = os.environ.get(CONNECT_HOST) if host is None else host
+        token = os.environ.get(CONNECT_TOKEN) if token is None else token
+        if not host or not token:
+            raise ValueError("A Connect host and token are needed, pass them or set {} and {}".format(
+                CONNECT_HOST, CONNECT_TOKEN))
+        self._token = token
+        self.timeout = timeout
+        self.cache = cache
+        self.retry_policy = RetryPolicy() if retry_policy is None else retry_policy
+        self.pool = ConnectionPool(host, max_idle=max_connections, timeout=timeout)
+        self._item_index = ItemIndex(ttl=uuid_cache_ttl)
+        self._vault_ids = {}
+        self._item_vaults = {}
+        self._lock = threading.Lock()
+
+    def _request(self, path: str, raw: bool = False) -> dict | list | bytes:
+        """
+        Send a GET request under the retry policy, every call of the client goes through here
+
+        :param path: Path of the Connect API e.g. /v1/vaults
+        :param raw: Return the body as bytes instead of parsing it as JSON (Optional, default=False)
+        :return: Parsed JSON or raw body of the response
+        """
+        headers = {"Authorization": "Bearer {}".format(self._token), "Accept": "application/json"}
+
+        def call():
+            try:
+                status, body = self.pool.request("GET", path, headers)
+            except TimeoutError:
+                raise OnePasswordTimeoutError(["GET", path], self.timeout)
+            except OSError as e:
+                raise connect_error("GET", path, None, str(e))
+            if status >= 400:
+                try:
+                    message = json.loads(body).get("message", "")
+                except (ValueError, AttributeError):
+                    message = body.decode("utf-8", "replace")
+                raise connect_error("GET", path, status, message)
+            return body
+
+        body = call_with_retry(call, self.retry_policy)
+        return body if raw else json.loads(body)
+
+    def close(self) -> None:
+        """
+        Close the pooled connections
+        """
+        self.pool.close()
+
+    def _cache_get(self, key: tuple) -> str | dict | list | None:
+        if self.cache is None:
+            return None
+        return self.cache.get(key)
+
+    def _cache_set(self, key: tuple, value: str | dict | list) -> None:
+        if self.cache is not None:
+            self.cache.set(key, value)
+
+    def list_vaults(self) -> list:
+        """
+        Helper function to list all vaults the token can access
+        """
+        vaults = self._request("/v1/vaults")
+        with self._lock:
+            for vault in vaults:
+                self._vault_ids[vault["name"]] = vault["id"]
+                self._vault_ids[vault["id"]] = vault["id"]
+        return vaults
+
+    def _vault_id(self, vault: str) -> str:
+        with self._lock:
+            vault_id = self._vault_ids.get(vault)
+        if vault_id is None:
+            self.list_vaults()
+            with self._lock:
+                vault_id = self._vault_ids.get(vault)
+        if vault_id is None:
+            raise OnePasswordNotFoundError(["GET", "/v1/vaults"], 404, "\"{}\" isn't a vault".format(vault))
+        return vault_id
+
+    def list_items(self, vault: str = "Private") -> list:
+        """
+        Helper function to list all items in a certain vault, also refreshes the cache used by get_uuid. Summaries
+        carry "updated_at" like the op listing, so they work with sync.diff_listing.
+
+        :param vault: Name or uuid of the vault the items are in (Optional, default=Private)
+        :returns: List of all items
+        """
+        vault_id = self._vault_id(vault)
+        items = self._request("/v1/vaults/{}/items".format(quote(vault_id)))
+        for item in items:
+            item.setdefault("updated_at", item.get("updatedAt"))
+        with self._lock:
+            for item in items:
+                self._item_vaults[item["id"]] = vault_id
+        self._item_index.load(vault, items)
+        return items
+
+    def get_uuid(self, docname: str, vault: str = "Private") -> str | None:
+        """
+        Helper function to get the uuid for an item, the vault listing is cached for uuid_cache_ttl seconds
+
+        :param docname: Title of the item (not filename of documents)
+        :param vault: Vault the item is in (Optional, default=Private)
+        :return: Uuid of item or None if it doesn't exist
+        """
+        if not self._item_index.is_fresh(vault):
+            self.list_items(vault=vault)
+        item = self._item_index.get(vault, docname)
+        if item is not None:
+            return item["id"]
+
+    def invalidate_uuid_cache(self, vault: str | None = None) -> None:
+        """
+        Helper function to forget cached vault listings used by get_uuid
+
+        :param vault: Vault to forget (Optional, default=None which forgets all vaults)
+        """
+        self._item_index.invalidate(vault)
+
+    def _item_vault(self, uuid: str) -> str:
+        """
+        Vault uuid of an item, Connect needs it for every item request while op does not
+        """
+        with self._lock:
+            vault_id = self._item_vaults.get(uuid)
+        if vault_id is not None:
+            return vault_id
+        for vault in self.list_vaults():
+            self.list_items(vault["id"])
+            with self._lock:
+                if uuid in self._item_vaults:
+                    return self._item_vaults[uuid]
+        raise OnePasswordNotFoundError(["GET", "/v1/vaults"], 404, "\"{}\" isn't an item".format(uuid))
+
+    def _full_item(self, uuid: str, vault_id: str | None = None) -> dict:
+        vault_id = self._item_vault(uuid) if vault_id is None else vault_id
+        return self._request("/v1/vaults/{}/items/{}".format(quote(vault_id), quote(uuid)))
+
+    def get_item(self, uuid: str, fields: str | list | None = None) -> dict:
+        """
+        Helper function to get a certain field, you can find the UUID you need using list_items
+
+        :param uuid: Uuid of the item you wish to get, no vault needed
+        :param fields: To return only certain detail use either a specific field label or list of them
+            (Optional, default=None which means all fields returned)
+        :return: Dictionary of the item with requested fields, keyed as op does
+        """
+        key = ("item", uuid, tuple(fields) if isinstance(fields, list) else fields)
+        item = self._cache_get(key)
+        if item is not None:
+            return item
+        item = select_fields(self._full_item(uuid), fields)
+        self._cache_set(key, item)
+        return item
+
+    def get_items(self, uuids: list, fields: str | list | None = None, max_workers: int = 8) -> tuple[dict, dict]:
+        """
+        Helper function to get many items concurrently, each item is fetched as with get_item
+
+        :param uuids: Uuids of the items you wish to get, no vault needed
+        :param fields: To return only certain detail use either a specific field or list of them
+            (Optional, default=None which means all fields returned)
+        :param max_workers: Maximum number of requests running at once (Optional, default=8)
+        :return: Dictionary of items keyed by uuid and dictionary of the exception raised for each failed uuid
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        uuids = list(dict.fromkeys(uuids))
+        items, errors = {}, {}
+        if not uuids:
+            return items, errors
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(uuids))) as executor:
+            futures = {uuid: executor.submit(self.get_item, uuid, fields) for uuid in uuids}
+            for uuid, future in futures.items():
+                try:
+                    items[uuid] = future.result()
+                except Exception as e:
+                    errors[uuid] = e
+        return items, errors
+
+    def read(self, secret_ref: str) -> str:
+        """
+        Helper function to read a secret based on its reference(ex: op://<vault>/<item>/[<section>/]<field>), vault,
+        item, section and field may be given by name or uuid
+
+        :param secret_ref: Reference to the secret you wish to read
+        :return: The secret in plain text
+        """
+        vault, item_name, section, field_name = split_reference(secret_ref)
+        secret = self._cache_get(("read", secret_ref))
+        if secret is not None:
+            return secret
+        vault_id = self._vault_id(vault)
+        uuid = self.get_uuid(item_name, vault=vault)
+        if uuid is None:
+            with self._lock:
+                known = self._item_vaults.get(item_name) == vault_id
+            uuid = item_name if known else None
+        if uuid is None:
+            raise OnePasswordNotFoundError(["GET", secret_ref], 404, "\"{}\" isn't an item".format(item_name))
+        attribute = reference_attribute(secret_ref)
+        secret = reference_value(self._full_item(uuid, vault_id), section, field_name, attribute)
+        if secret is None:
+            raise OnePasswordNotFoundError(["GET", secret_ref], 404, "field \"{}\" not found".format(field_name))
+        if attribute not in ("otp", "totp"):
+            self._cache_set(("read", secret_ref), secret)
+        return secret
+
+    def get_document_bytes(self, docname: str, vault: str = "Private") -> bytes | None:
+        """
+        Helper function to get the contents of the first file of a document
+
+        :param docname: Title of the document (not it's filename)
+        :param vault: Vault the document is in (Optional, default=Private)
+        :returns: Contents of the document or None if it doesn't exist
+        """
+        docid = self.get_uuid(docname, vault=vault)
+        if docid is None:
+            return None
+        vault_id = self._vault_id(vault)
+        files = self._request("/v1/vaults/{}/items/{}/files".format(quote(vault_id), quote(docid)))
+        if not files:
+            return None
+        return self._request("/v1/vaults/{}/items/{}/files/{}/content".format(
+            quote(vault_id), quote(docid), quote(files[0]["id"])), raw=True)
+
+    def get_document_str(self, docname: str, vault: str = "Private") -> str | None:
+        """
+        Helper function to get a document
+
+        :param docname: Title of the document (not it's filename)
+        :param vault: Vault the document is in (Optional, default=Private)
+        :returns: Document or None is non existant
+        """
+        document = self.get_document_bytes(docname, vault)
+        return document.decode("utf-8") if document is not None else None
+
+    def get_document(self, docname: str, vault: str = "Private") -> dict | None:
+        """
+        Helper function to get a document
+
+        :param docname: Title of the document (not it's filename)
+        :param vault: Vault the document is in (Optional, default=Private)
+        :returns: Document or None if it doesn't exist
+        """
+        return load_document(self.get_document_str(docname, vault), docname, vault)
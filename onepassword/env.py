@@ -0,0 +1,133 @@
+import os
+import sys
+import time
+import shlex
+import argparse
+from dataclasses import dataclass, field
+from typing import Mapping
+
+REFERENCE_PREFIX = "op://"
+
+
+@dataclass
+class EnvLoad:
+    """
+    Outcome of load_env
+
+    :param values: Value of every variable that was loaded, keyed by name
+    :param skipped: Names that were left alone because they are already set in the environment
+    :param references: Number of distinct secret references resolved
+    :param seconds: Time taken to resolve the references
+    """
+    values: dict = field(default_factory=dict)
+    skipped: list = field(default_factory=list)
+    references: int = 0
+    seconds: float = 0.0
+
+
+def parse_manifest(text: str) -> dict:
+    """
+    Parse a .env style manifest of NAME=value lines, values are usually op:// references. Blank lines, comments and
+    an export prefix are ignored and values may be quoted.
+
+    :param text: Contents of the manifest
+    :return: Dictionary of value keyed by variable name, in manifest order
+    """
+    variables = {}
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("export "):
+            line = line[len("export "):].lstrip()
+        name, sep, value = line.partition("=")
+        name, value = name.strip(), value.strip()
+        if not sep or not name.isidentifier():
+            raise ValueError("Line {} of the manifest is not NAME=value: {}".format(number, line))
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+            value = value[1:-1]
+        variables[name] = value
+    return variables
+
+
+def load_env(manifest: str | os.PathLike | Mapping, override: bool = False, op=None, apply: bool = True,
+             max_workers: int = 8) -> EnvLoad:
+    """
+    Resolve a manifest of environment variables in one batched pass, every item referenced is fetched once however
+    many of its fields are used
+
+    :param manifest: Path of a .env style manifest, or a mapping of variable name to value
+    :param override: Replace variables that are already set in the environment (Optional, default=False)
+    :param op: Client used to resolve the references (Optional, default=None which creates OnePassword())
+    :param apply: Write the values into os.environ, otherwise only return them (Optional, default=True)
+    :param max_workers: Maximum number of items fetched at once (Optional, default=8)
+    :return: Loaded values, skipped names and timing
+    """
+    if isinstance(manifest, Mapping):
+        variables = dict(manifest)
+    else:
+        with open(manifest, "r") as f:
+            variables = parse_manifest(f.read())
+    result = EnvLoad()
+    if not override:
+        result.skipped = [name for name in variables if name in os.environ]
+        variables = {name: value for name, value in variables.items() if name not in os.environ}
+    refs = list(dict.fromkeys(value for value in variables.values() if value.startswith(REFERENCE_PREFIX)))
+    start = time.monotonic()
+    if refs:
+        if op is None:
+            from onepassword.client import OnePassword
+            op = OnePassword()
+        secrets = op.resolve(refs, max_workers=max_workers)
+    else:
+        secrets = {}
+    result.seconds = time.monotonic() - start
+    result.references = len(refs)
+    result.values = {name: secrets.get(value, value) for name, value in variables.items()}
+    if apply:
+        os.environ.update(result.values)
+    return result
+
+
+def main(argv: list | None = None) -> int:
+    """
+    Command line entry point, prints export lines for the shell or runs a command with the variables set
+    """
+    parser = argparse.ArgumentParser(
+        prog="op-load-env", usage="%(prog)s [options] manifest [-- command ...]",
+        description="Resolve a manifest of NAME=op://vault/item/field lines with one op call per item. Give a command "
+                    "after -- to run it with the variables set instead of printing export lines.")
+    parser.add_argument("manifest", help=".env style manifest")
+    parser.add_argument("--override", action="store_true", help="replace variables that are already set")
+    parser.add_argument("--signin-method", default="app", choices=["app", "manual"],
+                        help="app or manual (default: app), a service account is used when "
+                             "OP_SERVICE_ACCOUNT_TOKEN is set")
+    parser.add_argument("--account", help="1Password account name")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not report timing on stderr")
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # only what follows an explicit -- is the command, options may come before or after the manifest
+    command = []
+    if "--" in argv:
+        command = argv[argv.index("--") + 1:]
+        argv = argv[:argv.index("--")]
+    args = parser.parse_args(argv)
+
+    from onepassword.client import OnePassword
+    with open(args.manifest, "r") as f:
+        variables = parse_manifest(f.read())
+    op = None
+    if any(value.startswith(REFERENCE_PREFIX) for value in variables.values()):
+        op = OnePassword(signin_method=args.signin_method, account=args.account)
+    result = load_env(variables, override=args.override, op=op, apply=bool(command))
+    if not args.quiet:
+        print("Loaded {} variables from {} references in {:.2f}s, {} already set".format(
+            len(result.values), result.references, result.seconds, len(result.skipped)), file=sys.stderr)
+    if command:
+        os.execvp(command[0], command)
+    for name, value in result.values.items():
+        print("export {}={}".format(name, shlex.quote(value)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
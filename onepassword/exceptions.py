@@ -1,2 +1,76 @@
 class OnePasswordForgottenPassword(Exception):
     pass
+
+
+class OnePasswordCommandError(Exception):
+    """
+    Raised when an op command exits with a non-zero status
+
+    :param command: Arguments the op command was run with
+    :param returncode: Exit status of the command, None if it never finished
+    :param stderr: Error output of the command
+    """
+    def __init__(self, command: list, returncode: int | None, stderr: str = "") -> None:
+        # never keep session keys passed on the command line
+        command = ["***" if i > 0 and command[i - 1] == "--session" else arg for i, arg in enumerate(command)]
+        self.command = command
+        self.returncode = returncode
+        self.stderr = stderr
+        super().__init__("op {} failed ({}): {}".format(" ".join(command), returncode, stderr.strip()))
+
+
+class OnePasswordTimeoutError(OnePasswordCommandError):
+    """
+    Raised when an op command does not finish within its timeout
+    """
+    def __init__(self, command: list, timeout: float) -> None:
+        self.timeout = timeout
+        super().__init__(command, None, "timed out after {}s".format(timeout))
+
+
+class OnePasswordNotFoundError(OnePasswordCommandError):
+    """
+    Raised when the item, vault or document an op command refers to does not exist
+    """
+    pass
+
+
+class OnePasswordAuthError(OnePasswordCommandError):
+    """
+    Raised when an op command fails because the session is missing, expired or was rejected
+    """
+    pass
+
+
+class OnePasswordTransientError(OnePasswordCommandError):
+    """
+    Raised when an op command fails for a reason that is likely to go away on retry, e.g. rate limits or network errors
+    """
+    pass
+
+
+NOT_FOUND_MESSAGES = ("isn't an item", "isn't a vault", "isn't a document", "not found", "no item found")
+AUTH_MESSAGES = ("not currently signed in", "session expired", "invalid session", "authentication required",
+                 "(401)", "unauthorized", "account is not signed in", "signin credentials are not compatible")
+TRANSIENT_MESSAGES = ("(429)", "too many requests", "(500)", "(502)", "(503)", "(504)", "connection reset",
+                      "connection refused", "i/o timeout", "tls handshake timeout", "temporary failure",
+                      "unexpected eof")
+
+
+def command_error(command: list, returncode: int | None, stderr: str = "") -> OnePasswordCommandError:
+    """
+    Build the most specific exception for a failed op command from its error output
+
+    :param command: Arguments the op command was run with
+    :param returncode: Exit status of the command
+    :param stderr: Error output of the command
+    :return: Exception to raise
+    """
+    lowered = stderr.lower()
+    if any(message in lowered for message in AUTH_MESSAGES):
+        return OnePasswordAuthError(command, returncode, stderr)
+    if any(message in lowered for message in TRANSIENT_MESSAGES):
+        return OnePasswordTransientError(command, returncode, stderr)
+    if any(message in lowered for message in NOT_FOUND_MESSAGES):
+        return OnePasswordNotFoundError(command, returncode, stderr)
+    return OnePasswordCommandError(command, returncode, stderr)
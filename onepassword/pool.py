@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from onepassword.cache import SecretCache
+from onepassword.client import OnePassword, IsolatedSignIn
+
+
+class OnePasswordPool:
+    """
+    Clients for several 1Password accounts in one process. Every account has its own session, passed to op with
+    --account and an OP_SESSION_<account> variable in the environment of each command, so clients never share state
+    through os.environ.
+
+    :param accounts: Account names to sign in to through the app integration, or a dictionary of account name to
+        password where a None password also means the app integration
+    :param max_workers: Maximum number of accounts signing in at once (Optional, default=8)
+    :param cache_factory: Called once per account to create its SecretCache, e.g. lambda: SecretCache(ttl=60)
+        (Optional, default=None which means no cache)
+    :param client_kwargs: Keyword arguments passed to every OnePassword client, e.g. timeout. A single cache can not
+        be passed, its keys carry no account so accounts would read each other's secrets
+    """
+    def __init__(self, accounts: list | dict, max_workers: int = 8,
+                 cache_factory: Callable[[], SecretCache] | None = None, **client_kwargs) -> None:
+        if not isinstance(accounts, dict):
+            accounts = dict.fromkeys(accounts)
+        if not accounts:
+            raise ValueError("At least one account is needed")
+        if client_kwargs.get("cache") is not None:
+            raise ValueError("A cache would be shared by every account, pass cache_factory to create one per account")
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(accounts))) as executor:
+            futures = {account: executor.submit(IsolatedSignIn, account, password)
+                       for account, password in accounts.items()}
+        errors = {account: future.exception() for account, future in futures.items() if future.exception()}
+        if errors:
+            raise ConnectionError("Signing in failed for accounts: {}".format(
+                ", ".join("{} ({})".format(account, e) for account, e in errors.items())))
+        self._clients = {
+            account: OnePassword(signin_strategy=future.result(),
+                                 **dict(client_kwargs, cache=cache_factory() if cache_factory is not None else None))
+            for account, future in futures.items()
+        }
+
+    def __getitem__(self, account: str) -> OnePassword:
+        return self.client(account)
+
+    def __iter__(self):
+        return iter(self._clients)
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    @property
+    def accounts(self) -> list:
+        """
+        Names of the accounts in the pool
+        """
+        return list(self._clients)
+
+    def client(self, account: str) -> OnePassword:
+        """
+        Get the client of an account, every call on it runs against that account only
+
+        :param account: Account name
+        :return: Client signed in to the account
+        """
+        try:
+            return self._clients[account]
+        except KeyError:
+            raise KeyError("Account {} is not in the pool, accounts are: {}".format(
+                account, ", ".join(self._clients))) from None
+
+    def close(self) -> None:
+        """
+        Stop the session keep-alive thread of every client
+        """
+        for client in self._clients.values():
+            client.session.stop()
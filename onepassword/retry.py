@@ -0,0 +1,118 @@
+import time
+import random
+import threading
+from typing import Callable
+from onepassword.exceptions import OnePasswordAuthError, OnePasswordTransientError
+
+
+class RetryPolicy:
+    """
+    How op calls are retried. Auth failures trigger one sign in and a single retry, transient failures of idempotent
+    calls are retried with exponential backoff and jitter.
+
+    :param max_attempts: Maximum number of attempts for transient failures (Optional, default=3)
+    :param backoff: Seconds to wait before the first retry, doubled on every further retry (Optional, default=0.5)
+    :param max_backoff: Upper bound of the wait between two attempts (Optional, default=5)
+    :param reauthenticate: Sign in again when the session expired (Optional, default=True)
+    """
+    def __init__(self, max_attempts: int = 3, backoff: float = 0.5, max_backoff: float = 5,
+                 reauthenticate: bool = True) -> None:
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.reauthenticate = reauthenticate
+
+    def delay(self, attempt: int) -> float:
+        """
+        Seconds to wait after a failed attempt
+
+        :param attempt: Number of the attempt that failed, starting at 1
+        :return: Backoff with jitter, never more than max_backoff
+        """
+        return min(self.max_backoff, self.backoff * 2 ** (attempt - 1)) * random.uniform(0.5, 1)
+
+
+class Reauthenticator:
+    """
+    Shares one sign in between every caller that hit the same expired session
+
+    :param signin: Callable that signs in again
+    """
+    def __init__(self, signin: Callable[[], None]) -> None:
+        self.signin = signin
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    def reauthenticate(self, seen_generation: int) -> None:
+        """
+        Sign in again, unless another caller already did since the failed call started
+
+        :param seen_generation: Value of generation read before the failed call started
+        """
+        with self._lock:
+            if self.generation == seen_generation:
+                self.signin()
+                self.generation += 1
+
+
+def call_with_retry(call: Callable, policy: RetryPolicy, reauthenticator: Reauthenticator | None = None,
+                    idempotent: bool = True):
+    """
+    Run a callable under a retry policy
+
+    :param call: Callable running the op command
+    :param policy: Retry policy to apply
+    :param reauthenticator: Used to sign in again after an auth failure (Optional, default=None which never signs in)
+    :param idempotent: Whether running the command twice is harmless, otherwise transient failures are not retried
+        since the first attempt may have taken effect (Optional, default=True)
+    :return: Result of the callable
+    """
+    attempt = 1
+    reauthenticated = False
+    while True:
+        generation = reauthenticator.generation if reauthenticator is not None else 0
+        try:
+            return call()
+        except OnePasswordAuthError:
+            if reauthenticated or reauthenticator is None or not policy.reauthenticate:
+                raise
+            reauthenticated = True
+            reauthenticator.reauthenticate(generation)
+        except OnePasswordTransientError:
+            if not idempotent or attempt >= policy.max_attempts:
+                raise
+            time.sleep(policy.delay(attempt))
+            attempt += 1
+
+
+async def async_call_with_retry(call: Callable, policy: RetryPolicy, reauthenticator: Reauthenticator | None = None,
+                                idempotent: bool = True):
+    """
+    Await a coroutine function under a retry policy, signing in again happens in a worker thread
+
+    :param call: Coroutine function running the op command
+    :param policy: Retry policy to apply
+    :param reauthenticator: Used to sign in again after an auth failure (Optional, default=None which never signs in)
+    :param idempotent: Whether running the command twice is harmless, otherwise transient failures are not retried
+        since the first attempt may have taken effect (Optional, default=True)
+    :return: Result of the coroutine
+    """
+    import asyncio
+    attempt = 1
+    reauthenticated = False
+    while True:
+        generation = reauthenticator.generation if reauthenticator is not None else 0
+        try:
+            return await call()
+        except OnePasswordAuthError:
+            if reauthenticated or reauthenticator is None or not policy.reauthenticate:
+                raise
+            reauthenticated = True
+            await asyncio.to_thread(reauthenticator.reauthenticate, generation)
+        except OnePasswordTransientError:
+            if not idempotent or attempt >= policy.max_attempts:
+                raise
+            await asyncio.sleep(policy.delay(attempt))
+            attempt += 1
@@ -0,0 +1,262 @@
+import re
+import time
+import bisect
+import threading
+from urllib.parse import urlsplit
+from onepassword.sync import diff_listing, item_version
+
+SEARCH_MODES = ("exact", "prefix", "fuzzy")
+_token_pattern = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: str) -> list:
+    """
+    Split text into lower case words
+
+    :param text: Text to split
+    :return: List of words
+    """
+    return _token_pattern.findall(text.lower()) if text else []
+
+
+def item_tokens(item: dict) -> dict:
+    """
+    Searchable tokens of an item summary from list_items
+
+    :param item: Item summary
+    :return: Dictionary of token to the weight of the strongest place it appears in, title words weigh most
+    """
+    tokens = {}
+
+    def add(words, weight):
+        for word in words:
+            if tokens.get(word, 0) < weight:
+                tokens[word] = weight
+
+    add(tokenize(item.get("category", "")), 1)
+    for url in item.get("urls") or []:
+        href = url.get("href", "") if isinstance(url, dict) else url
+        host = urlsplit(href if "://" in href else "//" + href).hostname or ""
+        add([host] if host else [], 2)
+        add(tokenize(host), 2)
+    for tag in item.get("tags") or []:
+        add([tag.lower()], 2)
+        add(tokenize(tag), 2)
+    add(tokenize(item.get("title", "")), 3)
+    return tokens
+
+
+def deletes(word: str) -> set:
+    """
+    The word itself and every variant of it with one character removed, two words within one edit of each other
+    always share one of these
+    """
+    return {word} | {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance of two words, stops early once it exceeds limit
+
+    :return: Distance, or limit + 1 if it is larger than limit
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class SearchIndex:
+    """
+    Inverted index over the item listings of several vaults. Vaults are refreshed independently, and only the items
+    whose version changed since the last listing are indexed again.
+
+    :param ttl: Seconds a vault listing stays valid, 0 always refreshes and None never expires (Optional, default=300)
+    """
+    def __init__(self, ttl: float | None = 300) -> None:
+        self.ttl = ttl
+        self._postings = {}
+        # sorted tokens for prefix matches, rebuilt on the first prefix search after a change
+        self._vocabulary = None
+        self._deletes = {}
+        self._items = {}
+        self._vaults = {}
+        self._vault_names = None
+        self._lock = threading.RLock()
+
+    def _fresh(self, loaded_at: float | None) -> bool:
+        if loaded_at is None or self.ttl == 0:
+            return False
+        return self.ttl is None or time.monotonic() - loaded_at < self.ttl
+
+    def is_fresh(self, vault: str) -> bool:
+        """
+        Check whether a vault is indexed and its listing has not expired
+        """
+        with self._lock:
+            entry = self._vaults.get(vault)
+            return self._fresh(entry[0] if entry is not None else None)
+
+    def vault_names(self) -> list | None:
+        """
+        Names of all vaults as last set with set_vault_names, None once expired
+        """
+        with self._lock:
+            if self._vault_names is not None and self._fresh(self._vault_names[0]):
+                return self._vault_names[1]
+            return None
+
+    def set_vault_names(self, names: list) -> None:
+        """
+        Remember the names of all vaults for ttl seconds
+        """
+        with self._lock:
+            self._vault_names = (time.monotonic(), list(names))
+
+    def update_vault(self, vault: str, listing: list) -> None:
+        """
+        Bring the index of a vault in line with a fresh listing
+
+        :param vault: Vault name
+        :param listing: Item summaries as returned by list_items
+        """
+        with self._lock:
+            known = self._vaults.get(vault, (None, {}))[1]
+            changes = diff_listing(listing, {uuid: item_version(self._items[(vault, uuid)]) for uuid in known})
+            summaries = {item["id"]: item for item in listing}
+            # without a version marker an item can not be told unchanged
+            changes.changed += [uuid for uuid in summaries if uuid in known and uuid not in changes.changed and
+                                item_version(summaries[uuid]) == (None, None)]
+            for uuid in changes.removed + changes.changed:
+                self._remove(vault, uuid, known.pop(uuid))
+            for uuid in changes.added + changes.changed:
+                known[uuid] = item_tokens(summaries[uuid])
+                self._add(vault, uuid, known[uuid])
+            # items with an unchanged version still get the latest summary, e.g. for a new vault name
+            for uuid, item in summaries.items():
+                self._items[(vault, uuid)] = item
+            self._vaults[vault] = (time.monotonic(), known)
+
+    def invalidate(self, vault: str | None = None) -> None:
+        """
+        Mark one or every vault as expired, its entries stay searchable until the next refresh
+
+        :param vault: Vault name (Optional, default=None which expires every vault and the vault names)
+        """
+        with self._lock:
+            vaults = list(self._vaults) if vault is None else [vault] if vault in self._vaults else []
+            for name in vaults:
+                self._vaults[name] = (None, self._vaults[name][1])
+            if vault is None:
+                self._vault_names = None
+
+    def _add(self, vault: str, uuid: str, tokens: dict) -> None:
+        for token, weight in tokens.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                self._vocabulary = None
+                for variant in deletes(token):
+                    self._deletes.setdefault(variant, set()).add(token)
+            postings[(vault, uuid)] = weight
+
+    def _remove(self, vault: str, uuid: str, tokens: dict) -> None:
+        self._items.pop((vault, uuid), None)
+        for token in tokens:
+            postings = self._postings[token]
+            postings.pop((vault, uuid), None)
+            if not postings:
+                del self._postings[token]
+                self._vocabulary = None
+                for variant in deletes(token):
+                    self._deletes[variant].discard(token)
+                    if not self._deletes[variant]:
+                        del self._deletes[variant]
+
+    def _matching_tokens(self, word: str, mode: str) -> list:
+        if mode == "exact":
+            return [word] if word in self._postings else []
+        if mode == "prefix":
+            if self._vocabulary is None:
+                self._vocabulary = sorted(self._postings)
+            start = bisect.bisect_left(self._vocabulary, word)
+            end = bisect.bisect_left(self._vocabulary, word + "\uffff")
+            return self._vocabulary[start:end]
+        candidates = set()
+        for variant in deletes(word):
+            candidates |= self._deletes.get(variant, set())
+        return [token for token in candidates if edit_distance(word, token, 1) <= 1]
+
+    def search(self, query: str, vaults: list | None = None, mode: str = "prefix", limit: int | None = None) -> list:
+        """
+        Find items matching every word of a query
+
+        :param query: Words to look for in titles, tags, urls and categories
+        :param vaults: Only return items of these vaults (Optional, default=None which searches every indexed vault)
+        :param mode: How words match, "exact", "prefix" or "fuzzy" which allows one typo per word
+            (Optional, default=prefix)
+        :param limit: Maximum number of results (Optional, default=None which returns every match)
+        :return: Item summaries, best matches first, each with the vault it was found in under "vault_name"
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError("mode must be one of: {}".format(", ".join(SEARCH_MODES)))
+        words = tokenize(query)
+        if not words:
+            return []
+        with self._lock:
+            scores = None
+            for word in words:
+                word_scores = {}
+                for token in self._matching_tokens(word, mode):
+                    bonus = 1 if token == word else 0
+                    for key, weight in self._postings[token].items():
+                        word_scores[key] = max(word_scores.get(key, 0), weight * 2 + bonus)
+                if scores is None:
+                    scores = word_scores
+                else:
+                    scores = {key: score + word_scores[key] for key, score in scores.items() if key in word_scores}
+                if not scores:
+                    return []
+            if vaults is not None:
+                allowed = set(vaults)
+                scores = {key: score for key, score in scores.items() if key[0] in allowed}
+            ranked = sorted(scores, key=lambda key: (-scores[key], self._items[key].get("title", "")))
+            if limit is not None:
+                ranked = ranked[:limit]
+            return [dict(self._items[key], vault_name=key[0]) for key in ranked]
+
+
+def search_vaults(op, index: SearchIndex, query: str, vaults: list | None = None, mode: str = "prefix",
+                  limit: int | None = None, max_workers: int = 8) -> list:
+    """
+    Refresh the expired vaults of a search index in parallel, then search it
+
+    :param op: Client used to list the vaults and items
+    :param index: Search index to refresh and query
+    :param query: Words to look for in titles, tags, urls and categories
+    :param vaults: Vaults to search (Optional, default=None which searches every vault from list_vaults)
+    :param mode: How words match, "exact", "prefix" or "fuzzy" (Optional, default=prefix)
+    :param limit: Maximum number of results (Optional, default=None which returns every match)
+    :param max_workers: Maximum number of vault listings fetched at once (Optional, default=8)
+    :return: Item summaries, best matches first, each with the vault it was found in under "vault_name"
+    """
+    if vaults is None:
+        vaults = index.vault_names()
+        if vaults is None:
+            vaults = [vault["name"] for vault in op.list_vaults()]
+            index.set_vault_names(vaults)
+    stale = [vault for vault in vaults if not index.is_fresh(vault)]
+    if stale:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(stale))) as executor:
+            listings = dict(zip(stale, executor.map(lambda vault: op.list_items(vault=vault), stale)))
+        for vault, listing in listings.items():
+            index.update_vault(vault, listing)
+    return index.search(query, vaults=vaults, mode=mode, limit=limit)
@@ -0,0 +1,96 @@
+import time
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+SESSION_IDLE_TIMEOUT = 30 * 60  # Seconds an op session lives without being used
+
+
+class SessionKeepAlive:
+    """
+    Tracks the last successful use of an op session and can keep it alive from a background thread, so the session is
+    refreshed before it expires instead of inside a request
+
+    :param ping: Cheap op call that uses the session, signing in again if it already expired
+    :param idle_timeout: Seconds the session lives without being used (Optional, default=1800)
+    :param refresh_margin: Seconds before expiry at which the background thread pings (Optional, default=300)
+    :param retry_interval: Seconds to wait before pinging again after a failed ping (Optional, default=30)
+    """
+    def __init__(self, ping: Callable[[], None], idle_timeout: float = SESSION_IDLE_TIMEOUT,
+                 refresh_margin: float = 300, retry_interval: float = 30) -> None:
+        if refresh_margin >= idle_timeout:
+            raise ValueError("refresh_margin must be smaller than idle_timeout")
+        self.ping = ping
+        self.idle_timeout = idle_timeout
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self.last_used = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def touch(self) -> None:
+        """
+        Record a successful use of the session
+        """
+        self.last_used = time.monotonic()
+
+    def seconds_left(self) -> float | None:
+        """
+        Seconds until the session expires if it stays idle
+
+        :return: Seconds left, negative once expired, or None if the session was never used
+        """
+        if self.last_used is None:
+            return None
+        return self.last_used + self.idle_timeout - time.monotonic()
+
+    @property
+    def expires_at(self) -> datetime | None:
+        """
+        Time at which the session expires if it stays idle, None if the session was never used
+        """
+        seconds_left = self.seconds_left()
+        if seconds_left is None:
+            return None
+        return datetime.now(timezone.utc) + timedelta(seconds=seconds_left)
+
+    @property
+    def running(self) -> bool:
+        """
+        Whether the background thread is running
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """
+        Start the background thread, it pings refresh_margin seconds before the session would expire
+        """
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._keep_alive, name="onepassword-keep-alive", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """
+        Stop the background thread
+
+        :param timeout: Seconds to wait for the thread to finish (Optional, default=None which waits until it does)
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _keep_alive(self) -> None:
+        while not self._stop.is_set():
+            seconds_left = self.seconds_left()
+            wait = 0 if seconds_left is None else seconds_left - self.refresh_margin
+            if wait > 0:
+                self._stop.wait(wait)
+                continue
+            try:
+                self.ping()
+                self.touch()
+            except Exception:
+                self._stop.wait(self.retry_interval)
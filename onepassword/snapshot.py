@@ -0,0 +1,251 @@
+import os
+import hmac
+import json
+import mmap
+import struct
+import hashlib
+import tempfile
+from onepassword.client import reference_attribute, reference_value, select_fields, split_reference
+from onepassword.exceptions import OnePasswordNotFoundError
+from onepassword.utils import AuthenticatedEncryption
+
+MAGIC = b"OPSNAP01"
+# magic, salt, number of index slots, offset and length of the encrypted check value
+HEADER = struct.Struct("<8s16sIQI")
+# keyed digest of the lookup key, offset and length of the encrypted record
+SLOT = struct.Struct("<16sQI")
+CHECK_VALUE = b"onepassword snapshot"
+SCRYPT_N = 2 ** 14
+
+
+def _derive_keys(password: str | bytes, salt: bytes) -> tuple[bytes, bytes]:
+    if isinstance(password, str):
+        password = password.encode("utf-8")
+    key = hashlib.scrypt(password, salt=salt, n=SCRYPT_N, r=8, p=1, dklen=64)
+    return key[:32], key[32:]
+
+
+def _lookup_digest(index_key: bytes, kind: str, *names: str) -> bytes:
+    # keyed so the index does not reveal titles or uuids without the password
+    message = "\0".join((kind,) + names).encode("utf-8")
+    return hmac.new(index_key, message, hashlib.sha256).digest()[:16]
+
+
+def export_snapshot(op, path: str, password: str | bytes, vaults: list | None = None, max_workers: int = 8) -> int:
+    """
+    Export vaults into a single encrypted snapshot file, costs one listing per vault plus a get_item for each item
+
+    :param op: Client used to list and get the items, e.g. OnePassword or ConnectOnePassword
+    :param path: File to write, replaced atomically once the snapshot is complete
+    :param password: Password the snapshot is encrypted with
+    :param vaults: Names of the vaults to export (Optional, default=None which exports every vault from list_vaults)
+    :param max_workers: Maximum number of items fetched at once (Optional, default=8)
+    :return: Number of items in the snapshot
+    """
+    if vaults is None:
+        vault_names = {vault["name"]: [vault["name"], vault["id"]] for vault in op.list_vaults()}
+    else:
+        vault_names = {vault: [vault] for vault in vaults}
+    salt = os.urandom(16)
+    encryption_key, index_key = _derive_keys(password, salt)
+    encryption = AuthenticatedEncryption(encryption_key)
+
+    records, entries = [], []
+
+    def add_record(value, *digests):
+        records.append(encryption.encode(json.dumps(value)))
+        for digest in digests:
+            entries.append((digest, len(records) - 1))
+
+    item_count = 0
+    vault_list = []
+    for vault, names in vault_names.items():
+        listing = op.list_items(vault=vault)
+        items, errors = op.get_items([summary["id"] for summary in listing], max_workers=max_workers)
+        if errors:
+            uuid, error = next(iter(errors.items()))
+            raise ValueError("Exporting item {} of vault {} failed: {}".format(uuid, vault, error)) from error
+        add_record(listing, *(_lookup_digest(index_key, "vault", name) for name in names))
+        vault_list.append({"name": names[0], "id": names[-1]})
+        for summary in listing:
+            digests = [_lookup_digest(index_key, "uuid", summary["id"])]
+            digests += [_lookup_digest(index_key, "title", name, summary["title"]) for name in names]
+            add_record({"summary": summary, "item": items[summary["id"]], "vaults": names}, *digests)
+            item_count += 1
+    add_record(vault_list, _lookup_digest(index_key, "vaults"))
+
+    slots = 8
+    while slots < 2 * len(entries):
+        slots *= 2
+    check = encryption.encode(CHECK_VALUE)
+    records_offset = HEADER.size + slots * SLOT.size
+    offsets, offset = [], records_offset + len(check)
+    for record in records:
+        offsets.append(offset)
+        offset += len(record)
+
+    table = [None] * slots
+    for digest, record in entries:
+        slot = int.from_bytes(digest[:8], "little") % slots
+        while table[slot] is not None:
+            if table[slot][0] == digest:
+                break
+            slot = (slot + 1) % slots
+        # the first record wins when titles repeat, as with a linear scan of the listing
+        if table[slot] is None:
+            table[slot] = (digest, offsets[record], len(records[record]))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".{}.".format(os.path.basename(path)))
+    try:
+        with os.fdopen(fd, "wb") as writer:
+            writer.write(HEADER.pack(MAGIC, salt, slots, records_offset, len(check)))
+            for entry in table:
+                writer.write(SLOT.pack(*entry) if entry is not None else bytes(SLOT.size))
+            writer.write(check)
+            for record in records:
+                writer.write(record)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return item_count
+
+
+class SnapshotOnePassword:
+    """
+    Read only client serving get_uuid, get_item, read and the listings from a snapshot written by export_snapshot.
+    The file is memory mapped, lookups go through an on-disk hash index and only the record found is decrypted, so no
+    op process or session is needed.
+
+    :param path: Snapshot file
+    :param password: Password the snapshot was encrypted with
+    """
+    def __init__(self, path: str, password: str | bytes) -> None:
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._mmap) < HEADER.size:
+                raise ValueError("{} is not a 1Password snapshot".format(path))
+            magic, salt, self._slots, check_offset, check_length = HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC:
+                raise ValueError("{} is not a 1Password snapshot".format(path))
+            encryption_key, self._index_key = _derive_keys(password, salt)
+            self._encryption = AuthenticatedEncryption(encryption_key)
+            try:
+                self._encryption.decode(self._mmap[check_offset:check_offset + check_length])
+            except ValueError:
+                raise ValueError("Wrong password for snapshot {}".format(path)) from None
+        except BaseException:
+            self._mmap.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Unmap the snapshot file
+        """
+        self._mmap.close()
+
+    def _lookup(self, kind: str, *names: str) -> dict | list | None:
+        digest = _lookup_digest(self._index_key, kind, *names)
+        slot = int.from_bytes(digest[:8], "little") % self._slots
+        for _ in range(self._slots):
+            stored, offset, length = SLOT.unpack_from(self._mmap, HEADER.size + slot * SLOT.size)
+            if length == 0:
+                return None
+            if stored == digest:
+                return json.loads(self._encryption.decode(self._mmap[offset:offset + length]))
+            slot = (slot + 1) % self._slots
+        return None
+
+    def list_vaults(self) -> list:
+        """
+        Helper function to list all vaults in the snapshot
+        """
+        return self._lookup("vaults") or []
+
+    def list_items(self, vault: str = "Private") -> list:
+        """
+        Helper function to list all items in a certain vault as they were at export time
+
+        :param vault: Vault the items are in (Optional, default=Private)
+        :returns: List of all items
+        """
+        listing = self._lookup("vault", vault)
+        if listing is None:
+            raise OnePasswordNotFoundError(["snapshot", vault], None, "\"{}\" isn't a vault".format(vault))
+        return listing
+
+    def get_uuid(self, docname: str, vault: str = "Private") -> str | None:
+        """
+        Helper function to get the uuid for an item
+
+        :param docname: Title of the item (not filename of documents)
+        :param vault: Vault the item is in (Optional, default=Private)
+        :return: Uuid of item or None if it doesn't exist
+        """
+        record = self._lookup("title", vault, docname)
+        if record is not None:
+            return record["summary"]["id"]
+
+    def get_item(self, uuid: str, fields: str | list | None = None) -> dict:
+        """
+        Helper function to get a certain field, you can find the UUID you need using list_items
+
+        :param uuid: Uuid of the item you wish to get, no vault needed
+        :param fields: To return only certain detail use either a specific field label or list of them
+            (Optional, default=None which means all fields returned)
+        :return: Dictionary of the item with requested fields
+        """
+        record = self._lookup("uuid", uuid)
+        if record is None:
+            raise OnePasswordNotFoundError(["snapshot", uuid], None, "\"{}\" isn't an item".format(uuid))
+        return select_fields(record["item"], fields)
+
+    def get_items(self, uuids: list, fields: str | list | None = None) -> tuple[dict, dict]:
+        """
+        Helper function to get many items, each item is looked up as with get_item
+
+        :param uuids: Uuids of the items you wish to get, no vault needed
+        :param fields: To return only certain detail use either a specific field or list of them
+            (Optional, default=None which means all fields returned)
+        :return: Dictionary of items keyed by uuid and dictionary of the exception raised for each failed uuid
+        """
+        items, errors = {}, {}
+        for uuid in dict.fromkeys(uuids):
+            try:
+                items[uuid] = self.get_item(uuid, fields)
+            except OnePasswordNotFoundError as e:
+                errors[uuid] = e
+        return items, errors
+
+    def read(self, secret_ref: str) -> str:
+        """
+        Helper function to read a secret based on its reference(ex: op://<vault>/<item>/[<section>/]<field>), the
+        item may be given by title or uuid
+
+        :param secret_ref: Reference to the secret you wish to read
+        :return: The secret in plain text
+        """
+        vault, item_name, section, field_name = split_reference(secret_ref)
+        record = self._lookup("title", vault, item_name)
+        if record is None:
+            record = self._lookup("uuid", item_name)
+            # uuids are looked up across vaults, so the item must still be in the vault of the reference
+            if record is not None:
+                vaults = record.get("vaults") or (record["summary"].get("vault") or {}).values()
+                if vault not in vaults:
+                    record = None
+        if record is None:
+            raise OnePasswordNotFoundError(["snapshot", secret_ref], None, "\"{}\" isn't an item".format(item_name))
+        secret = reference_value(record["item"], section, field_name, reference_attribute(secret_ref))
+        if secret is None:
+            raise OnePasswordNotFoundError(["snapshot", secret_ref], None, "field \"{}\" not found".format(field_name))
+        return secret
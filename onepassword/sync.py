@@ -0,0 +1,81 @@
+from dataclasses import dataclass, field
+from typing import MutableMapping
+
+
+@dataclass
+class ChangeSet:
+    """
+    Uuids of the items that changed between two listings of a vault
+
+    :param added: Items that are new in the vault
+    :param changed: Items whose version or update time changed
+    :param removed: Items that are no longer in the vault
+    :param errors: Exception raised for each item that could not be fetched, these are retried on the next sync
+    """
+    added: list = field(default_factory=list)
+    changed: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    errors: dict = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+def item_version(item: dict) -> tuple:
+    """
+    Version marker of an item summary from list_items
+
+    :param item: Item summary
+    :return: Tuple of version and update time, either may be None
+    """
+    return item.get("version"), item.get("updated_at")
+
+
+def diff_listing(listing: list, versions: dict) -> ChangeSet:
+    """
+    Compare a vault listing against the known version of each item
+
+    :param listing: Item summaries as returned by list_items
+    :param versions: Version marker by uuid, as returned by item_version
+    :return: Change set of the listing compared to the known versions
+    """
+    changes = ChangeSet()
+    seen = set()
+    for item in listing:
+        uuid = item["id"]
+        seen.add(uuid)
+        if uuid not in versions:
+            changes.added.append(uuid)
+        elif versions[uuid] != item_version(item):
+            changes.changed.append(uuid)
+    changes.removed = [uuid for uuid in versions if uuid not in seen]
+    return changes
+
+
+def sync_vault(op, vault: str, store: MutableMapping, max_workers: int = 8) -> ChangeSet:
+    """
+    Bring a local snapshot of a vault up to date, only items whose version changed since the last sync are fetched
+
+    :param op: Client used to list and get the items
+    :param vault: Vault to sync
+    :param store: Snapshot to update, maps uuid to a dictionary with the "version", "updated_at" and full "item"
+    :param max_workers: Maximum number of op processes running at once (Optional, default=8)
+    :return: Change set applied to the store
+    """
+    listing = op.list_items(vault=vault)
+    changes = diff_listing(listing, {uuid: item_version(entry) for uuid, entry in store.items()})
+    summaries = {item["id"]: item for item in listing}
+    # a cached copy of a changed item would be stored under its new version
+    invalidate = getattr(op, "invalidate", None)
+    if invalidate is not None:
+        for uuid in changes.changed:
+            invalidate(uuid)
+    items, changes.errors = op.get_items(changes.added + changes.changed, max_workers=max_workers)
+    for uuid, item in items.items():
+        store[uuid] = {"version": summaries[uuid].get("version"), "updated_at": summaries[uuid].get("updated_at"),
+                       "item": item}
+    for uuid in changes.removed:
+        del store[uuid]
+    changes.added = [uuid for uuid in changes.added if uuid not in changes.errors]
+    changes.changed = [uuid for uuid in changes.changed if uuid not in changes.errors]
+    return changes
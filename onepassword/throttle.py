@@ -0,0 +1,160 @@
+import copy
+import time
+import threading
+from contextlib import contextmanager
+from typing import Callable
+
+
+class SingleFlight:
+    """
+    Coalesces identical calls that are in flight at the same time, the first caller runs the call and every caller
+    arriving before it finishes gets its result or exception
+    """
+    def __init__(self) -> None:
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: tuple, call: Callable):
+        """
+        Run a call, or wait for the identical call already in flight
+
+        :param key: Identifies the call, e.g. the cache key of the result
+        :param call: Callable producing the result
+        :return: Result of the call, waiters get a deep copy so they can not change each others result
+        """
+        with self._lock:
+            flight = self._calls.get(key)
+            if flight is None:
+                flight = self._calls[key] = [threading.Event(), None, None]
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+        if not leader:
+            flight[0].wait()
+            if flight[2] is not None:
+                raise flight[2]
+            return copy.deepcopy(flight[1])
+        try:
+            flight[1] = call()
+            return flight[1]
+        except BaseException as e:
+            flight[2] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            flight[0].set()
+
+
+class TokenBucket:
+    """
+    Rate limiter allowing rate calls per second on average and bursts of up to burst calls
+
+    :param rate: Tokens added per second
+    :param burst: Maximum number of tokens held (Optional, default=None which uses max(1, rate))
+    """
+    def __init__(self, rate: float, burst: float | None = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1.0, rate) if burst is None else burst
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Take a token, waiting until one is available
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class CallGovernor:
+    """
+    Limits the op processes of every client sharing it, to a number running at once and optionally a rate, and keeps
+    metrics of how long calls waited for their turn
+
+    :param max_concurrency: Maximum number of op processes running at once (Optional, default=None which means no limit)
+    :param rate: Maximum number of op processes started per second (Optional, default=None which means no limit)
+    :param burst: Number of op processes that may start at once before rate applies (Optional, default=None which
+        uses max(1, rate))
+    """
+    def __init__(self, max_concurrency: int | None = None, rate: float | None = None,
+                 burst: float | None = None) -> None:
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self._semaphore = threading.BoundedSemaphore(max_concurrency) if max_concurrency is not None else None
+        self._bucket = TokenBucket(rate, burst) if rate is not None else None
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._in_flight = 0
+        self._waiting = 0
+        self._max_waiting = 0
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    @contextmanager
+    def slot(self):
+        """
+        Wait for a free slot and a rate token, the op process runs inside the block
+        """
+        start = time.monotonic()
+        with self._lock:
+            self._waiting += 1
+            self._max_waiting = max(self._max_waiting, self._waiting)
+        try:
+            if self._semaphore is not None:
+                self._semaphore.acquire()
+            try:
+                if self._bucket is not None:
+                    self._bucket.acquire()
+            except BaseException:
+                if self._semaphore is not None:
+                    self._semaphore.release()
+                raise
+        finally:
+            waited = time.monotonic() - start
+            with self._lock:
+                self._waiting -= 1
+        with self._lock:
+            self._calls += 1
+            self._in_flight += 1
+            self._wait_time += waited
+            self._max_wait_time = max(self._max_wait_time, waited)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            if self._semaphore is not None:
+                self._semaphore.release()
+
+    def stats(self) -> dict:
+        """
+        Get the governor metrics
+
+        :return: Dictionary of calls, in_flight, waiting (queue depth), max_waiting, and the total, average and maximum
+            wait in seconds
+        """
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "in_flight": self._in_flight,
+                "waiting": self._waiting,
+                "max_waiting": self._max_waiting,
+                "wait_seconds": self._wait_time,
+                "avg_wait_seconds": self._wait_time / self._calls if self._calls else 0.0,
+                "max_wait_seconds": self._max_wait_time,
+            }
@@ -0,0 +1,77 @@
+import hmac
+import time
+import base64
+import struct
+from urllib.parse import parse_qs, unquote, urlsplit
+
+ALGORITHMS = {"SHA1": "sha1", "SHA256": "sha256", "SHA512": "sha512"}
+
+
+def parse_otp_seed(value: str) -> dict:
+    """
+    Parse the value of an OTP field, either an otpauth://totp/ uri or a bare base32 secret
+
+    :param value: Value of the OTP field
+    :return: Dictionary of the base32 "secret", "period", "digits" and "algorithm"
+    """
+    seed = {"secret": value, "period": 30, "digits": 6, "algorithm": "SHA1"}
+    if value.startswith("otpauth://"):
+        parts = urlsplit(value)
+        if parts.netloc.lower() != "totp":
+            raise ValueError("Only TOTP is supported, got: {}".format(parts.netloc))
+        query = {key.lower(): values[0] for key, values in parse_qs(parts.query).items()}
+        if "secret" not in query:
+            raise ValueError("The otpauth uri has no secret")
+        seed["secret"] = unquote(query["secret"])
+        seed["period"] = int(query.get("period", 30))
+        seed["digits"] = int(query.get("digits", 6))
+        seed["algorithm"] = query.get("algorithm", "SHA1").upper()
+    seed["secret"] = seed["secret"].replace(" ", "").upper()
+    if seed["algorithm"] not in ALGORITHMS:
+        raise ValueError("Unsupported OTP algorithm: {}".format(seed["algorithm"]))
+    if seed["period"] < 1 or not 1 <= seed["digits"] <= 10:
+        raise ValueError("Invalid OTP period or digits")
+    decode_secret(seed["secret"])
+    return seed
+
+
+def decode_secret(secret: str) -> bytes:
+    """
+    Decode a base32 secret, padding may be left out as is common in otpauth uris
+    """
+    try:
+        return base64.b32decode(secret + "=" * (-len(secret) % 8))
+    except ValueError:
+        raise ValueError("The OTP secret is not valid base32") from None
+
+
+def totp(secret: str, for_time: float | None = None, period: int = 30, digits: int = 6,
+         algorithm: str = "SHA1") -> str:
+    """
+    Compute a time based one time password as defined in RFC 6238
+
+    :param secret: Base32 encoded secret
+    :param for_time: Unix time to compute the code for (Optional, default=None which uses the current time)
+    :param period: Seconds each code is valid for (Optional, default=30)
+    :param digits: Number of digits of the code (Optional, default=6)
+    :param algorithm: HMAC algorithm, SHA1, SHA256 or SHA512 (Optional, default=SHA1)
+    :return: The code, zero padded to digits
+    """
+    counter = int((time.time() if for_time is None else for_time) // period)
+    digest = hmac.new(decode_secret(secret), struct.pack(">Q", counter), ALGORITHMS[algorithm]).digest()
+    offset = digest[-1] & 0x0f
+    code = struct.unpack(">I", digest[offset:offset + 4])[0] & 0x7fffffff
+    return str(code % 10 ** digits).zfill(digits)
+
+
+def item_otp_seed(item: dict) -> dict:
+    """
+    Find the TOTP seed of a full item as returned by get_item
+
+    :param item: Full item
+    :return: Parsed seed, see parse_otp_seed
+    """
+    for field in item.get("fields", []):
+        if field.get("type") == "OTP" and field.get("value"):
+            return parse_otp_seed(field["value"])
+    raise ValueError("Item {} has no one-time password".format(item.get("id")))
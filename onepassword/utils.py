@@ -1,13 +1,23 @@
 import os
 import base64
+import fcntl
+import hashlib
+import time
+import threading
+import subprocess
+from contextlib import contextmanager
 
-import pexpect
-from Crypto.Cipher import AES
-from Crypto.Util.Padding import pad
+from onepassword.exceptions import OnePasswordCommandError, OnePasswordTimeoutError, command_error
 
 BLOCK_SIZE = 32  # Bytes
-master_password_regex = 'Enter the password for [a-zA-Z0-9._%+-]+\@[a-zA-Z0-9-]+\.[a-zA-z]{2,4} at ' \
-                        '[a-zA-Z0-9-.]+\.1password+\.[a-zA-z]{2,4}'
+PROFILE_FILES = ['.bashrc', '.bash_profile', '.zshrc', '.zprofile']
+SIGNIN_TIMEOUT = 60  # Seconds
+master_password_regex = r'Enter the password for [a-zA-Z0-9._%+-]+\@[a-zA-Z0-9-]+\.[a-zA-z]{2,4} at ' \
+                        r'[a-zA-Z0-9-.]+\.1password+\.[a-zA-z]{2,4}'
+
+
+_profile_cache = {}
+_profile_cache_lock = threading.Lock()
 
 
 def read_bash_return(cmd, single=True):
@@ -20,17 +30,111 @@ def read_bash_return(cmd, single=True):
         return str(preprocessed)
 
 
-def docker_check():
-    f = None
-    user_home = os.environ.get('HOME')
-    for rcfile in ['.bashrc', '.bash_profile', '.zshrc', '.zprofile']:
+def run_op(
+        args: list, input: str | bytes | None = None, timeout: float | None = None, check: bool = True,
+        env: dict | None = None
+) -> subprocess.CompletedProcess:
+    """
+    Run op directly with a list of arguments, without going through a shell
+
+    :param args: Arguments passed to op
+    :param input: Data written to the standard input of op (Optional, default=None which means no input)
+    :param timeout: Seconds the command may take before it is killed (Optional, default=None which waits forever)
+    :param check: Raise if the command exits with a non-zero status (Optional, default=True)
+    :param env: Environment of the command (Optional, default=None which inherits the current environment)
+    :return: Completed process with stdout as bytes and stderr as str
+    """
+    args = list(args)
+    if isinstance(input, str):
+        input = input.encode("utf-8")
+    try:
+        r = subprocess.run(["op"] + args, input=input, stdin=subprocess.DEVNULL if input is None else None,
+                           capture_output=True, timeout=timeout, env=env)
+    except subprocess.TimeoutExpired:
+        raise OnePasswordTimeoutError(args, timeout)
+    except FileNotFoundError:
+        raise OnePasswordCommandError(args, None, "op executable not found on PATH")
+    r.stderr = r.stderr.decode("utf-8", "replace")
+    if check and r.returncode != 0:
+        raise command_error(args, r.returncode, r.stderr)
+    return r
+
+
+class OpStream:
+    """
+    Run op directly and read its standard output in chunks, for output too large to hold in memory. The process is
+    killed once the timeout passes, even while a read is blocked.
+
+    :param args: Arguments passed to op
+    :param timeout: Seconds the command may take, including the time spent between reads (Optional, default=None
+        which waits forever)
+    :param env: Environment of the command (Optional, default=None which inherits the current environment)
+    """
+    def __init__(self, args: list, timeout: float | None = None, env: dict | None = None) -> None:
+        self.args = list(args)
+        self.timeout = timeout
+        try:
+            self.process = subprocess.Popen(["op"] + self.args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                            stderr=subprocess.PIPE, env=env)
+        except FileNotFoundError:
+            raise OnePasswordCommandError(self.args, None, "op executable not found on PATH")
+        self._deadline = None
+        self._timer = None
+        if timeout is not None:
+            self._deadline = time.monotonic() + timeout
+            self._timer = threading.Timer(timeout, self.process.kill)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _expired(self) -> bool:
+        return self._deadline is not None and time.monotonic() >= self._deadline
+
+    def read(self, size: int) -> bytes:
+        """
+        Read the next chunk of output
+
+        :param size: Maximum number of bytes to read
+        :return: The chunk, empty once op exited successfully
+        """
+        if self._expired():
+            raise OnePasswordTimeoutError(self.args, self.timeout)
+        chunk = self.process.stdout.read(size)
+        if chunk:
+            return chunk
+        stderr = self.process.stderr.read()
+        returncode = self.process.wait()
+        if self._expired():
+            raise OnePasswordTimeoutError(self.args, self.timeout)
+        if returncode != 0:
+            raise command_error(self.args, returncode, stderr.decode("utf-8", "replace"))
+        return b""
+
+    def close(self) -> None:
+        """
+        Kill op if it is still running and release its pipes
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+        if self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        self.process.stdout.close()
+        self.process.stderr.close()
+
+
+def _find_rc_file(user_home: str) -> str | None:
+    for rcfile in PROFILE_FILES:
         rcpath = os.path.join(user_home, rcfile)
         if os.path.exists(rcpath):
-            f = open(os.path.join(user_home, rcpath), "r")
-            break
-    if not f:
-        raise Exception("No sehll rc or profile files exist.")
-    bash_profile = f.read()
+            return rcpath
+    return None
+
+
+def docker_check():
+    rcpath = _find_rc_file(os.environ.get('HOME'))
+    if rcpath is None:
+        raise Exception("No shell rc or profile files exist.")
+    bash_profile = "".join(_load_profile(rcpath)[0])
     try:
         docker_flag = bash_profile.split('DOCKER_FLAG="')[1][0]
         if docker_flag == "t":
@@ -61,108 +165,255 @@ def get_session_key(process_resp_before):
         return new_line_response[0]
 
 
-def _spawn_signin(command, m_password) -> str | bool:
-    if command != "":
-        p = pexpect.spawn(command)
-        index = p.expect(master_password_regex)
+def signin_with_password(args: list, m_password: bytes, timeout: float | None = SIGNIN_TIMEOUT,
+                         use_pty: bool = False) -> str | bool:
+    """
+    Run an op sign in command and hand it the master password
+
+    :param args: Arguments passed to op, must include --raw so only the session key is printed
+    :param m_password: Master password
+    :param timeout: Seconds the sign in may take (Optional, default=60)
+    :param use_pty: Answer the password prompt through a pseudo terminal, needs pexpect (Optional, default=False)
+    :return: Session key, or False if the password was not correct
+    """
+    if not args:
+        raise IOError("Signin command not valid")
+    if use_pty:
+        return _spawn_signin(args, m_password, timeout)
+    return _pipe_signin(args, m_password, timeout)
+
+
+def _pipe_signin(args: list, m_password: bytes, timeout: float | None = SIGNIN_TIMEOUT) -> str | bool:
+    r = run_op(args, input=m_password + b"\n", timeout=timeout, check=False)
+    if r.returncode == 0:
+        return r.stdout.decode("utf-8").strip()
+    if "(401) Unauthorized" in r.stderr:
+        print("Input master password is not correct. Please try again")
+        return False
+    raise command_error(args, r.returncode, r.stderr)
+
+
+def _spawn_signin(args: list, m_password: bytes, timeout: float | None = SIGNIN_TIMEOUT) -> str | bool:
+    try:
+        import pexpect
+    except ImportError:
+        raise ImportError("Signing in through a pseudo terminal needs pexpect, install it with: "
+                          "pip install 1password[pty]")
+    p = pexpect.spawn("op", args, timeout=timeout)
+    index = p.expect(master_password_regex)
+    if index == 0:
+        p.sendline(m_password)
+        index = p.expect([pexpect.EOF, r"\(401\) Unauthorized"])
         if index == 0:
-            p.sendline(m_password)
-            index = p.expect([pexpect.EOF, "\(401\) Unauthorized"])
-            if index == 0:
-                sess_key = get_session_key(p.before)
-                p.close()
-                return sess_key
-            elif index == 1:
-                print("Input master password is not correct. Please try again")
-                return False
-        else:
-            raise IOError("Onepassword command not valid")
+            sess_key = get_session_key(p.before)
+            p.close()
+            return sess_key
+        elif index == 1:
+            print("Input master password is not correct. Please try again")
+            return False
     else:
-        raise IOError("Spawn command not valid")
+        raise IOError("Onepassword command not valid")
+
+
+def _parse_profile_line(line: str) -> tuple[str, str] | None:
+    stripped = line.strip()
+    if stripped.startswith("export "):
+        stripped = stripped[len("export "):].lstrip()
+    key, sep, value = stripped.partition("=")
+    if not sep or not key or key.startswith("#") or " " in key:
+        return None
+    return key, value
+
+
+def _load_profile(path: str) -> tuple[list, dict]:
+    """
+    Lines of a profile file and an index of key to (line number, raw value), the file is only parsed again when its
+    modification time or size changed
+
+    :param path: Path of the profile file
+    :return: lines, index
+    """
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _profile_cache_lock:
+        cached = _profile_cache.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1], cached[2]
+    with open(path, "r") as f:
+        lines = f.readlines()
+    return _cache_profile(path, signature, lines)
+
+
+def _cache_profile(path: str, signature: tuple, lines: list) -> tuple[list, dict]:
+    index = {}
+    for number, line in enumerate(lines):
+        parsed = _parse_profile_line(line)
+        if parsed is not None:
+            # later assignments win, and move to the end so the index stays in file order
+            index.pop(parsed[0], None)
+            index[parsed[0]] = (number, parsed[1])
+    with _profile_cache_lock:
+        _profile_cache[path] = (signature, lines, index)
+    return lines, index
+
+
+@contextmanager
+def _locked_directory(path: str):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def _write_atomic(path: str, lines: list) -> None:
+    directory = os.path.dirname(os.path.abspath(path))
+    import tempfile
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".{}.".format(os.path.basename(path)))
+    try:
+        with os.fdopen(fd, "w") as writer:
+            writer.writelines(lines)
+        if os.path.exists(path):
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    stat = os.stat(path)
+    _cache_profile(path, (stat.st_mtime_ns, stat.st_size), lines)
 
 
 class BashProfile:
+    """
+    Read and update environment variables in the shell rc file, and in ~/.profile inside docker. Files are parsed once
+    into an index and only read again when they change on disk, updates are written atomically.
+    """
     def __init__(self):
-        f = None
         user_home = os.environ.get('HOME')
-        for rcfile in ['.bashrc', '.bash_profile', '.zshrc', '.zprofile']:
-            rcpath = os.path.join(user_home, rcfile)
-            if os.path.exists(rcpath):
-                f = open(os.path.join(user_home, rcpath), "r")
-                break
-        if not f:
+        rcpath = _find_rc_file(user_home)
+        if rcpath is None:
             raise Exception("No shell rc or profile files exist.")
+        self.profile_filename = rcpath
         self.other_profile_flag = False
+        self._pending = None
         if docker_check():
-            f2 = None
-            try:
-                f2 = open(os.path.join(user_home, ".profile"), "r")
-            except IOError:
+            other_profile = os.path.join(user_home, ".profile")
+            if os.path.exists(other_profile):
+                self.other_profile_filename = other_profile
+                self.other_profile_flag = True
+            else:
                 print("Profile file does not exist.")
-            self.other_profile = f2.read()
-            self.other_profile_filename = f2.name
-            self.other_profile_flag = True
-            self.other_profile_lines = f2.readlines()
-            f2.close()
-        self.profile_lines = f.readlines()
-        self.profile = f.read()
-        self.profile_filename = f.name
-        f.close()
+
+    @property
+    def profile_lines(self) -> list:
+        return list(_load_profile(self.profile_filename)[0])
+
+    @property
+    def profile(self) -> str:
+        return "".join(_load_profile(self.profile_filename)[0])
+
+    @property
+    def other_profile_lines(self) -> list:
+        return list(_load_profile(self.other_profile_filename)[0]) if self.other_profile_flag else []
+
+    @property
+    def other_profile(self) -> str:
+        return "".join(self.other_profile_lines)
+
+    def _profile_filenames(self) -> list:
+        if self.other_profile_flag:
+            return [self.other_profile_filename, self.profile_filename]
+        return [self.profile_filename]
 
     def get_key_value(self, key, fuzzy=False):
-        key_lines = self.get_key_line(key, fuzzy=fuzzy)
-        if key_lines:
-            key_values = []
-            for ky in key_lines:
-                k = ky.split("=")[0].split(" ")[1]
-                v = ky.split("=")[1]
-                key_values.append({k: v})
-            return key_values
+        key_entries = self._get_key_entries(key, fuzzy=fuzzy)
+        if key_entries:
+            return [{k: v} for _, k, _, v in key_entries]
         else:
             raise ValueError("Environment variable does not exist.")
 
     def get_key_line(self, key, fuzzy=False):
-        key_line = None
-        if self.other_profile_flag:
-            prof = [self.other_profile_lines, self.profile_lines]
-        else:
-            prof = [self.profile_lines]
-
         key_lines = []
-        for prof_lines in prof:
-            if len(prof_lines) > 0:
-                for p in prof_lines:
-                    if (~fuzzy) & (" {}=".format(key) in p):
-                        key_line = p
-                    elif fuzzy & (key in p):
-                        key_line = p
-                key_lines.append(key_line.replace("\n", ""))
+        for prof_name, k, number, v in self._get_key_entries(key, fuzzy=fuzzy):
+            key_lines.append(_load_profile(prof_name)[0][number].replace("\n", ""))
         return key_lines
 
-    def write_profile(self, updated_lines):
-        if self.other_profile_flag:
-            prof_name = [self.other_profile_filename, self.profile_filename]
-        else:
-            prof_name = [self.profile_filename]
+    def _get_key_entries(self, key, fuzzy=False) -> list:
+        """
+        Last assignment of a key in each profile file, fuzzy matches any key containing it
+
+        :return: List of (profile filename, key, line number, raw value), files without the key are left out
+        """
+        key_entries = []
+        for prof_name in self._profile_filenames():
+            index = _load_profile(prof_name)[1]
+            if fuzzy:
+                matches = [k for k in index if key in k]
+                if matches:
+                    k = matches[-1]
+                    key_entries.append((prof_name, k) + index[k])
+            elif key in index:
+                key_entries.append((prof_name, key) + index[key])
+        return key_entries
 
-        for p in prof_name:
-            with open(p, 'w') as writer:
-                writer.writelines(updated_lines)
-                writer.close()
+    def write_profile(self, updated_lines):
+        for p in self._profile_filenames():
+            with _locked_directory(os.path.dirname(os.path.abspath(p))):
+                _write_atomic(p, updated_lines)
 
     def update_profile(self, key, value):
-        for lines in self.profile_lines:
-            if key in lines:
-                self.profile_lines.remove(lines)
-
-        if isinstance(value, str):
-            new_line = 'export {}="{}"\n'.format(key, value)
-            self.profile_lines.append(new_line)
-        self.write_profile(self.profile_lines)
+        """
+        Set a variable as an export line in every profile file, a value that is not a string removes the variable.
+        Inside batch() the write is deferred until the batch ends.
+        """
+        self.update_profiles({key: value})
+
+    def update_profiles(self, values: dict) -> None:
+        """
+        Set several variables with at most one write per profile file, see update_profile
+        """
+        if self._pending is not None:
+            self._pending.update(values)
+            return
+        for p in self._profile_filenames():
+            with _locked_directory(os.path.dirname(os.path.abspath(p))):
+                lines, index = _load_profile(p)
+                if all(index.get(k, (None, None))[1] == ('"{}"'.format(v) if isinstance(v, str) else None)
+                       for k, v in values.items()):
+                    continue
+                updated_lines = [line for line in lines if (_parse_profile_line(line) or (None,))[0] not in values]
+                if updated_lines and not updated_lines[-1].endswith("\n"):
+                    updated_lines[-1] += "\n"
+                for k, v in values.items():
+                    if isinstance(v, str):
+                        updated_lines.append('export {}="{}"\n'.format(k, v))
+                _write_atomic(p, updated_lines)
+
+    @contextmanager
+    def batch(self):
+        """
+        Collect every update_profile call made inside the block and write them once at the end
+        """
+        if self._pending is not None:
+            yield self
+            return
+        self._pending = {}
+        try:
+            yield self
+            pending, self._pending = self._pending, None
+            if pending:
+                self.update_profiles(pending)
+        finally:
+            self._pending = None
 
 
 class Encryption:
+    # Crypto is imported on first use, so importing the package does not pay for it
     def __init__(self, secret_key):
+        from Crypto.Cipher import AES
         if isinstance(secret_key, str):
             self.secret_key = str.encode(secret_key)[0:BLOCK_SIZE]
         else:
@@ -170,12 +421,60 @@ class Encryption:
         self.cipher = AES.new(self.secret_key, AES.MODE_ECB)
 
     def decode(self, encoded):
-        return self.cipher.decrypt(base64.b64decode(encoded)).decode('UTF-8').replace("\x1f", "")
+        from Crypto.Util.Padding import unpad
+        return unpad(self.cipher.decrypt(base64.b64decode(encoded)), BLOCK_SIZE).decode('UTF-8')
 
     def encode(self, input_str):
+        from Crypto.Util.Padding import pad
         return base64.b64encode(self.cipher.encrypt(pad(input_str, BLOCK_SIZE)))
 
 
+class AuthenticatedEncryption:
+    """
+    AES-GCM successor to Encryption, every value gets a fresh nonce and tampering is detected on decode
+
+    :param secret_key: 32 byte key (Optional, default=None which generates a random key held only in memory)
+    """
+    NONCE_SIZE = 12
+    TAG_SIZE = 16
+
+    def __init__(self, secret_key: bytes | None = None) -> None:
+        self.secret_key = os.urandom(BLOCK_SIZE) if secret_key is None else secret_key[0:BLOCK_SIZE]
+
+    def decode(self, encoded: bytes) -> str:
+        from Crypto.Cipher import AES
+        nonce = encoded[:self.NONCE_SIZE]
+        tag = encoded[self.NONCE_SIZE:self.NONCE_SIZE + self.TAG_SIZE]
+        cipher = AES.new(self.secret_key, AES.MODE_GCM, nonce=nonce)
+        return cipher.decrypt_and_verify(encoded[self.NONCE_SIZE + self.TAG_SIZE:], tag).decode('UTF-8')
+
+    def encode(self, input_str: str | bytes) -> bytes:
+        if isinstance(input_str, str):
+            input_str = input_str.encode('UTF-8')
+        from Crypto.Cipher import AES
+        cipher = AES.new(self.secret_key, AES.MODE_GCM, nonce=os.urandom(self.NONCE_SIZE))
+        ciphertext, tag = cipher.encrypt_and_digest(input_str)
+        return cipher.nonce + tag + ciphertext
+
+
+def content_digest(document):
+    """
+    SHA-256 digest of a document, files are hashed in chunks and file objects are read into memory
+
+    :param document: Path of the document, or its content as bytes or a binary file object
+    :return: hex digest, document (file objects are replaced by the bytes read from them)
+    """
+    if isinstance(document, (str, os.PathLike)):
+        digest = hashlib.sha256()
+        with open(document, "rb") as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest(), document
+    if not isinstance(document, bytes):
+        document = document.read()
+    return hashlib.sha256(document).hexdigest(), document
+
+
 def bump_version(version_type="patch"):
     """
     Only run in the project root directory, this is for github to bump the version file only!
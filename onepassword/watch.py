@@ -0,0 +1,198 @@
+import queue
+import random
+import threading
+from dataclasses import dataclass
+from typing import Callable
+from onepassword.sync import diff_listing, item_version
+
+
+@dataclass
+class ItemEvent:
+    """
+    Change of an item seen by a VaultWatcher
+
+    :param kind: "added", "changed" or "removed"
+    :param vault: Vault the item is in
+    :param uuid: Uuid of the item
+    :param summary: Item summary from the listing, the last one seen for removed items
+    :param item: Full item as returned by get_item, None for removed items
+    """
+    kind: str
+    vault: str
+    uuid: str
+    summary: dict
+    item: dict | None = None
+
+
+class VaultWatcher:
+    """
+    Polls vault listings and reports the items that were added, changed or removed. Listings are compared by version and
+    update time, so a poll costs one listing per vault plus a get_item for each item that changed. The first poll only
+    records the current versions.
+
+    :param op: Client used to list and get the items, e.g. OnePassword or ConnectOnePassword
+    :param vaults: Names of the vaults to watch
+    :param callback: Called with an ItemEvent for every change, from a worker thread
+    :param interval: Seconds between two polls (Optional, default=30)
+    :param jitter: Fraction the interval is randomly varied by, so many watchers do not poll in step (Optional,
+        default=0.1)
+    :param max_backoff: Upper bound of the wait after failed polls, the interval is doubled on each failure in a row
+        (Optional, default=300)
+    :param on_error: Called with the exception of a failed poll, item fetch or callback (Optional, default=None)
+    :param max_workers: Maximum number of op processes running at once (Optional, default=8)
+    """
+    def __init__(self, op, vaults: list, callback: Callable[[ItemEvent], None], interval: float = 30,
+                 jitter: float = 0.1, max_backoff: float = 300, on_error: Callable[[Exception], None] | None = None,
+                 max_workers: int = 8) -> None:
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter must be at least 0 and less than 1")
+        self.op = op
+        self.vaults = list(dict.fromkeys(vaults))
+        self.callback = callback
+        self.interval = interval
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.on_error = on_error
+        self.max_workers = max_workers
+        self.failures = 0
+        self.last_error = None
+        # last summary seen of every item, by vault and uuid
+        self._summaries = {}
+        self._events = queue.Queue()
+        self._stopped = threading.Event()
+        self._threads = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def delay(self) -> float:
+        """
+        Seconds to wait before the next poll
+
+        :return: Interval with jitter, backed off exponentially after failed polls
+        """
+        delay = min(self.max_backoff, self.interval * 2 ** self.failures) if self.failures else self.interval
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _list(self) -> dict:
+        if len(self.vaults) == 1:
+            return {self.vaults[0]: self.op.list_items(vault=self.vaults[0])}
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(self.vaults))) as executor:
+            return dict(zip(self.vaults, executor.map(lambda vault: self.op.list_items(vault=vault), self.vaults)))
+
+    def _forget(self, vault: str, uuids: list) -> None:
+        # drop cached secrets of the items so get_item and read see the new values
+        invalidate = getattr(self.op, "invalidate", None)
+        if invalidate is not None:
+            for uuid in uuids:
+                invalidate(uuid)
+                title = self._summaries[vault][uuid].get("title")
+                if title:
+                    invalidate(title)
+
+    def poll(self) -> list:
+        """
+        List every watched vault once and fetch the items that changed since the last poll. Items that could not be
+        fetched are reported to on_error and retried on the next poll.
+
+        :return: Events of this poll, empty on the first poll
+        """
+        listings = self._list()
+        events, fetch = [], []
+        for vault, listing in listings.items():
+            known = self._summaries.get(vault)
+            summaries = {item["id"]: item for item in listing}
+            if known is None:
+                self._summaries[vault] = summaries
+                continue
+            changes = diff_listing(listing, {uuid: item_version(summary) for uuid, summary in known.items()})
+            self._forget(vault, changes.changed + changes.removed)
+            for uuid in changes.removed:
+                events.append(ItemEvent("removed", vault, uuid, known.pop(uuid)))
+            fetch += [(vault, uuid, kind, summaries[uuid])
+                      for kind, uuids in (("added", changes.added), ("changed", changes.changed)) for uuid in uuids]
+            if (changes.added or changes.removed) and hasattr(self.op, "invalidate_uuid_cache"):
+                self.op.invalidate_uuid_cache(vault)
+        if fetch:
+            items, errors = self.op.get_items([uuid for _, uuid, _, _ in fetch], max_workers=self.max_workers)
+            for vault, uuid, kind, summary in fetch:
+                if uuid in errors:
+                    self._report(errors[uuid])
+                    continue
+                self._summaries[vault][uuid] = summary
+                events.append(ItemEvent(kind, vault, uuid, summary, items[uuid]))
+        return events
+
+    def _report(self, error: Exception) -> None:
+        self.last_error = error
+        if self.on_error is not None:
+            try:
+                self.on_error(error)
+            except Exception:
+                pass
+
+    def start(self):
+        """
+        Take the first listing of every vault, then keep polling and dispatching events on background threads
+
+        :return: The watcher itself
+        """
+        if self._threads:
+            raise RuntimeError("The watcher is already running")
+        self._stopped.clear()
+        self.poll()
+        self._threads = [threading.Thread(target=self._poll_loop, name="onepassword-watch", daemon=True),
+                         threading.Thread(target=self._dispatch_loop, name="onepassword-watch-events", daemon=True)]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout: float | None = None) -> None:
+        """
+        Stop polling, events already seen are still dispatched
+
+        :param timeout: Seconds to wait for the threads to finish (Optional, default=None which waits until they do)
+        """
+        self._stopped.set()
+        poller, dispatcher = self._threads or (None, None)
+        if poller is not None and poller is not threading.current_thread():
+            poller.join(timeout)
+        self._events.put(None)
+        if dispatcher is not None and dispatcher is not threading.current_thread():
+            dispatcher.join(timeout)
+        self._threads = []
+
+    @property
+    def running(self) -> bool:
+        """
+        Whether the watcher was started and not stopped yet
+        """
+        return bool(self._threads) and not self._stopped.is_set()
+
+    def _poll_loop(self) -> None:
+        while not self._stopped.wait(self.delay()):
+            try:
+                events = self.poll()
+            except Exception as e:
+                self.failures += 1
+                self._report(e)
+                continue
+            self.failures = 0
+            for event in events:
+                self._events.put(event)
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            event = self._events.get()
+            if event is None:
+                return
+            try:
+                self.callback(event)
+            except Exception as e:
+                self._report(e)
@@ -42,9 +42,11 @@ setup(
     install_requires=[
         "wget",
         "pyyaml",
-        "pycryptodome",
-        "pexpect"
+        "pycryptodome"
     ],
+    extras_require={
+        "pty": ["pexpect"]
+    },
     python_requires='>=3.7',
     license="MIT",
     url="https://github.com/wandera/1password-client",
@@ -54,6 +56,9 @@ setup(
                  "Operating System :: POSIX",
                  "Operating System :: Unix"],
     packages=["onepassword"],
+    entry_points={
+        "console_scripts": ["op-load-env=onepassword.env:main"]
+    },
     tests_require=["nose", "mock", "pytest"],
     test_suite="nose.collector",
     cmdclass={
@@ -0,0 +1,80 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+VAULTS = [{"id": "v1", "name": "Private"}]
+ITEMS = {
+    "v1": [
+        {"id": "i1", "title": "db", "version": 2, "updatedAt": "2024-01-01T00:00:00Z", "vault": {"id": "v1"},
+         "category": "LOGIN"},
+        {"id": "d1", "title": "config", "version": 1, "updatedAt": "2024-01-01T00:00:00Z", "vault": {"id": "v1"},
+         "category": "DOCUMENT"},
+    ],
+}
+FULL_ITEMS = {
+    "i1": {"id": "i1", "title": "db", "vault": {"id": "v1"}, "sections": [{"id": "s1", "label": "prod"}], "fields": [
+        {"id": "username", "label": "username", "value": "admin"},
+        {"id": "password", "label": "password", "value": "secret"},
+        {"id": "f3", "label": "password", "value": "prod-secret", "section": {"id": "s1"}},
+    ]},
+    "d1": {"id": "d1", "title": "config", "vault": {"id": "v1"}, "fields": []},
+}
+FILES = {"d1": [{"id": "file1", "name": "config.json"}]}
+CONTENTS = {"file1": b'{"key": "value"}'}
+
+
+class FakeConnect:
+    """Run a stub 1Password Connect server on localhost for the lifetime of the context"""
+    token = "fake-token"
+
+    def __init__(self):
+        self.requests = []
+        self.clients = set()
+        self.fail = []
+
+    def __enter__(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                fake.requests.append(self.path)
+                fake.clients.add(self.client_address)
+                if fake.fail:
+                    return self.reply(fake.fail.pop(0), {"status": 500, "message": "failure"})
+                if self.headers.get("Authorization") != "Bearer {}".format(fake.token):
+                    return self.reply(401, {"status": 401, "message": "Invalid token signature"})
+                parts = self.path.strip("/").split("/")[1:]
+                if parts == ["vaults"]:
+                    return self.reply(200, VAULTS)
+                if len(parts) == 3 and parts[2] == "items" and parts[1] in ITEMS:
+                    return self.reply(200, ITEMS[parts[1]])
+                if len(parts) == 4 and parts[3] in FULL_ITEMS:
+                    return self.reply(200, FULL_ITEMS[parts[3]])
+                if len(parts) == 5 and parts[4] == "files" and parts[3] in FILES:
+                    return self.reply(200, FILES[parts[3]])
+                if len(parts) == 7 and parts[6] == "content" and parts[5] in CONTENTS:
+                    return self.reply(200, CONTENTS[parts[5]])
+                self.reply(404, {"status": 404, "message": "item not found"})
+
+            def reply(self, status, body):
+                if not isinstance(body, bytes):
+                    body = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = "http://127.0.0.1:{}".format(self.server.server_address[1])
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,24 @@
+import os
+import stat
+import shutil
+import tempfile
+
+
+class FakeOp:
+    """Put a shell script named op first on the PATH for the lifetime of the context"""
+    def __init__(self, script):
+        self.script = script
+
+    def __enter__(self):
+        self.bin_dir = tempfile.mkdtemp()
+        op_path = os.path.join(self.bin_dir, "op")
+        with open(op_path, "w") as f:
+            f.write(self.script)
+        os.chmod(op_path, os.stat(op_path).st_mode | stat.S_IEXEC)
+        self.path = os.environ["PATH"]
+        os.environ["PATH"] = self.bin_dir + os.pathsep + self.path
+        return self
+
+    def __exit__(self, *exc):
+        os.environ["PATH"] = self.path
+        shutil.rmtree(self.bin_dir)
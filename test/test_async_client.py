@@ -0,0 +1,92 @@
+import os
+import asyncio
+import tempfile
+import unittest
+from unittest import mock
+from onepassword import AsyncOnePassword
+from onepassword.client import SignIn
+from onepassword.exceptions import OnePasswordCommandError, OnePasswordTimeoutError
+from test.fake_op import FakeOp
+
+FAKE_OP = """#!/bin/sh
+[ -n "$FAKE_OP_LOG" ] && echo "$1 $2 $3" >> "$FAKE_OP_LOG"
+case "$1" in
+  read) echo "secret-for-$2" ;;
+  items) echo '[{"id": "abc", "title": "doc", "tags": ["team"]}]' ;;
+  item)
+    case "$2" in
+      get) echo '{"id": "'$3'", "fields": [{"id": "password", "label": "password", "value": "s3cret"}]}' ;;
+      delete) ;;
+    esac ;;
+  document)
+    case "$2" in
+      create) cat > /dev/null; echo '{"uuid": "new"}' ;;
+      edit) cat > /dev/null ;;
+      *) echo "contents-of-$3" ;;
+    esac ;;
+  sleep) exec sleep 5 ;;
+  *) echo "unknown command $1" >&2; exit 1 ;;
+esac
+"""
+
+
+class TestAsyncClient(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.fake_op = FakeOp(FAKE_OP).__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake_op.__exit__(None, None, None)
+
+    def setUp(self):
+        self.op = AsyncOnePassword(max_concurrency=2, timeout=2, signin_strategy=SignIn())
+
+    def test_read(self):
+        async def read_all():
+            return await asyncio.gather(*(self.op.read("op://v/i/{}".format(n)) for n in range(5)))
+
+        self.assertEqual(asyncio.run(read_all()), ["secret-for-op://v/i/{}".format(n) for n in range(5)])
+
+    def test_get_document_str(self):
+        async def get_twice():
+            return await self.op.get_document_str("doc"), await self.op.get_document_str("missing")
+
+        self.assertEqual(asyncio.run(get_twice()), ("contents-of-abc\n", None))
+
+    def test_get_item_fields(self):
+        async def get():
+            return await self.op.get_item("abc", ["host", "Password"]), await self.op.get_item("abc", "password")
+
+        self.assertEqual(asyncio.run(get()), ({"Password": "s3cret"}, {"password": "s3cret"}))
+
+    def test_document_writes(self):
+        log = tempfile.NamedTemporaryFile(delete=False)
+        log.close()
+        self.addCleanup(os.remove, log.name)
+
+        async def write():
+            return (await self.op.put_document(b"content", "new-doc"), await self.op.update_document(b"v2", "doc"),
+                    await self.op.update_document(b"v2", "doc"), await self.op.delete_document("doc"),
+                    await self.op.get_uuid("doc"))
+
+        with mock.patch.dict(os.environ, {"FAKE_OP_LOG": log.name}):
+            self.assertEqual(asyncio.run(write()), (True, True, True, None, None))
+        # skipping the upload is only decided on a fresh listing, which still has the old content here
+        with open(log.name) as f:
+            self.assertEqual(f.read().splitlines(), ["items list --vault", "document create -", "document edit abc",
+                                                     "items list --vault", "document edit abc", "item delete abc"])
+
+    def test_command_error(self):
+        with self.assertRaises(OnePasswordCommandError) as raised:
+            asyncio.run(self.op.signout())
+        self.assertEqual(raised.exception.returncode, 1)
+        self.assertIn("unknown command signout", raised.exception.stderr)
+
+    def test_timeout(self):
+        with self.assertRaises(OnePasswordTimeoutError):
+            asyncio.run(self.op._run("sleep", timeout=0.2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from unittest import mock
+from onepassword.cache import SecretCache
+
+
+class TestSecretCache(unittest.TestCase):
+    def test_get_set(self):
+        cache = SecretCache()
+        cache.set(("read", "op://v/i/f"), "secret")
+        cache.set(("item", "abc", None), {"id": "abc"})
+        self.assertEqual(cache.get(("read", "op://v/i/f")), "secret")
+        self.assertEqual(cache.get(("item", "abc", None)), {"id": "abc"})
+        self.assertIsNone(cache.get(("item", "def", None)))
+        self.assertEqual(cache.stats()["hits"], 2)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_values_are_encrypted(self):
+        cache = SecretCache()
+        cache.set(("read", "op://v/i/f"), "plain-text-secret")
+        for entry in cache._entries.values():
+            self.assertNotIn(b"plain-text-secret", entry[2])
+
+    def test_ttl(self):
+        cache = SecretCache(ttl=10)
+        with mock.patch("onepassword.cache.time.monotonic", return_value=100):
+            cache.set(("read", "ref"), "secret")
+        with mock.patch("onepassword.cache.time.monotonic", return_value=109):
+            self.assertTrue(cache.contains(("read", "ref")))
+            self.assertEqual(cache.get(("read", "ref")), "secret")
+        with mock.patch("onepassword.cache.time.monotonic", return_value=110):
+            self.assertFalse(cache.contains(("read", "ref")))
+            self.assertIsNone(cache.get(("read", "ref")))
+        self.assertEqual(len(cache), 0)
+
+    def test_lru_eviction(self):
+        cache = SecretCache(max_entries=2)
+        cache.set(("read", "a"), "1")
+        cache.set(("read", "b"), "2")
+        cache.get(("read", "a"))
+        cache.set(("read", "c"), "3")
+        self.assertIsNone(cache.get(("read", "b")))
+        self.assertEqual(cache.get(("read", "a")), "1")
+        self.assertEqual(cache.get(("read", "c")), "3")
+
+    def test_byte_budget(self):
+        cache = SecretCache(max_bytes=100)
+        cache.set(("read", "a"), "x" * 40)
+        cache.set(("read", "b"), "x" * 40)
+        self.assertEqual(len(cache), 1)
+        self.assertLessEqual(cache.size, 100)
+        cache.set(("read", "c"), "x" * 200)
+        self.assertIsNone(cache.get(("read", "c")))
+        cache.set(("read", "b"), "x" * 200)
+        self.assertIsNone(cache.get(("read", "b")))
+        self.assertEqual((len(cache), cache.size), (0, 0))
+
+    def test_invalidate(self):
+        cache = SecretCache()
+        cache.set(("item", "abc", None), {"id": "abc"})
+        cache.set(("item", "abc", "password"), {"password": "p"})
+        cache.set(("read", "op://vault/abc/password"), "p")
+        cache.set(("read", "op://vault/other/password"), "q")
+        self.assertEqual(cache.invalidate("abc"), 3)
+        self.assertEqual(cache.invalidate("op://vault/other/password"), 1)
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,24 @@
 import unittest
 import os
 import sys
-from io import StringIO
-# from onepassword import OnePassword
+import json
+import queue
+import time
+import hashlib
+import threading
+import shutil
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO, StringIO
+from unittest import mock
+from onepassword import OnePassword
+from onepassword.client import SignIn, reference_value
+from onepassword.cache import SecretCache
+from onepassword.exceptions import OnePasswordCommandError, OnePasswordTimeoutError, OnePasswordTransientError
+from onepassword.throttle import CallGovernor
+from onepassword.totp import totp
+from test.fake_op import FakeOp
 
 
 def set_up_one_password():
@@ -19,6 +35,16 @@ def set_up_one_password():
     # return OnePassword(account=account, domain=domain, email=email, secret=secret, password=password)
 
 
+def op_output(stdout: str | bytes = b""):
+    """Completed op process with the given output"""
+    return subprocess.CompletedProcess([], 0, stdout.encode() if isinstance(stdout, str) else stdout, "")
+
+
+def set_up_signed_in_client(**kwargs):
+    """Build a OnePassword client without going through a real sign in"""
+    return OnePassword(signin_strategy=SignIn(), **kwargs)
+
+
 class TestClient(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -65,9 +91,29 @@ class TestClient(unittest.TestCase):
 
     def test_get_uuid(self):
         """
-        Without user interaction will not be signed in and be unable to get anything
+        Repeat lookups are answered from the cached vault listing
         """
-        pass
+        op = set_up_signed_in_client()
+        listing = json.dumps([{"id": "abc", "title": "doc"}, {"id": "def", "title": "other"}])
+        with mock.patch("onepassword.client.run_op", return_value=op_output(listing)) as run_op:
+            self.assertEqual(op.get_uuid("doc"), "abc")
+            self.assertEqual(op.get_uuid("other"), "def")
+            self.assertIsNone(op.get_uuid("missing"))
+            self.assertEqual(run_op.call_count, 1)
+            op.invalidate_uuid_cache("Private")
+            self.assertEqual(op.get_uuid("doc"), "abc")
+            self.assertEqual(run_op.call_count, 2)
+
+    def test_get_uuid_cache_disabled(self):
+        """
+        A ttl of 0 lists the vault on every lookup
+        """
+        op = set_up_signed_in_client(uuid_cache_ttl=0)
+        listing = json.dumps([{"id": "abc", "title": "doc"}])
+        with mock.patch("onepassword.client.run_op", return_value=op_output(listing)) as run_op:
+            op.get_uuid("doc")
+            op.get_uuid("doc")
+            self.assertEqual(run_op.call_count, 2)
 
     def test_get_document(self):
         """
@@ -75,33 +121,162 @@ class TestClient(unittest.TestCase):
         """
         pass
 
+    def test_get_document_to(self):
+        """
+        Documents are streamed to the destination as raw bytes
+        """
+        op = set_up_signed_in_client()
+        listing = json.dumps([{"id": "abc", "title": "doc"}])
+        content = bytes(range(256)) * 1000
+        process = mock.Mock(stdout=BytesIO(content), stderr=BytesIO(b""))
+        process.wait.return_value = 0
+        process.poll.return_value = 0
+        destination = BytesIO()
+        with mock.patch("onepassword.client.run_op", return_value=op_output(listing)), \
+                mock.patch("onepassword.client.subprocess.Popen", return_value=process) as popen:
+            self.assertEqual(op.get_document_to(destination, "doc", chunk_size=1000), len(content))
+            self.assertIsNone(op.get_document_to(destination, "missing"))
+        self.assertEqual(destination.getvalue(), content)
+        self.assertEqual(popen.call_args[0][0], ["op", "document", "get", "abc", "--vault", "Private"])
+
+    def test_document_writes_are_not_retried(self):
+        """
+        A create whose response was lost could have taken effect, so it is not run a second time
+        """
+        op = set_up_signed_in_client()
+        listing = op_output(json.dumps([]))
+        error = OnePasswordTransientError(["document", "create"], 1, "[ERROR] (502) Bad Gateway")
+        with mock.patch("onepassword.client.run_op", side_effect=[listing, error]) as run_op, \
+                mock.patch("onepassword.retry.time.sleep"):
+            with self.assertRaises(OnePasswordTransientError):
+                op.put_document(b"content", "doc")
+            self.assertEqual(run_op.call_count, 2)
+
+    def test_iter_document_through_op(self):
+        """
+        Streams sign in again before the first chunk, time out and hold no governor slot while being consumed
+        """
+        state = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, state)
+        script = """#!/bin/sh
+case "$1 $2" in
+  "items list") echo '[{"id": "d1", "title": "doc"}, {"id": "d2", "title": "slow"}]' ;;
+  "read "*) echo secret ;;
+  "document get")
+    [ -e "%s/signed-in" ] || { touch "%s/signed-in"; echo "[ERROR] session expired" >&2; exit 1; }
+    [ "$3" = "d2" ] && exec sleep 5
+    printf 'document content' ;;
+esac
+""" % (state, state)
+        with FakeOp(script):
+            op = set_up_signed_in_client(governor=CallGovernor(max_concurrency=1), timeout=1)
+            chunks = []
+            for chunk in op.iter_document("doc", chunk_size=4):
+                chunks.append(chunk)
+                self.assertEqual(op.read("op://v/i/f"), "secret")
+            self.assertEqual(b"".join(chunks), b"document content")
+            start = time.monotonic()
+            with self.assertRaises(OnePasswordTimeoutError):
+                list(op.iter_document("slow"))
+            self.assertLess(time.monotonic() - start, 4)
+
+    def test_iter_document_error(self):
+        """
+        A failing download raises instead of silently ending the stream
+        """
+        op = set_up_signed_in_client()
+        listing = json.dumps([{"id": "abc", "title": "doc"}])
+        process = mock.Mock(stdout=BytesIO(b""), stderr=BytesIO(b"not signed in"))
+        process.wait.return_value = 1
+        process.returncode = 1
+        with mock.patch("onepassword.client.run_op", return_value=op_output(listing)), \
+                mock.patch("onepassword.client.subprocess.Popen", return_value=process):
+            with self.assertRaises(OnePasswordCommandError):
+                list(op.iter_document("doc"))
+
     def test_put_document(self):
         """
-        Tested in signin and read_bash_return.
+        A created document is added to a loaded vault listing
         """
-        pass
+        op = set_up_signed_in_client()
+        with mock.patch("onepassword.client.run_op", return_value=op_output("[]")):
+            op.list_items("Private")
+        # the cached listing has no such document, so the vault is listed again before creating it
+        with mock.patch("onepassword.client.run_op", side_effect=[op_output("[]"), op_output('{"uuid": "new"}')]) \
+                as run_op:
+            self.assertTrue(op.put_document(b"content", "doc", file_name="doc.txt"))
+        self.assertEqual(run_op.call_args[0][0], ["document", "create", "-", "--title", "doc", "--vault", "Private",
+                                                  "--tags", "sha256:" + hashlib.sha256(b"content").hexdigest(),
+                                                  "--format=json", "--file-name", "doc.txt"])
+        with mock.patch("onepassword.client.run_op") as run_op:
+            self.assertEqual(op.get_uuid("doc"), "new")
+            run_op.assert_not_called()
 
     def test_update_document(self):
         """
-        Tested in delete_document, put_document and os.
+        Existing documents are edited in place from bytes without touching any local file
         """
-        pass
+        op = set_up_signed_in_client()
+        listing = json.dumps([{"id": "abc", "title": "doc"}])
+        with mock.patch("onepassword.client.run_op", return_value=op_output(listing)) as run_op, \
+                mock.patch("onepassword.client.os.remove") as remove:
+            op.update_document(b"new content", "doc", file_name="doc.json")
+        digest_tag = "sha256:" + hashlib.sha256(b"new content").hexdigest()
+        run_op.assert_called_with(["document", "edit", "abc", "-", "--vault", "Private", "--tags", digest_tag,
+                                   "--file-name", "doc.json"], input=b"new content", timeout=None, env=None)
+        self.assertEqual(run_op.call_count, 2)
+        remove.assert_not_called()
+        self.assertEqual(op.get_uuid("doc"), "abc")
+
+    def test_update_document_created_elsewhere(self):
+        """
+        A document created since the listing was cached is edited rather than created a second time
+        """
+        op = set_up_signed_in_client()
+        with mock.patch("onepassword.client.run_op", return_value=op_output("[]")):
+            op.list_items("Private")
+        listing = json.dumps([{"id": "abc", "title": "cfg"}])
+        with mock.patch("onepassword.client.run_op", return_value=op_output(listing)) as run_op:
+            self.assertTrue(op.update_document(b"content", "cfg"))
+        self.assertEqual(run_op.call_args_list[0][0][0][:2], ["items", "list"])
+        self.assertEqual(run_op.call_args[0][0][:3], ["document", "edit", "abc"])
+
+    def test_update_document_unchanged(self):
+        """
+        Content whose digest matches the document tag is not uploaded again
+        """
+        op = set_up_signed_in_client()
+        digest_tag = "sha256:" + hashlib.sha256(b"content").hexdigest()
+        listing = json.dumps([{"id": "abc", "title": "doc", "tags": ["config", digest_tag]}])
+        with mock.patch("onepassword.client.run_op", return_value=op_output(listing)) as run_op:
+            self.assertFalse(op.update_document(BytesIO(b"content"), "doc"))
+            self.assertFalse(op.put_document(b"content", "doc"))
+            self.assertTrue(op.update_document(b"changed", "doc"))
+        # a matching digest in the cached listing is checked against a fresh one
+        self.assertEqual(run_op.call_count, 3)
+        self.assertIn("config,sha256:" + hashlib.sha256(b"changed").hexdigest(), run_op.call_args[0][0])
 
     def test_delete_document(self):
         """
-        Tested in signing, get_uuid and read_bash_return.
+        A deleted document is removed from the vault listing
         """
-        pass
+        op = set_up_signed_in_client()
+        listing = json.dumps([{"id": "abc", "title": "doc"}])
+        with mock.patch("onepassword.client.run_op", side_effect=[op_output(listing), op_output()]):
+            op.delete_document("doc")
+        with mock.patch("onepassword.client.run_op") as run_op:
+            self.assertIsNone(op.get_uuid("doc"))
+            run_op.assert_not_called()
 
     def test_signout(self):
         """
-        Tested in read_bash_return.
+        Tested in run_op.
         """
         pass
 
     def test_list_vaults(self):
         """
-        Tested in read_bash_return.
+        Tested in run_op.
         """
         pass
 
@@ -111,6 +286,292 @@ class TestClient(unittest.TestCase):
         """
         pass
 
+    def test_get_items_batch(self):
+        """
+        Items are fetched once per unique uuid and failures are reported without aborting the batch
+        """
+        op = set_up_signed_in_client()
+
+        def fake_get_item(uuid, fields=None):
+            if uuid == "bad":
+                raise ValueError("no such item")
+            return {"id": uuid, "fields": fields}
+
+        with mock.patch.object(op, "get_item", side_effect=fake_get_item) as get_item:
+            items, errors = op.get_items(["a", "b", "bad", "a"], fields="password", max_workers=2)
+        self.assertEqual(items, {"a": {"id": "a", "fields": "password"}, "b": {"id": "b", "fields": "password"}})
+        self.assertEqual(list(errors), ["bad"])
+        self.assertIsInstance(errors["bad"], ValueError)
+        self.assertEqual(get_item.call_count, 3)
+
+    def test_read_multiline(self):
+        """
+        Only the newline op adds is stripped, so read returns the same value as read_many
+        """
+        op = set_up_signed_in_client()
+        key = "-----BEGIN KEY-----\nabc\n-----END KEY-----"
+        with mock.patch("onepassword.client.run_op", return_value=op_output(key + "\n")):
+            self.assertEqual(op.read("op://v/i/key"), key)
+
+    def test_read_many(self):
+        """
+        All references are resolved by one op inject call
+        """
+        op = set_up_signed_in_client()
+
+        def fake_inject(args, input, **kwargs):
+            return op_output(input.replace("{{ op://v/i/", "value-").replace(" }}", ""))
+
+        with mock.patch("onepassword.client.run_op", side_effect=fake_inject) as run_op:
+            self.assertEqual(op.read_many(["op://v/i/a", "op://v/i/b", "op://v/i/a"]),
+                             {"op://v/i/a": "value-a", "op://v/i/b": "value-b"})
+            self.assertEqual(run_op.call_count, 1)
+
+    def test_read_many_fallback(self):
+        """
+        Failing references are narrowed down and read one at a time
+        """
+        op = set_up_signed_in_client()
+
+        def fake_inject(args, input, **kwargs):
+            if "op://v/i/bad" in input:
+                raise OnePasswordCommandError(args, 1, "could not resolve op://v/i/bad")
+            return op_output(input.replace("{{ op://v/i/", "value-").replace(" }}", ""))
+
+        refs = ["op://v/i/a", "op://v/i/b", "op://v/i/c", "op://v/i/bad"]
+        with mock.patch("onepassword.client.run_op", side_effect=fake_inject), \
+                mock.patch.object(op, "read", side_effect=lambda ref: ref.replace("op://v/i/", "read-")) as read:
+            self.assertEqual(op.read_many(refs), {"op://v/i/a": "value-a", "op://v/i/b": "value-b",
+                                                  "op://v/i/c": "read-c", "op://v/i/bad": "read-bad"})
+            self.assertEqual(read.call_count, 2)
+
+    def test_read_cached(self):
+        """
+        Repeat reads are served from the cache until invalidated
+        """
+        op = set_up_signed_in_client(cache=SecretCache())
+        with mock.patch("onepassword.client.run_op", return_value=op_output("secret")) as run_op:
+            self.assertEqual(op.read("op://v/i/f"), "secret")
+            self.assertEqual(op.read("op://v/i/f"), "secret")
+            self.assertEqual(run_op.call_count, 1)
+            op.invalidate("op://v/i/f")
+            op.read("op://v/i/f")
+            self.assertEqual(run_op.call_count, 2)
+        self.assertEqual(op.cache.hits, 1)
+
+    def test_read_coalesced(self):
+        """
+        Concurrent reads of the same reference share one op process
+        """
+        governor = CallGovernor(max_concurrency=2)
+        op = set_up_signed_in_client(governor=governor)
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_read(*args, **kwargs):
+            started.set()
+            release.wait(5)
+            return op_output("secret")
+
+        with mock.patch("onepassword.client.run_op", side_effect=slow_read) as run_op:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                first = executor.submit(op.read, "op://v/i/f")
+                started.wait(5)
+                others = [executor.submit(op.read, "op://v/i/f") for _ in range(3)]
+                while op.singleflight.coalesced < 3:
+                    time.sleep(0.01)
+                release.set()
+                self.assertEqual([f.result() for f in [first] + others], ["secret"] * 4)
+            self.assertEqual(run_op.call_count, 1)
+        self.assertEqual(governor.stats()["calls"], 1)
+
+    def test_resolve(self):
+        """
+        References to the same item cost one op call
+        """
+        op = set_up_signed_in_client(cache=SecretCache())
+        items = {
+            "db": {"id": "i1", "sections": [{"id": "s1", "label": "Prod"}], "fields": [
+                {"id": "username", "label": "username", "value": "admin"},
+                {"id": "password", "type": "CONCEALED", "label": "password", "value": "dev-secret"},
+                {"id": "f3", "label": "password", "value": "prod-secret", "section": {"id": "s1"}},
+                {"id": "TOTP_1", "type": "OTP", "label": "one-time password",
+                 "value": "otpauth://totp/x?secret=GEZDGNBV", "totp": "123456"},
+            ]},
+            "api": {"id": "i2", "fields": [{"id": "credential", "label": "credential", "value": "token"}]},
+        }
+        refs = ["op://v/db/username", "op://v/db/Password", "op://v/db/prod/password",
+                "op://v/db/one-time password?attribute=otp", "op://v/db/password?attribute=type",
+                "op://v/api/credential"]
+        with mock.patch("onepassword.client.run_op",
+                        side_effect=lambda args, **kwargs: op_output(json.dumps(items[args[2]]))) as run_op, \
+                mock.patch("onepassword.totp.time.time", return_value=59):
+            self.assertEqual(op.resolve(refs), dict(zip(refs, ["admin", "dev-secret", "prod-secret",
+                                                               totp("GEZDGNBV", for_time=59), "CONCEALED", "token"])))
+            self.assertEqual(run_op.call_count, 2)
+            self.assertEqual(op.resolve(["op://v/api/credential"]), {"op://v/api/credential": "token"})
+            self.assertEqual(run_op.call_count, 2)
+            with self.assertRaises(OnePasswordCommandError):
+                op.resolve(["op://v/db/missing"])
+            with self.assertRaises(ValueError):
+                op.resolve(["db/username"])
+
+    def test_reference_value_otp(self):
+        """
+        The totp stored in an item is ignored, codes are computed from the seed when the reference is read
+        """
+        item = {"id": "i1", "fields": [{"id": "TOTP_1", "label": "one-time password", "type": "OTP",
+                                        "value": "otpauth://totp/x?secret=GEZDGNBV", "totp": "123456"}]}
+        for now in (59, 89):
+            with mock.patch("onepassword.totp.time.time", return_value=now):
+                self.assertEqual(reference_value(item, None, "one-time password", "otp"), totp("GEZDGNBV", now))
+        del item["fields"][0]["value"]
+        with self.assertRaises(ValueError):
+            reference_value(item, None, "one-time password", "otp")
+
+    def test_get_item_fields(self):
+        """
+        Fields are picked from the full item, so other fields of a cached item need no op call
+        """
+        op = set_up_signed_in_client(cache=SecretCache())
+        item = {"id": "i1", "fields": [{"id": "username", "label": "username", "value": "admin"},
+                                       {"id": "password", "label": "password", "value": "secret"}]}
+        with mock.patch("onepassword.client.run_op", return_value=op_output(json.dumps(item))) as run_op:
+            self.assertEqual(op.get_item("i1", "username"), {"username": "admin"})
+            self.assertEqual(op.get_item("i1", ["password"]), {"password": "secret"})
+            self.assertEqual(op.get_item("i1", ["username", "password"]), {"username": "admin", "password": "secret"})
+            self.assertEqual(op.get_item("i1", ["host", "Password"]), {"Password": "secret"})
+            self.assertEqual(op.get_item("i1", ["host"]), {})
+            self.assertEqual(run_op.call_count, 1)
+
+    def test_prefetch(self):
+        """
+        Prefetched secrets are served from the cache without op calls
+        """
+        item = {"id": "i1", "fields": [{"id": "password", "label": "password", "value": "secret"}]}
+
+        def fake_op(args, **kwargs):
+            if args[:2] == ["item", "get"] and args[2] != "missing":
+                return op_output(json.dumps(item))
+            if args[:2] == ["items", "list"]:
+                return op_output(json.dumps([{"id": "d1", "title": "config"}]))
+            if args[:2] == ["document", "get"]:
+                return op_output('{"key": "value"}')
+            raise OnePasswordCommandError(args, 1, "[ERROR] \"missing\" isn't an item")
+
+        with mock.patch("onepassword.client.run_op", side_effect=fake_op) as run_op:
+            op = set_up_signed_in_client(prefetch=["i1", "op://v/db/password", {"document": "config"}])
+            self.assertTrue(op.wait_ready(5))
+            calls = run_op.call_count
+            self.assertEqual(op.get_item("i1", "password"), {"password": "secret"})
+            self.assertEqual(op.read("op://v/db/password"), "secret")
+            self.assertEqual(op.get_document("config"), {"key": "value"})
+            self.assertEqual(run_op.call_count, calls)
+            self.assertEqual(op.cache.ttl, 3600)
+            op.invalidate("i1")
+            self.assertFalse(op.ready())
+            op.prefetch(["i1"])
+            self.assertTrue(op.ready())
+
+            calls = run_op.call_count
+            failing = set_up_signed_in_client(prefetch=["op://v/db/password", "op://v/db/password?attribute=id",
+                                                        "op://v/missing/password"])
+            self.assertFalse(failing.wait_ready(5))
+            self.assertEqual(list(failing.prefetch_errors), ["op://v/missing/password"])
+            # one call per item, and the item that could be fetched is kept
+            self.assertEqual(run_op.call_count, calls + 2)
+            self.assertEqual(failing.read("op://v/db/password"), "secret")
+            self.assertEqual(run_op.call_count, calls + 2)
+        self.assertTrue(set_up_signed_in_client().ready())
+
+    def test_prefetch_refresh(self):
+        """
+        Prefetched secrets are fetched again before they expire, so ready stays True
+        """
+        item = {"id": "i1", "title": "db", "fields": [{"id": "password", "label": "password", "value": "secret"}]}
+
+        def fake_op(args, **kwargs):
+            if args[:2] == ["items", "list"]:
+                return op_output(json.dumps([{"id": "d1", "title": "config"}]))
+            if args[:2] == ["document", "get"]:
+                return op_output("contents")
+            return op_output(json.dumps(item))
+
+        with mock.patch("onepassword.client.run_op", side_effect=fake_op) as run_op:
+            op = set_up_signed_in_client(cache=SecretCache(ttl=0.4),
+                                         prefetch=["i1", "op://v/db/password", {"document": "config"}])
+            self.addCleanup(op.stop_prefetch)
+            self.assertTrue(op.wait_ready(5))
+            calls = run_op.call_count
+            item["fields"][0]["value"] = "rotated"
+            time.sleep(1)
+            self.assertTrue(op.ready())
+            self.assertGreaterEqual(run_op.call_count, calls + 3)
+            self.assertEqual(op.read("op://v/db/password"), "rotated")
+            op.stop_prefetch()
+            time.sleep(0.8)
+            self.assertFalse(op.ready())
+
+    def test_prefetch_documents(self):
+        """
+        Each vault is listed once however many of its documents are prefetched
+        """
+        listing = [{"id": "d{}".format(n), "title": "config-{}".format(n)} for n in range(4)]
+
+        def fake_op(args, **kwargs):
+            if args[:2] == ["items", "list"]:
+                time.sleep(0.05)
+                return op_output(json.dumps(listing))
+            return op_output("contents")
+
+        with mock.patch("onepassword.client.run_op", side_effect=fake_op) as run_op:
+            op = set_up_signed_in_client()
+            targets = [{"document": item["title"], "vault": vault} for vault in ("v1", "v2") for item in listing]
+            self.assertEqual(op.prefetch(targets), {})
+        commands = [call.args[0][:2] for call in run_op.call_args_list]
+        self.assertEqual(commands.count(["items", "list"]), 2)
+        self.assertEqual(commands.count(["document", "get"]), 8)
+
+    def test_watch(self):
+        """
+        A changed item is fetched again instead of served from the cache, and reported to the callback
+        """
+        versions = {"i1": 1}
+
+        def fake_op(args, **kwargs):
+            if args[:2] == ["items", "list"]:
+                return op_output(json.dumps([{"id": "i1", "title": "db", "version": versions["i1"]}]))
+            return op_output(json.dumps({"id": "i1", "version": versions["i1"]}))
+
+        op = set_up_signed_in_client(cache=SecretCache())
+        events = queue.Queue()
+        with mock.patch("onepassword.client.run_op", side_effect=fake_op):
+            self.assertEqual(op.get_item("i1")["version"], 1)
+            watcher = op.watch(["Private"], events.put, interval=0.01, jitter=0)
+            versions["i1"] = 2
+            event = events.get(timeout=5)
+            watcher.stop()
+            self.assertEqual((event.kind, event.item["version"]), ("changed", 2))
+            self.assertEqual(op.get_item("i1")["version"], 2)
+
+    def test_get_otps_local(self):
+        """
+        With local_otp the seed is fetched once and codes are computed without op
+        """
+        op = set_up_signed_in_client(local_otp=True)
+        items = {
+            "a": {"id": "a", "fields": [{"id": "TOTP_1", "type": "OTP", "value": "otpauth://totp/x?secret=GEZDGNBV"}]},
+            "b": {"id": "b", "fields": []},
+        }
+        with mock.patch("onepassword.client.run_op",
+                        side_effect=lambda args, **kwargs: op_output(json.dumps(items[args[2]]))) as run_op, \
+                mock.patch("onepassword.totp.time.time", return_value=59):
+            otps, errors = op.get_otps(["a", "b"])
+            self.assertEqual(otps, {"a": totp("GEZDGNBV", 59)})
+            self.assertIsInstance(errors["b"], ValueError)
+            self.assertEqual(op.get_item_otp("a"), otps["a"])
+            self.assertEqual(run_op.call_count, 2)
+
     def test_get_item_otp(self):
         """
         Without user interaction will not be signed in and be unable to list anything
@@ -0,0 +1,71 @@
+import unittest
+from onepassword.connect import ConnectOnePassword
+from onepassword.exceptions import OnePasswordAuthError, OnePasswordNotFoundError, OnePasswordTransientError
+from onepassword.retry import RetryPolicy
+from onepassword.sync import diff_listing
+from test.fake_connect import FakeConnect
+
+
+class TestConnectOnePassword(unittest.TestCase):
+    def setUp(self):
+        self.connect = FakeConnect().__enter__()
+        self.addCleanup(self.connect.__exit__, None, None, None)
+        self.op = ConnectOnePassword(self.connect.url, FakeConnect.token, retry_policy=RetryPolicy(backoff=0))
+        self.addCleanup(self.op.close)
+
+    def test_list_items(self):
+        items = self.op.list_items("Private")
+        self.assertEqual([item["id"] for item in items], ["i1", "d1"])
+        self.assertEqual(items[0]["updated_at"], "2024-01-01T00:00:00Z")
+        self.assertEqual(diff_listing(items, {}).added, ["i1", "d1"])
+        self.assertEqual(self.op.get_uuid("db"), "i1")
+        self.assertIsNone(self.op.get_uuid("missing"))
+
+    def test_get_item(self):
+        self.assertEqual(self.op.get_item("i1")["title"], "db")
+        self.assertEqual(self.op.get_item("i1", "username"), {"username": "admin"})
+        self.assertEqual(self.op.get_item("i1", ["username"]), {"username": "admin"})
+        with self.assertRaises(OnePasswordNotFoundError):
+            self.op.get_item("unknown")
+
+    def test_get_items(self):
+        items, errors = self.op.get_items(["i1", "d1", "unknown"], fields="username")
+        self.assertEqual(items["i1"], {"username": "admin"})
+        self.assertEqual(list(errors), ["unknown"])
+
+    def test_read(self):
+        self.assertEqual(self.op.read("op://Private/db/password"), "secret")
+        self.assertEqual(self.op.read("op://Private/db/prod/password"), "prod-secret")
+        self.assertEqual(self.op.read("op://v1/i1/username"), "admin")
+        with self.assertRaises(OnePasswordNotFoundError):
+            self.op.read("op://Private/db/missing")
+        with self.assertRaises(ValueError):
+            self.op.read("Private/db")
+
+    def test_get_document(self):
+        self.assertEqual(self.op.get_document("config"), {"key": "value"})
+        self.assertIsNone(self.op.get_document("missing"))
+
+    def test_connections_are_reused(self):
+        for _ in range(5):
+            self.op.read("op://Private/db/password")
+        self.assertEqual(self.op.pool.opened, 1)
+        self.assertEqual(len(self.connect.clients), 1)
+
+    def test_errors(self):
+        self.connect.fail = [503]
+        self.assertEqual(len(self.op.list_vaults()), 1)
+        self.connect.fail = [503, 503, 503]
+        with self.assertRaises(OnePasswordTransientError):
+            self.op.list_vaults()
+        op = ConnectOnePassword(self.connect.url, "wrong-token")
+        with self.assertRaises(OnePasswordAuthError):
+            op.list_vaults()
+
+    def test_missing_configuration(self):
+        with self.assertRaises(ValueError):
+            ConnectOnePassword(host=self.connect.url, token="")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+from io import StringIO
+from unittest import mock
+from onepassword.env import load_env, main, parse_manifest
+
+MANIFEST = """# database
+export DB_USER=op://infra/db/username
+DB_PASSWORD="op://infra/db/password"
+DB_HOST='localhost'
+API_TOKEN=op://infra/api/credential
+"""
+
+
+class FakeClient:
+    def __init__(self):
+        self.resolve = mock.Mock(side_effect=lambda refs, max_workers=8: {ref: "secret:" + ref for ref in refs})
+
+
+class TestEnv(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, {"API_TOKEN": "already-set"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        f = tempfile.NamedTemporaryFile("w", suffix=".env", delete=False)
+        f.write(MANIFEST)
+        f.close()
+        self.manifest = f.name
+        self.addCleanup(os.remove, f.name)
+
+    def test_parse_manifest(self):
+        self.assertEqual(parse_manifest(MANIFEST), {
+            "DB_USER": "op://infra/db/username", "DB_PASSWORD": "op://infra/db/password", "DB_HOST": "localhost",
+            "API_TOKEN": "op://infra/api/credential"})
+        with self.assertRaises(ValueError):
+            parse_manifest("not a variable")
+
+    def test_load_env(self):
+        op = FakeClient()
+        result = load_env(self.manifest, op=op)
+        op.resolve.assert_called_once_with(["op://infra/db/username", "op://infra/db/password"], max_workers=8)
+        self.assertEqual(result.values, {"DB_USER": "secret:op://infra/db/username",
+                                         "DB_PASSWORD": "secret:op://infra/db/password", "DB_HOST": "localhost"})
+        self.assertEqual(result.skipped, ["API_TOKEN"])
+        self.assertEqual(result.references, 2)
+        self.assertEqual(os.environ["DB_USER"], "secret:op://infra/db/username")
+        self.assertEqual(os.environ["API_TOKEN"], "already-set")
+
+    def test_load_env_override_without_apply(self):
+        result = load_env({"API_TOKEN": "op://infra/api/credential"}, override=True, op=FakeClient(), apply=False)
+        self.assertEqual(result.values, {"API_TOKEN": "secret:op://infra/api/credential"})
+        self.assertEqual(os.environ["API_TOKEN"], "already-set")
+
+    def test_main_prints_exports(self):
+        with mock.patch("onepassword.client.OnePassword", return_value=FakeClient()), \
+                mock.patch("sys.stdout", new_callable=StringIO) as stdout, \
+                mock.patch("sys.stderr", new_callable=StringIO) as stderr:
+            self.assertEqual(main([self.manifest]), 0)
+        self.assertIn("export DB_PASSWORD=secret:op://infra/db/password\n", stdout.getvalue())
+        self.assertIn("export DB_HOST=localhost\n", stdout.getvalue())
+        self.assertIn("from 2 references", stderr.getvalue())
+
+    def test_main_runs_command(self):
+        with mock.patch("onepassword.client.OnePassword", return_value=FakeClient()), \
+                mock.patch("onepassword.env.os.execvp") as execvp:
+            main(["-q", self.manifest, "--", "env"])
+        execvp.assert_called_once_with("env", ["env"])
+        self.assertEqual(os.environ["DB_HOST"], "localhost")
+
+
+    def test_main_options_after_manifest(self):
+        with mock.patch("onepassword.client.OnePassword", return_value=FakeClient()), \
+                mock.patch("onepassword.env.os.execvp") as execvp, \
+                mock.patch("sys.stdout", new_callable=StringIO) as stdout, \
+                mock.patch("sys.stderr", new_callable=StringIO) as stderr:
+            main([self.manifest, "--override", "-q"])
+        execvp.assert_not_called()
+        self.assertEqual(stderr.getvalue(), "")
+        self.assertIn("export API_TOKEN=secret:op://infra/api/credential\n", stdout.getvalue())
+
+    def test_main_rejects_unknown_signin_method(self):
+        with mock.patch("sys.stderr", new_callable=StringIO), self.assertRaises(SystemExit):
+            main(["--signin-method", "service", self.manifest])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import os
+import sys
+import json
+import unittest
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["yaml", "pexpect", "Crypto", "asyncio", "platform", "concurrent.futures", "dataclasses"]
+
+
+def loaded_modules(statement):
+    r = subprocess.run([sys.executable, "-c", "import sys, json\n{}\nprint(json.dumps(sorted(sys.modules)))".format(
+        statement)], cwd=ROOT, capture_output=True, text=True, check=True)
+    return set(json.loads(r.stdout))
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_package_import_loads_no_client(self):
+        modules = loaded_modules("import onepassword")
+        self.assertNotIn("onepassword.client", modules)
+        self.assertNotIn("onepassword.async_client", modules)
+
+    def test_client_import_defers_heavy_modules(self):
+        modules = loaded_modules("from onepassword import OnePassword")
+        self.assertIn("onepassword.client", modules)
+        self.assertEqual([m for m in HEAVY_MODULES if m in modules], [])
+
+    def test_lazy_attributes(self):
+        import onepassword
+        from onepassword.client import OnePassword
+        from onepassword.async_client import AsyncOnePassword
+        self.assertIs(onepassword.OnePassword, OnePassword)
+        self.assertIs(onepassword.AsyncOnePassword, AsyncOnePassword)
+        self.assertIsNotNone(onepassword.utils.run_op)
+        with self.assertRaises(AttributeError):
+            onepassword.missing
+
+
+if __name__ == '__main__':
+    unittest.main()
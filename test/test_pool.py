@@ -0,0 +1,55 @@
+import os
+import unittest
+from onepassword import OnePasswordPool
+from onepassword.cache import SecretCache
+from test.fake_op import FakeOp
+
+FAKE_OP = """#!/bin/sh
+if [ "$1" = "signin" ]; then
+  read -r password
+  [ "$password" = "pw-$3" ] || { echo "[ERROR] (401) Unauthorized" >&2; exit 1; }
+  echo "session-$3"
+  exit 0
+fi
+# --account <account> read <ref>, the session comes from OP_SESSION_<account>
+case "$*" in *session-*) echo "[ERROR] session on the command line" >&2; exit 1;; esac
+eval "session=\\$OP_SESSION_$2"
+echo "$2:$session:$4"
+"""
+
+
+class TestPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.fake_op = FakeOp(FAKE_OP).__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake_op.__exit__(None, None, None)
+
+    def test_accounts_are_isolated(self):
+        environ = dict(os.environ)
+        pool = OnePasswordPool({"one": "pw-one", "two": "pw-two"})
+        self.assertEqual(sorted(pool), ["one", "two"])
+        self.assertEqual(pool["one"].read("op://v/i/f"), "one:session-one:op://v/i/f")
+        self.assertEqual(pool["two"].read("op://v/i/f"), "two:session-two:op://v/i/f")
+        self.assertEqual(dict(os.environ), environ)
+        with self.assertRaises(KeyError):
+            pool.client("three")
+
+    def test_caches_are_per_account(self):
+        pool = OnePasswordPool({"one": "pw-one", "two": "pw-two"}, cache_factory=SecretCache)
+        self.assertEqual(pool["one"].read("op://v/i/f"), "one:session-one:op://v/i/f")
+        self.assertEqual(pool["two"].read("op://v/i/f"), "two:session-two:op://v/i/f")
+        self.assertIsNot(pool["one"].cache, pool["two"].cache)
+        with self.assertRaises(ValueError):
+            OnePasswordPool({"one": "pw-one", "two": "pw-two"}, cache=SecretCache())
+
+    def test_failed_signin(self):
+        with self.assertRaises(ConnectionError) as raised:
+            OnePasswordPool({"one": "pw-one", "two": "wrong"})
+        self.assertIn("two", str(raised.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
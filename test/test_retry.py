@@ -0,0 +1,79 @@
+import unittest
+import threading
+from unittest import mock
+from onepassword.exceptions import OnePasswordAuthError, OnePasswordNotFoundError, OnePasswordTransientError, \
+    command_error
+from onepassword.retry import RetryPolicy, Reauthenticator, call_with_retry
+
+
+class TestRetry(unittest.TestCase):
+    def test_command_error_classification(self):
+        self.assertIsInstance(command_error(["read"], 1, "[ERROR] You are not currently signed in."),
+                              OnePasswordAuthError)
+        self.assertIsInstance(command_error(["read"], 1, "[ERROR] (429) Too Many Requests"),
+                              OnePasswordTransientError)
+        self.assertIsInstance(command_error(["item", "get"], 1, "[ERROR] \"abc\" isn't an item."),
+                              OnePasswordNotFoundError)
+
+    def test_reauthenticates_once(self):
+        signin = mock.Mock()
+        call = mock.Mock(side_effect=[OnePasswordAuthError(["read"], 1), "secret"])
+        self.assertEqual(call_with_retry(call, RetryPolicy(), Reauthenticator(signin)), "secret")
+        signin.assert_called_once_with()
+
+        call = mock.Mock(side_effect=OnePasswordAuthError(["read"], 1))
+        with self.assertRaises(OnePasswordAuthError):
+            call_with_retry(call, RetryPolicy(), Reauthenticator(signin))
+        self.assertEqual(call.call_count, 2)
+
+    def test_concurrent_callers_share_one_signin(self):
+        signin = mock.Mock()
+        reauthenticator = Reauthenticator(signin)
+        barrier = threading.Barrier(8)
+        generation_seen = threading.local()
+
+        def call():
+            if getattr(generation_seen, "value", None) is None:
+                generation_seen.value = reauthenticator.generation
+                barrier.wait()
+                raise OnePasswordAuthError(["read"], 1)
+            return "secret"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+            call_with_retry(call, RetryPolicy(), reauthenticator))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ["secret"] * 8)
+        signin.assert_called_once_with()
+
+    def test_transient_backoff(self):
+        call = mock.Mock(side_effect=[OnePasswordTransientError(["read"], 1), OnePasswordTransientError(["read"], 1),
+                                      "secret"])
+        with mock.patch("onepassword.retry.time.sleep") as sleep:
+            self.assertEqual(call_with_retry(call, RetryPolicy(max_attempts=3, backoff=1, max_backoff=1.5)), "secret")
+        delays = [c[0][0] for c in sleep.call_args_list]
+        self.assertEqual(len(delays), 2)
+        self.assertTrue(0.5 <= delays[0] <= 1 and 0.75 <= delays[1] <= 1.5)
+
+        call = mock.Mock(side_effect=OnePasswordTransientError(["read"], 1))
+        with mock.patch("onepassword.retry.time.sleep"), self.assertRaises(OnePasswordTransientError):
+            call_with_retry(call, RetryPolicy(max_attempts=2))
+        self.assertEqual(call.call_count, 2)
+
+
+    def test_writes_are_not_retried_on_transient_errors(self):
+        call = mock.Mock(side_effect=OnePasswordTransientError(["document", "create"], 1))
+        with mock.patch("onepassword.retry.time.sleep") as sleep, self.assertRaises(OnePasswordTransientError):
+            call_with_retry(call, RetryPolicy(max_attempts=3), idempotent=False)
+        self.assertEqual(call.call_count, 1)
+        sleep.assert_not_called()
+
+        signin = mock.Mock()
+        call = mock.Mock(side_effect=[OnePasswordAuthError(["document", "create"], 1), "created"])
+        self.assertEqual(call_with_retry(call, RetryPolicy(), Reauthenticator(signin), idempotent=False), "created")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+from unittest import mock
+from onepassword.search import SearchIndex, edit_distance, item_tokens, search_vaults
+
+PRIVATE = [
+    {"id": "a", "title": "Prod Database", "version": 1, "category": "DATABASE", "tags": ["infra/db"]},
+    {"id": "b", "title": "GitHub", "version": 1, "category": "LOGIN",
+     "urls": [{"href": "https://github.com/login", "primary": True}]},
+]
+SHARED = [
+    {"id": "c", "title": "Staging database", "version": 3, "category": "DATABASE"},
+]
+
+
+class FakeClient:
+    def __init__(self):
+        self.listings = {"Private": PRIVATE, "Shared": SHARED}
+        self.list_items = mock.Mock(side_effect=lambda vault: self.listings[vault])
+        self.list_vaults = mock.Mock(return_value=[{"id": "v1", "name": "Private"}, {"id": "v2", "name": "Shared"}])
+
+
+class TestSearch(unittest.TestCase):
+    def test_item_tokens(self):
+        self.assertEqual(item_tokens(PRIVATE[1]), {"login": 1, "github.com": 2, "github": 3, "com": 2})
+        self.assertEqual(item_tokens(PRIVATE[0])["infra/db"], 2)
+
+    def test_edit_distance(self):
+        self.assertEqual(edit_distance("databse", "database", 2), 1)
+        self.assertEqual(edit_distance("abc", "xyz", 1), 2)
+
+    def test_search_vaults(self):
+        op = FakeClient()
+        index = SearchIndex()
+        results = search_vaults(op, index, "database", max_workers=2)
+        self.assertEqual([(r["id"], r["vault_name"]) for r in results], [("a", "Private"), ("c", "Shared")])
+        self.assertEqual([r["id"] for r in search_vaults(op, index, "git")], ["b"])
+        self.assertEqual(op.list_vaults.call_count, 1)
+        self.assertEqual(op.list_items.call_count, 2)
+
+    def test_modes(self):
+        index = SearchIndex()
+        index.update_vault("Private", PRIVATE)
+        self.assertEqual(index.search("git", mode="exact"), [])
+        self.assertEqual([r["id"] for r in index.search("github.com", mode="exact")], ["b"])
+        self.assertEqual([r["id"] for r in index.search("prod datab")], ["a"])
+        self.assertEqual([r["id"] for r in index.search("databse", mode="fuzzy")], ["a"])
+        self.assertEqual(index.search("prod github"), [])
+        with self.assertRaises(ValueError):
+            index.search("prod", mode="regex")
+
+    def test_incremental_refresh(self):
+        index = SearchIndex(ttl=0)
+        index.update_vault("Shared", SHARED)
+        with mock.patch("onepassword.search.item_tokens", wraps=item_tokens) as tokens:
+            index.update_vault("Shared", SHARED + [{"id": "d", "title": "Vpn", "version": 1}])
+            self.assertEqual(tokens.call_count, 1)
+            index.update_vault("Shared", [dict(SHARED[0], title="Staging cache", version=4)])
+            self.assertEqual(tokens.call_count, 2)
+        self.assertEqual(index.search("vpn"), [])
+        self.assertEqual(index.search("staging database", mode="exact")[0]["title"], "Staging cache")
+        self.assertEqual([r["id"] for r in index.search("cache")], ["c"])
+        self.assertFalse(index.is_fresh("Shared"))
+
+
+if __name__ == '__main__':
+    unittest.main()
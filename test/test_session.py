@@ -0,0 +1,47 @@
+import unittest
+import threading
+from unittest import mock
+from onepassword.session import SessionKeepAlive
+
+
+class TestSessionKeepAlive(unittest.TestCase):
+    def test_expiry_tracking(self):
+        session = SessionKeepAlive(mock.Mock(), idle_timeout=1800)
+        self.assertIsNone(session.expires_at)
+        with mock.patch("onepassword.session.time.monotonic", return_value=1000):
+            session.touch()
+        with mock.patch("onepassword.session.time.monotonic", return_value=1600):
+            self.assertEqual(session.seconds_left(), 1200)
+
+    def test_background_refresh(self):
+        pinged = threading.Event()
+        session = SessionKeepAlive(pinged.set, idle_timeout=0.2, refresh_margin=0.1)
+        session.touch()
+        session.start()
+        try:
+            self.assertTrue(pinged.wait(2))
+        finally:
+            session.stop()
+        self.assertFalse(session.running)
+        self.assertGreater(session.seconds_left(), 0)
+
+    def test_failed_ping_is_retried(self):
+        done = threading.Event()
+        effects = [RuntimeError("offline"), done.set]
+
+        def ping():
+            effect = effects.pop(0)
+            if isinstance(effect, Exception):
+                raise effect
+            effect()
+
+        session = SessionKeepAlive(ping, idle_timeout=10, refresh_margin=5, retry_interval=0.05)
+        session.start()
+        try:
+            self.assertTrue(done.wait(2))
+        finally:
+            session.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+from onepassword.connect import ConnectOnePassword
+from onepassword.exceptions import OnePasswordNotFoundError
+from onepassword.snapshot import SnapshotOnePassword, export_snapshot
+from test.fake_connect import FakeConnect
+
+
+class TestSnapshot(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, "vaults.snapshot")
+        with FakeConnect() as connect:
+            op = ConnectOnePassword(connect.url, FakeConnect.token)
+            cls.count = export_snapshot(op, cls.path, "snapshot password")
+            op.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def setUp(self):
+        self.snapshot = SnapshotOnePassword(self.path, "snapshot password")
+        self.addCleanup(self.snapshot.close)
+
+    def test_export(self):
+        self.assertEqual(self.count, 2)
+        with open(self.path, "rb") as f:
+            contents = f.read()
+        for plain in [b"prod-secret", b"admin", b"config", b"Private"]:
+            self.assertNotIn(plain, contents)
+        self.assertEqual(os.listdir(self.directory.name), ["vaults.snapshot"])
+
+    def test_listings(self):
+        self.assertEqual(self.snapshot.list_vaults(), [{"name": "Private", "id": "v1"}])
+        self.assertEqual([item["id"] for item in self.snapshot.list_items("Private")], ["i1", "d1"])
+        self.assertEqual(self.snapshot.list_items("v1"), self.snapshot.list_items("Private"))
+        with self.assertRaises(OnePasswordNotFoundError):
+            self.snapshot.list_items("Shared")
+
+    def test_get_item(self):
+        self.assertEqual(self.snapshot.get_uuid("db"), "i1")
+        self.assertIsNone(self.snapshot.get_uuid("db", vault="Shared"))
+        self.assertEqual(self.snapshot.get_item("i1")["title"], "db")
+        self.assertEqual(self.snapshot.get_item("i1", "username"), {"username": "admin"})
+        items, errors = self.snapshot.get_items(["i1", "unknown"], ["username"])
+        self.assertEqual(items, {"i1": {"username": "admin"}})
+        self.assertIsInstance(errors["unknown"], OnePasswordNotFoundError)
+
+    def test_read(self):
+        self.assertEqual(self.snapshot.read("op://Private/db/password"), "secret")
+        self.assertEqual(self.snapshot.read("op://Private/db/prod/password"), "prod-secret")
+        self.assertEqual(self.snapshot.read("op://v1/i1/username"), "admin")
+        self.assertEqual(self.snapshot.read("op://Private/i1/username"), "admin")
+        with self.assertRaises(OnePasswordNotFoundError):
+            self.snapshot.read("op://Shared/i1/username")
+        with self.assertRaises(OnePasswordNotFoundError):
+            self.snapshot.read("op://Private/db/missing")
+
+    def test_wrong_password(self):
+        with self.assertRaises(ValueError):
+            SnapshotOnePassword(self.path, "wrong password")
+
+    def test_not_a_snapshot(self):
+        other = os.path.join(self.directory.name, "other")
+        with open(other, "wb") as f:
+            f.write(b"not a snapshot at all, just some bytes")
+        self.addCleanup(os.remove, other)
+        with self.assertRaises(ValueError):
+            SnapshotOnePassword(other, "snapshot password")
+
+
+if __name__ == '__main__':
+    unittest.main()
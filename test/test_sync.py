@@ -0,0 +1,80 @@
+import json
+import unittest
+from subprocess import CompletedProcess
+from unittest import mock
+from onepassword import OnePassword
+from onepassword.cache import SecretCache
+from onepassword.client import SignIn
+from onepassword.sync import diff_listing, sync_vault
+
+
+def listing(*versions):
+    return [{"id": uuid, "version": version, "updated_at": "2024-01-0{}".format(version)} for uuid, version in versions]
+
+
+def fake_client(items, failing=()):
+    op = mock.Mock()
+    op.list_items.return_value = items
+
+    def get_items(uuids, max_workers=8):
+        fetched = {uuid: {"id": uuid} for uuid in uuids if uuid not in failing}
+        return fetched, {uuid: ValueError(uuid) for uuid in uuids if uuid in failing}
+
+    op.get_items.side_effect = get_items
+    return op
+
+
+class TestSync(unittest.TestCase):
+    def test_diff_listing(self):
+        changes = diff_listing(listing(("a", 1), ("b", 2), ("c", 1)),
+                               {"a": (1, "2024-01-01"), "b": (1, "2024-01-01"), "d": (1, "2024-01-01")})
+        self.assertEqual(changes.added, ["c"])
+        self.assertEqual(changes.changed, ["b"])
+        self.assertEqual(changes.removed, ["d"])
+
+    def test_sync_vault(self):
+        store = {}
+        op = fake_client(listing(("a", 1), ("b", 1)))
+        changes = sync_vault(op, "Private", store)
+        self.assertEqual(changes.added, ["a", "b"])
+        self.assertEqual(store["a"], {"version": 1, "updated_at": "2024-01-01", "item": {"id": "a"}})
+
+        op = fake_client(listing(("a", 1), ("b", 1)))
+        self.assertFalse(sync_vault(op, "Private", store))
+        op.get_items.assert_called_once_with([], max_workers=8)
+
+        op = fake_client(listing(("b", 2), ("c", 1)))
+        changes = sync_vault(op, "Private", store)
+        self.assertEqual((changes.added, changes.changed, changes.removed), (["c"], ["b"], ["a"]))
+        self.assertEqual(sorted(store), ["b", "c"])
+        self.assertEqual(store["b"]["version"], 2)
+
+    def test_sync_vault_errors(self):
+        store = {}
+        changes = sync_vault(fake_client(listing(("a", 1), ("b", 1)), failing={"b"}), "Private", store)
+        self.assertEqual(changes.added, ["a"])
+        self.assertEqual(list(changes.errors), ["b"])
+        self.assertNotIn("b", store)
+        changes = sync_vault(fake_client(listing(("a", 1), ("b", 1))), "Private", store)
+        self.assertEqual(changes.added, ["b"])
+
+
+    def test_sync_vault_with_cache(self):
+        version = {"a": 1}
+
+        def fake_op(args, **kwargs):
+            if args[:2] == ["items", "list"]:
+                summaries = [dict(item, title="db") for item in listing(("a", version["a"]))]
+                return CompletedProcess(args, 0, json.dumps(summaries).encode(), "")
+            return CompletedProcess(args, 0, json.dumps({"id": "a", "body": version["a"]}).encode(), "")
+
+        op = OnePassword(signin_strategy=SignIn(), cache=SecretCache())
+        store = {}
+        with mock.patch("onepassword.client.run_op", side_effect=fake_op):
+            sync_vault(op, "Private", store)
+            version["a"] = 2
+            self.assertEqual(sync_vault(op, "Private", store).changed, ["a"])
+        self.assertEqual(store["a"]["item"], {"id": "a", "body": 2})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import time
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from onepassword.throttle import CallGovernor, SingleFlight, TokenBucket
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_waiters_share_result(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def call():
+            calls.append(1)
+            release.wait(5)
+            return {"value": 1}
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(flight.do, ("key",), call) for _ in range(3)]
+            while flight.coalesced < 2:
+                time.sleep(0.01)
+            release.set()
+            results = [f.result() for f in futures]
+        self.assertEqual(calls, [1])
+        self.assertEqual(results, [{"value": 1}] * 3)
+        results[0]["value"] = 2
+        self.assertEqual(results[1], {"value": 1})
+
+    def test_waiters_share_exception(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def call():
+            release.wait(5)
+            raise KeyError("missing")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(flight.do, ("key",), call) for _ in range(2)]
+            while flight.coalesced < 1:
+                time.sleep(0.01)
+            release.set()
+            for future in futures:
+                self.assertIsInstance(future.exception(), KeyError)
+        self.assertEqual(flight.do(("key",), lambda: "again"), "again")
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_waits_for_tokens(self):
+        bucket = TokenBucket(rate=10, burst=2)
+        with mock.patch("onepassword.throttle.time.sleep") as sleep:
+            bucket.acquire()
+            bucket.acquire()
+            sleep.assert_not_called()
+            with mock.patch("onepassword.throttle.time.monotonic", side_effect=[bucket._updated, bucket._updated + 1]):
+                bucket.acquire()
+            sleep.assert_called_once()
+
+    def test_invalid_rate(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestCallGovernor(unittest.TestCase):
+    def test_limits_concurrency(self):
+        governor = CallGovernor(max_concurrency=2)
+        running, peak = [0], [0]
+        lock = threading.Lock()
+
+        def call():
+            with governor.slot():
+                with lock:
+                    running[0] += 1
+                    peak[0] = max(peak[0], running[0])
+                time.sleep(0.02)
+                with lock:
+                    running[0] -= 1
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            for future in [executor.submit(call) for _ in range(6)]:
+                future.result()
+        stats = governor.stats()
+        self.assertEqual(peak[0], 2)
+        self.assertEqual(stats["calls"], 6)
+        self.assertEqual(stats["in_flight"], 0)
+        self.assertEqual(stats["waiting"], 0)
+        self.assertGreaterEqual(stats["max_waiting"], 3)
+        self.assertGreater(stats["max_wait_seconds"], 0)
+
+    def test_slot_released_on_error(self):
+        governor = CallGovernor(max_concurrency=1)
+        with self.assertRaises(RuntimeError):
+            with governor.slot():
+                raise RuntimeError("op failed")
+        with governor.slot():
+            self.assertEqual(governor.stats()["in_flight"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import base64
+import unittest
+from onepassword.totp import item_otp_seed, parse_otp_seed, totp
+
+# RFC 6238 appendix B test secrets, one per algorithm
+SECRETS = {
+    "SHA1": base64.b32encode(b"12345678901234567890").decode(),
+    "SHA256": base64.b32encode(b"12345678901234567890123456789012").decode(),
+    "SHA512": base64.b32encode(b"1234567890123456789012345678901234567890123456789012345678901234").decode(),
+}
+VECTORS = [
+    (59, "94287082", "46119246", "90693936"),
+    (1111111109, "07081804", "68084774", "25091201"),
+    (1234567890, "89005924", "91819424", "93441116"),
+    (20000000000, "65353130", "77737706", "47863826"),
+]
+
+
+class TestTotp(unittest.TestCase):
+    def test_rfc6238_vectors(self):
+        for for_time, *codes in VECTORS:
+            for algorithm, code in zip(["SHA1", "SHA256", "SHA512"], codes):
+                self.assertEqual(totp(SECRETS[algorithm], for_time, digits=8, algorithm=algorithm), code)
+
+    def test_parse_otpauth_uri(self):
+        seed = parse_otp_seed("otpauth://totp/Example:alice?secret=gezdgnbvgy3tqojq&period=60&digits=8"
+                              "&algorithm=sha256&issuer=Example")
+        self.assertEqual(seed, {"secret": "GEZDGNBVGY3TQOJQ", "period": 60, "digits": 8, "algorithm": "SHA256"})
+        self.assertEqual(parse_otp_seed("gezd gnbv gy3t qojq")["secret"], "GEZDGNBVGY3TQOJQ")
+
+    def test_parse_invalid(self):
+        for value in ["otpauth://hotp/x?secret=GEZDGNBV", "otpauth://totp/x?period=30", "not base32!",
+                      "otpauth://totp/x?secret=GEZDGNBV&algorithm=MD5"]:
+            with self.assertRaises(ValueError):
+                parse_otp_seed(value)
+
+    def test_item_otp_seed(self):
+        item = {"id": "abc", "fields": [{"id": "password", "type": "CONCEALED", "value": "pw"},
+                                        {"id": "TOTP_1", "type": "OTP", "value": "otpauth://totp/x?secret=GEZDGNBV"}]}
+        self.assertEqual(item_otp_seed(item)["secret"], "GEZDGNBV")
+        with self.assertRaises(ValueError):
+            item_otp_seed({"id": "abc", "fields": []})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from onepassword import utils
+from onepassword.utils import BashProfile, Encryption, run_op, signin_with_password
+from onepassword.exceptions import OnePasswordCommandError, OnePasswordNotFoundError, OnePasswordTimeoutError
+from test.fake_op import FakeOp
+
+FAKE_OP = """#!/bin/sh
+case "$1" in
+  echo) shift; printf '%s' "$*" ;;
+  cat) cat ;;
+  missing) echo "[ERROR] \\"abc\\" isn't an item." >&2; exit 1 ;;
+  sleep) exec sleep 5 ;;
+  *) echo "unknown command $1" >&2; exit 1 ;;
+esac
+"""
+
+
+class TestRunOp(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.fake_op = FakeOp(FAKE_OP).__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake_op.__exit__(None, None, None)
+
+    def test_arguments_are_not_shell_expanded(self):
+        r = run_op(["echo", "$HOME", "it's; true"])
+        self.assertEqual(r.stdout, b"$HOME it's; true")
+        self.assertEqual(r.returncode, 0)
+
+    def test_input(self):
+        self.assertEqual(run_op(["cat"], input="secret").stdout, b"secret")
+
+    def test_errors(self):
+        with self.assertRaises(OnePasswordNotFoundError):
+            run_op(["missing"])
+        with self.assertRaises(OnePasswordCommandError) as raised:
+            run_op(["bogus"])
+        self.assertEqual(raised.exception.returncode, 1)
+        self.assertEqual(raised.exception.stderr, "unknown command bogus\n")
+        self.assertEqual(run_op(["bogus"], check=False).returncode, 1)
+
+    def test_timeout(self):
+        with self.assertRaises(OnePasswordTimeoutError):
+            run_op(["sleep"], timeout=0.2)
+
+
+FAKE_SIGNIN_OP = """#!/bin/sh
+[ "$1" = "signin" ] && [ "$4" = "--raw" ] || { echo "bad arguments $*" >&2; exit 2; }
+read -r password
+case "$password" in
+  correct) echo "session-key-for-$3" ;;
+  *) echo "[ERROR] (401) Unauthorized: You aren't authorized to perform this action." >&2; exit 1 ;;
+esac
+"""
+
+
+class TestSignin(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.fake_op = FakeOp(FAKE_SIGNIN_OP).__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake_op.__exit__(None, None, None)
+
+    def test_pipe_signin(self):
+        args = ["signin", "--account", "test", "--raw"]
+        self.assertEqual(signin_with_password(args, b"correct"), "session-key-for-test")
+        self.assertFalse(signin_with_password(args, b"wrong"))
+        with self.assertRaises(OnePasswordCommandError):
+            signin_with_password(["signin"], b"correct")
+
+
+class TestEncryption(unittest.TestCase):
+    def test_round_trip(self):
+        encryption = Encryption("fakelettersforsessionkeyfakeletters")
+        for password in [b"", b"short", b"exactly-thirty-two-bytes-long!!!", b"a" * 45]:
+            self.assertEqual(encryption.decode(encryption.encode(password)), password.decode())
+
+
+class TestBashProfile(unittest.TestCase):
+    def setUp(self):
+        self.home = tempfile.TemporaryDirectory()
+        self.addCleanup(self.home.cleanup)
+        patcher = mock.patch.dict(os.environ, {"HOME": self.home.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.rc = os.path.join(self.home.name, ".bashrc")
+        self.write_rc('alias ll="ls -l"\nexport OP_ACCOUNT="wandera"\nexport OP_SESSION_wandera="old"\n')
+
+    def write_rc(self, content):
+        with open(self.rc, "w") as f:
+            f.write(content)
+
+    def read_rc(self):
+        with open(self.rc) as f:
+            return f.read()
+
+    def test_get_key_value(self):
+        bp = BashProfile()
+        self.assertEqual(bp.get_key_value("OP_ACCOUNT"), [{"OP_ACCOUNT": '"wandera"'}])
+        self.assertEqual(bp.get_key_value("OP_SESSION", fuzzy=True), [{"OP_SESSION_wandera": '"old"'}])
+        self.assertEqual(bp.get_key_line("OP_ACCOUNT"), ['export OP_ACCOUNT="wandera"'])
+        with self.assertRaises(ValueError):
+            bp.get_key_value("OP_DEVICE")
+
+    def test_get_key_line_in_docker(self):
+        with open(os.path.join(self.home.name, ".profile"), "w") as f:
+            f.write('export PATH="/bin"\n')
+        with mock.patch("onepassword.utils.docker_check", return_value=True):
+            bp = BashProfile()
+        self.assertEqual(bp.get_key_line("OP_SESSION_wandera"), ['export OP_SESSION_wandera="old"'])
+        self.assertEqual(bp.get_key_line("PATH"), ['export PATH="/bin"'])
+
+    def test_reloads_changed_file(self):
+        bp = BashProfile()
+        self.assertEqual(bp.get_key_value("OP_ACCOUNT"), [{"OP_ACCOUNT": '"wandera"'}])
+        self.write_rc('export OP_ACCOUNT="other account"\n')
+        self.assertEqual(bp.get_key_value("OP_ACCOUNT"), [{"OP_ACCOUNT": '"other account"'}])
+
+    def test_update_profile(self):
+        bp = BashProfile()
+        bp.update_profile("OP_SESSION_wandera", "new")
+        bp.update_profile("OP_DEVICE", "abc")
+        self.assertEqual(self.read_rc(), 'alias ll="ls -l"\nexport OP_ACCOUNT="wandera"\n'
+                                         'export OP_SESSION_wandera="new"\nexport OP_DEVICE="abc"\n')
+        bp.update_profile("OP_DEVICE", None)
+        self.assertNotIn("OP_DEVICE", self.read_rc())
+        self.assertEqual(os.listdir(self.home.name), [".bashrc"])
+
+    def test_update_profile_keeps_similar_keys(self):
+        bp = BashProfile()
+        bp.update_profile("OP_SESSION", "x")
+        self.assertIn('export OP_SESSION_wandera="old"', self.read_rc())
+
+    def test_unchanged_value_is_not_written(self):
+        bp = BashProfile()
+        with mock.patch("onepassword.utils._write_atomic") as write:
+            bp.update_profile("OP_ACCOUNT", "wandera")
+        write.assert_not_called()
+
+    def test_batch_writes_once(self):
+        bp = BashProfile()
+        with mock.patch("onepassword.utils._write_atomic", wraps=utils._write_atomic) as write:
+            with bp.batch():
+                bp.update_profile("OP_ACCOUNT", "other")
+                bp.update_profile("OP_SESSION_other", "key")
+                self.assertIn('OP_ACCOUNT="wandera"', self.read_rc())
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(bp.get_key_value("OP_SESSION_other"), [{"OP_SESSION_other": '"key"'}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import queue
+import unittest
+from unittest import mock
+from onepassword.watch import VaultWatcher
+
+
+def listing(*versions):
+    return [{"id": uuid, "title": "title-" + uuid, "version": version} for uuid, version in versions]
+
+
+def fake_client(listings, failing=()):
+    op = mock.Mock()
+    op.list_items.side_effect = lambda vault: listings[vault]
+
+    def get_items(uuids, max_workers=8):
+        fetched = {uuid: {"id": uuid} for uuid in uuids if uuid not in failing}
+        return fetched, {uuid: ValueError(uuid) for uuid in uuids if uuid in failing}
+
+    op.get_items.side_effect = get_items
+    return op
+
+
+class TestWatch(unittest.TestCase):
+    def test_poll(self):
+        listings = {"Private": listing(("a", 1), ("b", 1)), "Shared": listing(("c", 1))}
+        op = fake_client(listings)
+        watcher = VaultWatcher(op, ["Private", "Shared"], lambda event: None)
+        self.assertEqual(watcher.poll(), [])
+        op.get_items.assert_not_called()
+
+        listings["Private"] = listing(("b", 2), ("d", 1))
+        events = watcher.poll()
+        self.assertEqual([(e.kind, e.vault, e.uuid) for e in events],
+                         [("removed", "Private", "a"), ("added", "Private", "d"), ("changed", "Private", "b")])
+        op.get_items.assert_called_once_with(["d", "b"], max_workers=8)
+        self.assertEqual(events[2].item, {"id": "b"})
+        self.assertIsNone(events[0].item)
+        op.invalidate.assert_has_calls([mock.call("b"), mock.call("title-b"), mock.call("a"), mock.call("title-a")])
+        op.invalidate_uuid_cache.assert_called_once_with("Private")
+
+        op.get_items.reset_mock()
+        self.assertEqual(watcher.poll(), [])
+        op.get_items.assert_not_called()
+
+    def test_poll_retries_failed_items(self):
+        listings = {"Private": listing(("a", 1))}
+        op = fake_client(listings, failing={"a"})
+        errors = []
+        watcher = VaultWatcher(op, ["Private"], lambda event: None, on_error=errors.append)
+        watcher.poll()
+        listings["Private"] = listing(("a", 2))
+        self.assertEqual(watcher.poll(), [])
+        self.assertEqual([str(e) for e in errors], ["a"])
+
+        op.get_items.side_effect = lambda uuids, max_workers=8: ({uuid: {"id": uuid} for uuid in uuids}, {})
+        self.assertEqual([e.kind for e in watcher.poll()], ["changed"])
+
+    def test_delay(self):
+        watcher = VaultWatcher(mock.Mock(), ["Private"], lambda event: None, interval=10, jitter=0.1, max_backoff=60)
+        self.assertTrue(9 <= watcher.delay() <= 11)
+        watcher.failures = 2
+        self.assertTrue(36 <= watcher.delay() <= 44)
+        watcher.failures = 10
+        self.assertTrue(54 <= watcher.delay() <= 66)
+        with self.assertRaises(ValueError):
+            VaultWatcher(mock.Mock(), ["Private"], lambda event: None, jitter=1)
+
+    def test_dispatch(self):
+        listings = {"Private": listing(("a", 1))}
+        op = fake_client(listings)
+        received = queue.Queue()
+        watcher = VaultWatcher(op, ["Private"], received.put, interval=0.01, jitter=0)
+        with watcher:
+            self.assertTrue(watcher.running)
+            listings["Private"] = listing(("a", 2))
+            event = received.get(timeout=5)
+        self.assertFalse(watcher.running)
+        self.assertEqual((event.kind, event.uuid, event.item), ("changed", "a", {"id": "a"}))
+
+    def test_failed_polls_back_off(self):
+        op = fake_client({"Private": listing(("a", 1))})
+        failed = queue.Queue()
+        watcher = VaultWatcher(op, ["Private"], lambda event: None, interval=0.01, jitter=0, on_error=failed.put)
+        watcher.start()
+        op.list_items.side_effect = RuntimeError("op is down")
+        self.assertEqual(str(failed.get(timeout=5)), "op is down")
+        watcher.stop()
+        self.assertGreaterEqual(watcher.failures, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()